@@ -0,0 +1,268 @@
+'''NumPy によるたくさんの盤面の移動先の一括生成
+
+Notes
+-----
+N 個の盤面を (N, size, size) の駒コード(board.piece_code)の配列と色コードの配列で表し，
+すべての盤面のすべての駒の移動先を一度に求める．
+配列の [n, y, x] がマス (x, y) で，ArrayBoard.codes を (MAX_SIZE, MAX_SIZE) に並べたものと同じ向き．
+
+  - 跳び駒 : 方向ごとに，行き先のマスの番号の表で移動元と移動先の色を並べて比べる
+  - 走り駒 : 方向ごとのレイの表で止まるマスを集め，累積和が 0 のマス(それより手前に
+             止まるマスがない)までを移動先にする
+  - ポーン : 前進・2歩前進・斜めの駒取りを色ごとに求める
+
+bitboard.register で登録した駒と Pawn をまとめて扱い，それ以外の駒は
+盤面ごとに駒を作り直して available_moves で求める．
+結果は available_moves のうち盤面の上のマスと同じで，王手の放置は除かない．
+'''
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from bitboard import ZONES, reference_moves, spec
+from board import BLACK, COLOR_CODE, WHITE, code_class, piece_code
+from custom_types import Board, Position
+from pieces.pieces import Pawn
+
+# 行き先のマスの番号の表 : {(size, dx, dy): array(size * size)}．盤面の外は -1
+_leap_targets: 'dict[tuple[int, int, int], np.ndarray]' = {}
+# レイの表 : {(size, dx, dy): array(size * size, size - 1)}．盤面の外は -1
+_ray_targets: 'dict[tuple[int, int, int], np.ndarray]' = {}
+
+
+def leap_targets(size: int, dx: int, dy: int) -> np.ndarray:
+  '''
+  大きさ size の盤面の各マスから (dx, dy) だけ跳んだ先のマスの番号
+
+  Returns
+  -------
+  : np.ndarray > (size * size,)
+    マス (x, y) の番号は y * size + x．盤面の外に出るときは -1．
+  '''
+  key = (size, dx, dy)
+  targets = _leap_targets.get(key)
+  if targets is None:
+    ys, xs = np.divmod(np.arange(size * size), size)
+    xs, ys = xs + dx, ys + dy
+    on_board = (0 <= xs) & (xs < size) & (0 <= ys) & (ys < size)
+    targets = _leap_targets[key] = np.where(on_board, ys * size + xs, -1)
+  return targets
+
+
+def ray_targets(size: int, dx: int, dy: int) -> np.ndarray:
+  '''
+  大きさ size の盤面の各マスから (dx, dy) 方向に走るときに通るマスの番号
+
+  Returns
+  -------
+  : np.ndarray > (size * size, size - 1)
+    [マス, k] が k + 1 歩目のマス．盤面の外に出たあとは -1．
+  '''
+  key = (size, dx, dy)
+  targets = _ray_targets.get(key)
+  if targets is None:
+    ys, xs = np.divmod(np.arange(size * size), size)
+    steps = np.arange(1, size)
+    xs = xs[:, None] + dx * steps
+    ys = ys[:, None] + dy * steps
+    on_board = (0 <= xs) & (xs < size) & (0 <= ys) & (ys < size)
+    targets = _ray_targets[key] = np.where(on_board, ys * size + xs, -1)
+  return targets
+
+
+def _code_table(codes: 'Iterable[int]', values: 'Iterable' = None, dtype=bool) -> np.ndarray:
+  '''駒コードで引く表'''
+  table = np.zeros(256, dtype)
+  if values is None:
+    table[list(codes)] = True
+  else:
+    for code, value in zip(codes, values):
+      table[code] = value
+  return table
+
+
+def encode(
+    gameboards: 'Iterable[Board]', size: int,
+) -> 'Tuple[np.ndarray, np.ndarray, np.ndarray]':
+  '''
+  盤面を batch_moves に渡す配列にする
+
+  Parameters
+  ----------
+  gameboards : Iterable > [Board, ...]
+    盤面．
+  size : int
+    盤面の大きさ．
+
+  Returns
+  -------
+  codes, colors, counts : np.ndarray > (N, size, size)
+    駒コード，色コード，駒を動かした回数．
+  '''
+  gameboards = list(gameboards)
+  codes = np.zeros((len(gameboards), size, size), np.uint8)
+  colors = np.zeros((len(gameboards), size, size), np.uint8)
+  counts = np.zeros((len(gameboards), size, size), np.int32)
+  for n, gameboard in enumerate(gameboards):
+    for (x, y), piece in gameboard.items():
+      codes[n, y, x] = piece_code(type(piece))
+      colors[n, y, x] = COLOR_CODE[piece.color]
+      counts[n, y, x] = getattr(piece, 'count', 0)
+  return codes, colors, counts
+
+
+def decode(codes: np.ndarray, colors: np.ndarray, counts: np.ndarray = None) -> Board:
+  '''
+  一つの盤面の配列 (size, size) から駒を作り直して盤面にする．
+  駒コードと色と動かした回数のほかの状態は初期値になる
+
+  Returns
+  -------
+  gameboard : Board
+  '''
+  gameboard: Board = {}
+  for y, x in zip(*np.nonzero(codes)):
+    cls = code_class(int(codes[y, x]))
+    assert cls is not None
+    piece = cls('W' if colors[y, x] == WHITE else 'B')
+    if counts is not None and hasattr(piece, 'count'):
+      piece.count = int(counts[y, x])
+    gameboard[(int(x), int(y))] = piece
+  return gameboard
+
+
+def batch_moves(
+    codes: np.ndarray, colors: np.ndarray, counts: np.ndarray = None,
+) -> np.ndarray:
+  '''
+  N 個の盤面のすべての駒の移動先
+
+  Parameters
+  ----------
+  codes : np.ndarray > (N, size, size)
+    駒コード．0 は駒なし．
+  colors : np.ndarray > (N, size, size)
+    色コード．
+  counts : np.ndarray > (N, size, size) or None, default None
+    駒を動かした回数．None のときはすべて 0 (ポーンは2歩進める)．
+
+  Returns
+  -------
+  moves : np.ndarray > (N, size, size, size, size)
+    moves[n, y, x, yy, xx] は n 番目の盤面の (x, y) の駒が (xx, yy) に動けるとき True．
+  '''
+  number, size = codes.shape[0], codes.shape[1]
+  squares = size * size
+  codes = codes.reshape(number, squares).astype(np.intp)
+  colors = colors.reshape(number, squares)
+  counts = (np.zeros_like(codes) if counts is None
+            else counts.reshape(number, squares))
+  moves = np.zeros((number, squares, squares), bool)
+
+  present = [int(code) for code in np.unique(codes) if code]
+  specs = {code: spec(code_class(code)) for code in present}
+  pawn = piece_code(Pawn)
+  fallback = [code for code in present if specs[code] is None and code != pawn]
+
+  occupied = codes != 0
+  # ミスト・ブリザードの範囲 : 走り駒はそのマスで止まる
+  zone = np.zeros_like(occupied)
+  for code in present:
+    distance = ZONES.get(code_class(code).abbr)
+    if distance is None:
+      continue
+    at = codes == code
+    for dx in range(-distance, distance + 1):
+      for dy in range(-distance, distance + 1):
+        targets = leap_targets(size, dx, dy)
+        sources = np.nonzero(targets >= 0)[0]
+        zone[:, targets[sources]] |= at[:, sources]
+
+  # 跳ぶ : 方向ごとに，その方向に跳ぶ駒をまとめる
+  leapers: 'dict[Position, list[int]]' = {}
+  for code in present:
+    if specs[code] is not None:
+      for leap in specs[code][0]:
+        leapers.setdefault(leap, []).append(code)
+  for (dx, dy), leap_codes in leapers.items():
+    targets = leap_targets(size, dx, dy)
+    sources = np.nonzero(targets >= 0)[0]
+    destinations = targets[sources]
+    movable = (_code_table(leap_codes)[codes[:, sources]]
+               & (colors[:, destinations] != colors[:, sources]))
+    moves[:, sources, destinations] |= movable
+
+  # 走る : 方向ごとに，止まるマスの累積和で手前に止まるマスのない範囲を求める
+  riders: 'dict[Position, list[int]]' = {}
+  for code in present:
+    if specs[code] is not None:
+      for ride in specs[code][1]:
+        riders.setdefault(ride, []).append(code)
+  if riders:
+    # 駒ごとの走る最大の回数と駒色
+    lengths = _code_table(present, [specs[code][2] or size if specs[code] else 0
+                                    for code in present], np.intp)[codes][:, :, None]
+    own = colors[:, :, None]
+    steps = np.arange(size - 1)
+  for (dx, dy), ride_codes in riders.items():
+    targets = ray_targets(size, dx, dy)
+    on_board = targets >= 0
+    destinations = np.where(on_board, targets, 0)
+    for stop_in_zone in (True, False):
+      group = [code for code in ride_codes
+               if (code_class(code).abbr not in ZONES) == stop_in_zone]
+      if not group:
+        continue
+      stop = (occupied | zone) if stop_in_zone else occupied
+      stop_on_ray = stop[:, destinations] & on_board
+      # k 歩目より手前で止まるマスの数
+      before = np.cumsum(stop_on_ray, axis=2) - stop_on_ray
+      movable = (on_board & (before == 0)
+                 & (colors[:, destinations] != own)
+                 & (steps < lengths)
+                 & _code_table(group)[codes][:, :, None])
+      sources, ks = np.nonzero(on_board)
+      moves[:, sources, targets[sources, ks]] |= movable[:, sources, ks]
+
+  # ポーン
+  if pawn in present:
+    for color, direction in ((WHITE, 1), (BLACK, -1)):
+      pawns = (codes == pawn) & (colors == color)
+      if not pawns.any():
+        continue
+      one = leap_targets(size, 0, direction)
+      two = leap_targets(size, 0, 2 * direction)
+      sources = np.nonzero(one >= 0)[0]
+      free = ~occupied[:, one[sources]]
+      moves[:, sources, one[sources]] |= pawns[:, sources] & free
+      sources2 = np.nonzero(two >= 0)[0]
+      moves[:, sources2, two[sources2]] |= (
+          pawns[:, sources2] & (counts[:, sources2] == 0)
+          & ~occupied[:, one[sources2]] & ~occupied[:, two[sources2]])
+      enemy = occupied & (colors != color)
+      for dx in (1, -1):
+        diagonal = leap_targets(size, dx, direction)
+        sources = np.nonzero(diagonal >= 0)[0]
+        moves[:, sources, diagonal[sources]] |= pawns[:, sources] & enemy[:, diagonal[sources]]
+
+  # そのほかの駒 : 盤面ごとに available_moves で求める
+  if fallback:
+    fallback_codes = _code_table(fallback)
+    for n in np.nonzero(fallback_codes[codes].any(axis=1))[0]:
+      gameboard = decode(codes[n].reshape(size, size), colors[n].reshape(size, size),
+                         counts[n].reshape(size, size))
+      for index in np.nonzero(fallback_codes[codes[n]])[0]:
+        y, x = divmod(int(index), size)
+        for xx, yy in reference_moves(gameboard[(x, y)], x, y, gameboard, size):
+          moves[n, index, yy * size + xx] = True
+
+  return moves.reshape(number, size, size, size, size)
+
+
+def move_sets(moves: np.ndarray, n: int) -> 'dict[Position, set[Position]]':
+  '''batch_moves の結果のうち n 番目の盤面を {駒の位置: 移動先の set} にする'''
+  output: 'dict[Position, set[Position]]' = {}
+  for y, x, yy, xx in zip(*np.nonzero(moves[n])):
+    output.setdefault((int(x), int(y)), set()).add((int(xx), int(yy)))
+  return output
@@ -0,0 +1,402 @@
+'''Python の整数をビットボードとして使う移動先の生成
+
+Notes
+-----
+盤面は最大 14x14 = 196 マスなので，マス (x, y) を board.square(x, y) 番目のビットに対応させると，
+占有・色・駒の種類ごとのマスの集合がそれぞれ一つの整数に収まる．
+
+  - 跳び駒 : 移動先の表をシフトとマスクで作っておき，自分の駒のマスを除く
+  - 走り駒 : 方向ごとのレイの表から最初にぶつかるマスを最下位/最上位ビットで探す(classical)
+  - ミスト・ブリザードの範囲 : 駒のマスをシフトで広げたものを，走り駒が止まるマスとして扱う
+
+扱える駒は register で登録したクラスと Pawn だけで，それ以外の駒は
+これまでどおり available_moves (基準となる実装)で求める．
+移動先は盤面の上のマスだけで，valid_moves で盤面の外のマスを除いたものと同じになる．
+cross_check は両方の結果をランダムな盤面で比べる．
+'''
+
+from random import Random
+from typing import Iterable, Optional, Type
+
+from board import MAX_SIZE, ZONES, piece_code, position, square
+from custom_types import Board, Color, Position, PositionSet
+from math_utils import primes, fibos, tribos, tetras, pentas, lucas, pells, perrins
+from pieces.piece import Piece
+from pieces.pieces import Bishop, King, Knight, Pawn, Queen, Rook
+from pieces.fairy_pieces1 import (
+    Giraffe, Unicorn, PrimeLeaper, FibonacciLeaper, TribonacciLeaper, TetranacciLeaper,
+    PentanacciLeaper, LucasLeaper, PellLeaper, PerrinLeaper, PythagorasLeaper,
+)
+from pieces.fairy_pieces3 import Blizzard, Mist
+from pieces.piece_utils import dir8, dist_leaps, is_in_bounds, king_move, ray
+
+# ビットボードで動きを求められる駒 : {駒のクラス: (跳ぶ方向, 走る方向, 走る最大の回数)}
+_specs: 'dict[Type[Piece], tuple[frozenset[Position], tuple[Position, ...], Optional[int]]]' = {}
+# (dx, dy) だけずらしても盤面の上にあるマス全体 : {(dx, dy, size): int}
+_source_masks: 'dict[tuple[int, int, int], int]' = {}
+# 跳び駒の移動先の表 : {(マスの番号, 跳ぶ方向, size): int}
+_leaper_masks: 'dict[tuple[int, frozenset[Position], int], int]' = {}
+# 走る駒の通るマスの表 : {(マスの番号, dx, dy, size, length): int}
+_ray_masks: 'dict[tuple[int, int, int, int, Optional[int]], int]' = {}
+
+
+def register(
+    cls: Type[Piece], leaps: 'Iterable[Position]' = (), rides: 'Iterable[Position]' = (),
+    length: int = None,
+):
+  '''
+  跳ぶ・走るだけで動きが決まる駒をビットボードで扱えるようにする
+
+  Parameters
+  ----------
+  cls : Type[Piece]
+    駒のクラス．サブクラスには引き継がない．
+  leaps : Iterable > [Position, ...]
+    跳ぶ方向．leaper の direction と同じ．
+  rides : Iterable > [Position, ...]
+    走る方向．rider の intervals と同じ．
+  length : int or None, default None
+    rides の方向に走る最大の回数．
+  '''
+  _specs[cls] = (frozenset(leaps), tuple(set(rides)), length)
+
+
+def spec(cls: Type[Piece]) -> 'Optional[tuple[frozenset[Position], tuple[Position, ...], Optional[int]]]':
+  '''register で登録した cls の (跳ぶ方向, 走る方向, 走る最大の回数)．登録していなければ None'''
+  return _specs.get(cls)
+
+
+def supports(piece: Piece) -> bool:
+  '''piece の動きをビットボードで求められるとき True'''
+  return type(piece) in _specs or type(piece) is Pawn
+
+
+def bit(x: int, y: int) -> int:
+  '''マス (x, y) だけを含むビットボード'''
+  return 1 << square(x, y)
+
+
+def squares_of(bitboard: int) -> 'list[Position]':
+  '''bitboard に含まれるマスのリスト．番号の小さい順'''
+  output: 'list[Position]' = []
+  while bitboard:
+    low = bitboard & -bitboard
+    output.append(position(low.bit_length() - 1))
+    bitboard ^= low
+  return output
+
+
+def shift(bitboard: int, dx: int, dy: int, size: int) -> int:
+  '''
+  bitboard のマスをすべて (dx, dy) だけずらす．盤面の外に出るマスは捨てる
+
+  Parameters
+  ----------
+  bitboard : int
+    ビットボード．
+  dx, dy : int
+    ずらす方向．相対座標．
+  size : int
+    盤面の大きさ．
+
+  Returns
+  -------
+  : int
+  '''
+  key = (dx, dy, size)
+  mask = _source_masks.get(key)
+  if mask is None:
+    # 行き先が盤面の上にあるマスだけを残しておけば，端から反対側の端に回り込まない
+    mask = _source_masks[key] = sum(bit(x, y) for x in range(size) for y in range(size)
+                                    if is_in_bounds(x + dx, y + dy, size))
+  offset = dy * MAX_SIZE + dx
+  bitboard &= mask
+  return bitboard << offset if offset >= 0 else bitboard >> -offset
+
+
+def leaper_attacks(bitboard: int, leaps: 'Iterable[Position]', size: int) -> int:
+  '''bitboard のすべてのマスから leaps の方向に跳んだ先'''
+  output = 0
+  for dx, dy in leaps:
+    output |= shift(bitboard, dx, dy, size)
+  return output
+
+
+def leaper_mask(index: int, leaps: 'frozenset[Position]', size: int) -> int:
+  '''マス index から leaps の方向に跳んだ先のうち，盤面の上にあるマス．盤面の状態によらない'''
+  key = (index, leaps, size)
+  mask = _leaper_masks.get(key)
+  if mask is None:
+    mask = _leaper_masks[key] = leaper_attacks(1 << index, leaps, size)
+  return mask
+
+
+def ray_mask(index: int, dx: int, dy: int, size: int, length: int = None) -> int:
+  '''
+  マス index から (dx, dy) 方向に走るときに通るマスのうち，盤面の上にあるマス．
+  盤面の状態によらない
+
+  Parameters
+  ----------
+  index : int
+    駒のマスの番号．
+  dx, dy : int
+    移動の方向．相対座標．
+  size : int
+    盤面の大きさ．
+  length : int or None, default None
+    (dx, dy) 方向に移動する最大の回数．
+
+  Returns
+  -------
+  : int
+  '''
+  key = (index, dx, dy, size, length)
+  mask = _ray_masks.get(key)
+  if mask is None:
+    path = ray(*position(index), dx, dy, size)
+    mask = _ray_masks[key] = sum(bit(*pos) for pos in path[:length])
+  return mask
+
+
+def rider_attacks(
+    index: int, rides: 'Iterable[Position]', stops: int, size: int, length: int = None,
+) -> int:
+  '''
+  マス index から rides の方向に走り，stops のマスにぶつかるまでに通るマス(ぶつかったマスを含む)
+
+  Parameters
+  ----------
+  index : int
+    駒のマスの番号．
+  rides : Iterable > [Position, ...]
+    移動の方向．相対座標．
+  stops : int
+    それ以上進めなくなるマス．
+  size : int
+    盤面の大きさ．
+  length : int or None, default None
+    rides の方向に移動する最大の回数．
+
+  Returns
+  -------
+  : int
+  '''
+  output = 0
+  for dx, dy in rides:
+    path = ray_mask(index, dx, dy, size, length)
+    blockers = path & stops
+    if blockers:
+      # 番号が増える向きに走るときは最下位ビット，減る向きのときは最上位ビットが最初にぶつかるマス
+      if dy * MAX_SIZE + dx > 0:
+        first = (blockers & -blockers).bit_length() - 1
+      else:
+        first = blockers.bit_length() - 1
+      # ぶつかったマスより先は通らない
+      path &= ~ray_mask(first, dx, dy, size)
+    output |= path
+  return output
+
+
+class BitBoard:
+  '''
+  ビットボードで表した盤面
+
+  Attributes
+  ----------
+  gameboard : Board
+    もとの盤面．
+  size : int
+    盤面の大きさ．
+  occupied : int
+    駒のあるマス全体．
+  colors : dict > {Color: int}
+    駒色ごとの駒のあるマス．
+  pieces : dict > {int: int}
+    駒コードごとの駒のあるマス(色は問わない)．
+  '''
+
+  def __init__(self, gameboard: Board, size: int):
+    self.gameboard = gameboard
+    self.size = size
+    self.occupied = 0
+    self.colors: 'dict[Color, int]' = {'W': 0, 'B': 0}
+    self.pieces: 'dict[int, int]' = {}
+    self._abbrs: 'dict[str, int]' = {}
+    self._zone: Optional[int] = None
+    for (x, y), piece in gameboard.items():
+      b = bit(x, y)
+      self.occupied |= b
+      self.colors[piece.color] |= b
+      code = piece_code(type(piece))
+      self.pieces[code] = self.pieces.get(code, 0) | b
+      self._abbrs[piece.abbr] = self._abbrs.get(piece.abbr, 0) | b
+
+  @property
+  def zone(self) -> int:
+    '''ミスト・ブリザードの範囲．utils.in_zone が True になるマス全体'''
+    if self._zone is None:
+      self._zone = 0
+      for abbr, distance in ZONES.items():
+        if abbr in self._abbrs:
+          square_leaps = [(dx, dy) for dx in range(-distance, distance + 1)
+                          for dy in range(-distance, distance + 1)]
+          self._zone |= leaper_attacks(self._abbrs[abbr], square_leaps, self.size)
+    return self._zone
+
+  def moves(self, piece: Piece, x: int, y: int) -> int:
+    '''
+    (x, y) にある piece の移動先
+
+    Parameters
+    ----------
+    piece : Piece
+      駒．supports(piece) が True であること．
+    x, y : int
+      駒の位置．
+
+    Returns
+    -------
+    : int
+      移動先のビットボード．
+    '''
+    index = square(x, y)
+    own = self.colors[piece.color]
+    if type(piece) is Pawn:
+      return self._pawn_moves(piece, x, y)
+    leaps, rides, length = _specs[type(piece)]
+    output = leaper_mask(index, leaps, self.size) if leaps else 0
+    if rides:
+      stops = self.occupied
+      # ミスト・ブリザード自身は範囲で止まらない
+      if piece.abbr not in ZONES:
+        stops |= self.zone
+      output |= rider_attacks(index, rides, stops, self.size, length)
+    return output & ~own
+
+  def _pawn_moves(self, piece: Piece, x: int, y: int) -> int:
+    '''Pawn.available_moves と同じ'''
+    direction = 1 if piece.color == 'W' else -1
+    output = 0
+    if is_in_bounds(x, y + direction, self.size) and not self.occupied & bit(x, y + direction):
+      output |= bit(x, y + direction)
+      if (piece.count == 0 and is_in_bounds(x, y + 2 * direction, self.size)
+              and not self.occupied & bit(x, y + 2 * direction)):
+        output |= bit(x, y + 2 * direction)
+    enemy = self.occupied & ~self.colors[piece.color]
+    for xx in (x + 1, x - 1):
+      if is_in_bounds(xx, y + direction, self.size):
+        output |= enemy & bit(xx, y + direction)
+    return output
+
+  def move_set(self, piece: Piece, x: int, y: int) -> PositionSet:
+    '''moves を Position の set にしたもの'''
+    return set(squares_of(self.moves(piece, x, y)))
+
+
+def available_moves(
+    piece: Piece, x: int, y: int, gameboard: Board, size: int,
+    bitboard: BitBoard = None, check: bool = False,
+) -> PositionSet:
+  '''
+  (x, y) にある piece の盤面の上の移動先．
+  ビットボードで扱えない駒は piece.available_moves で求める．
+
+  Parameters
+  ----------
+  piece : Piece
+    駒．
+  x, y : int
+    駒の位置．
+  gameboard : Board
+    盤面．
+  size : int
+    盤面の大きさ．
+  bitboard : BitBoard or None, default None
+    gameboard のビットボード．同じ盤面で何度も呼ぶときは作っておいて渡す．
+  check : bool, default False
+    True のとき，piece.available_moves の結果と比べ，違えば AssertionError を出す．
+
+  Returns
+  -------
+  : PositionSet
+  '''
+  if not supports(piece):
+    return reference_moves(piece, x, y, gameboard, size)
+  if bitboard is None:
+    bitboard = BitBoard(gameboard, size)
+  output = bitboard.move_set(piece, x, y)
+  if check:
+    expected = reference_moves(piece, x, y, gameboard, size)
+    assert output == expected, (piece, (x, y), output ^ expected)
+  return output
+
+
+def reference_moves(piece: Piece, x: int, y: int, gameboard: Board, size: int) -> PositionSet:
+  '''piece.available_moves のうち盤面の上のマス'''
+  return {pos for pos in piece.available_moves(x, y, gameboard, size=size)
+          if is_in_bounds(*pos, size)}
+
+
+def cross_check(
+    positions: int = 100, size: int = 8, seed: int = 0,
+    classes: 'Iterable[Type[Piece]]' = None, density: float = 0.3,
+) -> 'list[tuple[Board, Position, PositionSet, PositionSet]]':
+  '''
+  ランダムな盤面で，ビットボードによる移動先と available_moves による移動先を比べる
+
+  Parameters
+  ----------
+  positions : int
+    盤面の数．
+  size : int
+    盤面の大きさ．
+  seed : int
+    乱数のシード．
+  classes : Iterable > [Type[Piece], ...] or None, default None
+    盤面に置く駒のクラス．None のときはビットボードで扱えるすべての駒．
+  density : float
+    マスに駒を置く割合．
+
+  Returns
+  -------
+  : list > [(Board, Position, PositionSet, PositionSet), ...]
+    結果が違った(盤面, 駒の位置, ビットボードの結果, available_moves の結果)．
+  '''
+  rng = Random(seed)
+  pool = list(classes) if classes is not None else [Pawn, *_specs]
+  mismatches: 'list[tuple[Board, Position, PositionSet, PositionSet]]' = []
+  for _ in range(positions):
+    gameboard: Board = {}
+    for x in range(size):
+      for y in range(size):
+        if rng.random() < density:
+          piece = rng.choice(pool)(rng.choice('WB'))
+          if isinstance(piece, Pawn):
+            piece.count = rng.choice((0, 0, 1))
+          gameboard[(x, y)] = piece
+    bitboard = BitBoard(gameboard, size)
+    for (x, y), piece in gameboard.items():
+      if not supports(piece):
+        continue
+      output = bitboard.move_set(piece, x, y)
+      expected = reference_moves(piece, x, y, gameboard, size)
+      if output != expected:
+        mismatches.append((gameboard, (x, y), output, expected))
+  return mismatches
+
+
+register(Knight, leaps=dir8(1, 2))
+register(King, leaps=king_move)
+register(Rook, rides=dir8(0, 1))
+register(Bishop, rides=dir8(1, 1))
+register(Queen, rides=king_move)
+register(Unicorn, rides=dir8(1, 2))
+register(Giraffe, leaps=dir8(1, 4))
+register(Mist, rides=dir8(0, 1), length=2)
+register(Blizzard, leaps=dir8(0, 2))
+for _cls, _dists in ((PrimeLeaper, primes), (FibonacciLeaper, fibos), (TribonacciLeaper, tribos),
+                     (TetranacciLeaper, tetras), (PentanacciLeaper, pentas), (LucasLeaper, lucas),
+                     (PellLeaper, pells), (PerrinLeaper, perrins),
+                     (PythagorasLeaper, [i ** 2 for i in range(15)])):
+  register(_cls, leaps=dist_leaps(_dists))
@@ -0,0 +1,384 @@
+'''配列で表現された盤面 ArrayBoard の定義
+
+Notes
+-----
+盤面は最大 14x14 なので，196 マスぶんの平たい配列を確保しておき，
+マス (x, y) を y * MAX_SIZE + x 番目の要素に対応させる．
+駒の種類は小さな整数(駒コード)，駒色は別の配列(色プレーン)で持つ．
+
+ArrayBoard は dict のサブクラスでもあるので，
+これまでどおり {(int, int): Piece} の盤面として available_moves などに渡すことができる．
+
+局面の Zobrist ハッシュのうち，駒の種類・色・位置・動かした回数の部分は
+ArrayBoard.key として盤面を書き換えるたびに差分で更新する．
+手番・キャスリング・アンパッサンの部分は state_key で求めて合わせる．
+
+track_changes を呼んだ盤面は，書き換えたマスの番号を ArrayBoard.changed に記録する．
+CPU の評価関数はこれを読んで，動いた駒のぶんだけ評価の項を更新する．
+
+ミスト・ブリザードの範囲は，マスごとにそのマスを範囲に含む駒の数として ArrayBoard.zones に持つ．
+ミスト・ブリザードを置いたり取り除いたりしたときに，その周りのマスだけを数え直す．
+'''
+
+from random import Random
+from typing import Iterable, Mapping, Optional, Tuple, Type, Union
+
+from pieces.piece import Piece, Position
+
+# 盤面のありうる最大の大きさ
+MAX_SIZE = 14
+# 配列の長さ
+SQUARES = MAX_SIZE * MAX_SIZE
+
+# 色コード
+EMPTY = 0
+WHITE = 1
+BLACK = 2
+COLOR_CODE: 'dict[str, int]' = {'W': WHITE, 'B': BLACK}
+
+# 周りのマスに範囲をもつ駒 : {駒の略称: 距離}．距離 1 のとき，隣のマスまで
+ZONES: 'dict[str, int]' = {'Mi': 2, 'Bz': 1}
+
+# 駒コード : 駒のクラスに 1 から順に割り振る．0 は駒なし
+_codes: 'dict[Type[Piece], int]' = {}
+_classes: 'list[Optional[Type[Piece]]]' = [None]
+# 駒コードごとの Zobrist キー : 色コード * SQUARES + マスの番号 で引く
+_piece_keys: 'list[list[int]]' = [[]]
+# 範囲をもつ駒の駒コード : {駒コード: 駒の略称}
+_zone_codes: 'dict[int, str]' = {}
+# 動かした回数ごとの Zobrist キー : {(マスの番号, 回数): int}
+_count_keys: 'dict[tuple[int, int], int]' = {}
+
+
+def piece_code(cls: Type[Piece]) -> int:
+  '''
+  駒のクラスに対応する駒コードを返す．
+  初めて見るクラスには新しいコードを割り振る．
+
+  Parameters
+  ----------
+  cls : Type[Piece]
+    駒のクラス．
+
+  Returns
+  -------
+  : int > 1-255
+  '''
+  code = _codes.get(cls)
+  if code is None:
+    code = len(_classes)
+    if code > 255:
+      raise ValueError('駒コードが 255 を超えました．')
+    _codes[cls] = code
+    _classes.append(cls)
+    if getattr(cls, 'abbr', None) in ZONES:
+      _zone_codes[code] = cls.abbr
+    # キーは駒コードではなくクラス名から作るので，プロセスが違っても同じになる
+    _piece_keys.append(_random_keys(f'piece:{cls.__name__}', 3 * SQUARES))
+  return code
+
+
+def code_class(code: int) -> Optional[Type[Piece]]:
+  '''駒コードに対応する駒のクラスを返す．0 のときは None'''
+  return _classes[code]
+
+
+def square(x: int, y: int) -> int:
+  '''マス (x, y) の配列上の番号'''
+  return y * MAX_SIZE + x
+
+
+def position(index: int) -> Position:
+  '''配列上の番号に対応するマス (x, y)'''
+  return index % MAX_SIZE, index // MAX_SIZE
+
+
+def on_array(x: int, y: int) -> bool:
+  '''(x, y) が配列の範囲内にあるとき True'''
+  return 0 <= x < MAX_SIZE and 0 <= y < MAX_SIZE
+
+
+def _random_keys(name: str, n: int) -> 'list[int]':
+  '''name から決まる 64 ビットの乱数を n 個返す'''
+  rng = Random(f'zobrist:{name}')
+  return [rng.getrandbits(64) for _ in range(n)]
+
+
+# 黒番のときの Zobrist キー
+_SIDE_KEY = _random_keys('side', 1)[0]
+# キャスリングの可能性の Zobrist キー : [白クイーンサイド, 白キングサイド, 黒クイーンサイド, 黒キングサイド]
+_CASTLING_KEYS = _random_keys('castling', 4)
+# 2歩進んだポーンの位置の Zobrist キー
+_ADVANCED2_KEYS = _random_keys('advanced2', SQUARES)
+
+
+def piece_key(piece: Piece, index: int) -> int:
+  '''
+  マスの番号 index にある piece の Zobrist キー
+
+  Parameters
+  ----------
+  piece : Piece
+    駒．
+  index : int
+    マスの配列上の番号．
+
+  Returns
+  -------
+  : int
+    64 ビットの整数．
+    動かした回数によって動きが変わる駒では，その回数も含める．
+  '''
+  key = _piece_keys[piece_code(type(piece))][COLOR_CODE[piece.color] * SQUARES + index]
+  count = getattr(piece, 'count', None)
+  if count is not None:
+    count_key = _count_keys.get((index, count))
+    if count_key is None:
+      count_key = _count_keys[(index, count)] = _random_keys(f'count:{index}:{count}', 1)[0]
+    key ^= count_key
+  return key
+
+
+def state_key(
+    color: str, can_castling: 'Optional[Mapping[str, list[bool]]]' = None,
+    advanced2_pos: Optional[Position] = None,
+) -> int:
+  '''
+  盤面上の駒以外の状態の Zobrist キー
+
+  Parameters
+  ----------
+  color : str > 'W', 'B'
+    手番．
+  can_castling : dict > {'W': [bool, bool], 'B': [bool, bool]} | None
+    キャスリングの可能性．
+  advanced2_pos : Position | None
+    直前に2歩進んだポーンの位置．
+
+  Returns
+  -------
+  : int
+  '''
+  key = _SIDE_KEY if color == 'B' else 0
+  if can_castling is not None:
+    for i, (c, side) in enumerate((('W', 0), ('W', 1), ('B', 0), ('B', 1))):
+      if can_castling[c][side]:
+        key ^= _CASTLING_KEYS[i]
+  if advanced2_pos is not None:
+    key ^= _ADVANCED2_KEYS[square(*advanced2_pos)]
+  return key
+
+
+class ArrayBoard(dict):
+  '''
+  配列で表現された盤面
+
+  Attributes
+  ----------
+  codes : bytearray
+    各マスの駒コード．長さ SQUARES．駒がないマスは 0．
+  colors : bytearray
+    各マスの色コード．長さ SQUARES．駒がないマスは EMPTY．
+  hashes : list > [int, ...]
+    各マスの駒の Zobrist キー．長さ SQUARES．駒がないマスは 0．
+    駒を置いたときの値を持っておき，取り除くときにそのまま使う．
+  key : int
+    hashes をすべて xor したもの．
+  changed : set > {int, ...} | None
+    track_changes を呼んでから書き換えたマスの番号．
+    呼んでいないときやコピーした盤面では None．
+  zones : dict > {str: bytearray} | None
+    ZONES の駒の略称ごとの，各マスを範囲に含むその駒の数．長さ SQUARES．
+    範囲をもつ駒を一度も置いていないときは None．
+
+  Notes
+  -----
+  dict としての中身(view)と codes, colors, hashes, key, zones は常に同期している．
+  盤面を書き換えるときは必ず __setitem__ / __delitem__ などの
+  dict のメソッドを通すこと．
+  '''
+  __slots__ = ('codes', 'colors', 'hashes', 'key', 'changed', 'zones')
+
+  def __init__(self, board: 'Union[Mapping[Position, Piece], Iterable[Tuple[Position, Piece]], None]' = None):
+    super().__init__()
+    self.codes = bytearray(SQUARES)
+    self.colors = bytearray(SQUARES)
+    self.hashes = [0] * SQUARES
+    self.key = 0
+    self.changed: 'Optional[set[int]]' = None
+    self.zones: 'Optional[dict[str, bytearray]]' = None
+    if board is not None:
+      self.update(board)
+
+  def __setitem__(self, pos: Position, piece: Piece):
+    x, y = pos
+    if not on_array(x, y):
+      raise KeyError(pos)
+    i = y * MAX_SIZE + x
+    if self.codes[i] in _zone_codes:
+      self._count_zone(i, _zone_codes[self.codes[i]], -1)
+    self.codes[i] = piece_code(type(piece))
+    if self.codes[i] in _zone_codes:
+      self._count_zone(i, _zone_codes[self.codes[i]], 1)
+    self.colors[i] = COLOR_CODE[piece.color]
+    h = piece_key(piece, i)
+    self.key ^= self.hashes[i] ^ h
+    self.hashes[i] = h
+    if self.changed is not None:
+      self.changed.add(i)
+    dict.__setitem__(self, pos, piece)
+
+  def __delitem__(self, pos: Position):
+    dict.__delitem__(self, pos)
+    i = pos[1] * MAX_SIZE + pos[0]
+    if self.codes[i] in _zone_codes:
+      self._count_zone(i, _zone_codes[self.codes[i]], -1)
+    self.codes[i] = 0
+    self.colors[i] = EMPTY
+    self.key ^= self.hashes[i]
+    self.hashes[i] = 0
+    if self.changed is not None:
+      self.changed.add(i)
+
+  def update(self, *args, **kwargs):
+    for pos, piece in dict(*args, **kwargs).items():
+      self[pos] = piece
+
+  def setdefault(self, pos: Position, piece: Piece):
+    if pos not in self:
+      self[pos] = piece
+    return self[pos]
+
+  def pop(self, pos: Position, *default):
+    if pos in self:
+      piece = self[pos]
+      del self[pos]
+      return piece
+    if default:
+      return default[0]
+    raise KeyError(pos)
+
+  def popitem(self):
+    pos, piece = next(reversed(self.items()))
+    del self[pos]
+    return pos, piece
+
+  def clear(self):
+    if self.changed is not None:
+      self.changed.update(y * MAX_SIZE + x for x, y in self)
+    dict.clear(self)
+    self.codes[:] = bytes(SQUARES)
+    self.colors[:] = bytes(SQUARES)
+    self.hashes = [0] * SQUARES
+    self.key = 0
+    self.zones = None
+
+  def copy(self) -> 'ArrayBoard':
+    '''浅いコピー．駒オブジェクトは共有する'''
+    new = ArrayBoard.__new__(ArrayBoard)
+    dict.update(new, self)
+    new.codes = self.codes[:]
+    new.colors = self.colors[:]
+    new.hashes = self.hashes[:]
+    new.key = self.key
+    new.changed = None
+    new.zones = (None if self.zones is None
+                 else {abbr: counts[:] for abbr, counts in self.zones.items()})
+    return new
+
+  __copy__ = copy
+
+  def __deepcopy__(self, memo) -> 'ArrayBoard':
+    from copy import deepcopy
+    new = ArrayBoard.__new__(ArrayBoard)
+    memo[id(self)] = new
+    for pos, piece in self.items():
+      dict.__setitem__(new, pos, deepcopy(piece, memo))
+    new.codes = self.codes[:]
+    new.colors = self.colors[:]
+    new.hashes = self.hashes[:]
+    new.key = self.key
+    new.changed = None
+    new.zones = (None if self.zones is None
+                 else {abbr: counts[:] for abbr, counts in self.zones.items()})
+    return new
+
+  def __reduce__(self):
+    # 復元時に駒の属性を読まなくて済むよう色プレーンと Zobrist キーもそのまま渡す
+    return ArrayBoard, (), (list(self.items()), bytes(self.colors), self.hashes, self.key)
+
+  def __setstate__(self, state: 'tuple[list[tuple[Position, Piece]], bytes, list[int], int]'):
+    items, colors, self.hashes, self.key = state
+    self.colors = bytearray(colors)
+    for pos, piece in items:
+      dict.__setitem__(self, pos, piece)
+      # 駒コードはプロセスごとに割り振られるので，クラスから引き直す
+      i = pos[1] * MAX_SIZE + pos[0]
+      self.codes[i] = piece_code(type(piece))
+      if self.codes[i] in _zone_codes:
+        self._count_zone(i, _zone_codes[self.codes[i]], 1)
+
+  def __repr__(self):
+    return f'ArrayBoard({dict.__repr__(self)})'
+
+  def _count_zone(self, index: int, abbr: str, sign: int):
+    '''マス index にある略称 abbr の駒の範囲のマスの数を sign だけ増やす'''
+    if self.zones is None:
+      self.zones = {zone_abbr: bytearray(SQUARES) for zone_abbr in ZONES}
+    counts = self.zones[abbr]
+    distance = ZONES[abbr]
+    x, y = index % MAX_SIZE, index // MAX_SIZE
+    for yy in range(max(0, y - distance), min(MAX_SIZE, y + distance + 1)):
+      for xx in range(max(0, x - distance), min(MAX_SIZE, x + distance + 1)):
+        counts[yy * MAX_SIZE + xx] += sign
+
+  def in_zone(self, x: int, y: int, abbr: str) -> bool:
+    '''
+    (x, y) が略称 abbr の駒の範囲(ZONES の距離以内)にあるとき True．utils.in_zone と同じ
+
+    Parameters
+    ----------
+    x, y : int
+      マス．on_array(x, y) であること．
+    abbr : str
+      ZONES の駒の略称．
+    '''
+    return self.zones is not None and self.zones[abbr][y * MAX_SIZE + x] > 0
+
+  def in_any_zone(self, x: int, y: int) -> bool:
+    '''(x, y) がミストかブリザードの範囲にあるとき True．on_array(x, y) であること'''
+    if self.zones is None:
+      return False
+    i = y * MAX_SIZE + x
+    return any(counts[i] for counts in self.zones.values())
+
+  def track_changes(self) -> 'set[int]':
+    '''
+    これ以降に書き換えたマスの番号を changed に記録する
+
+    Returns
+    -------
+    : set > {int, ...}
+      空にした changed．
+    '''
+    self.changed = set()
+    return self.changed
+
+  def code_at(self, x: int, y: int) -> int:
+    '''(x, y) の駒コード．盤面外や駒がないときは 0'''
+    return self.codes[y * MAX_SIZE + x] if on_array(x, y) else 0
+
+  def color_at(self, x: int, y: int) -> int:
+    '''(x, y) の色コード．盤面外や駒がないときは EMPTY'''
+    return self.colors[y * MAX_SIZE + x] if on_array(x, y) else EMPTY
+
+  def position_key(self) -> bytes:
+    '''駒の種類・色・位置だけで決まる局面のスナップショット'''
+    return bytes(self.codes) + bytes(self.colors)
+
+  def same_position(self, other: 'ArrayBoard') -> bool:
+    '''
+    other と駒の種類・色・位置がすべて同じとき True．
+    駒オブジェクトの同一性や動かした回数は比較しない．
+    '''
+    return self.codes == other.codes and self.colors == other.colors
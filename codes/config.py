@@ -1,6 +1,6 @@
 import os
+import sys
 
-from ctypes import windll
 import pygame
 import pygame.font
 import pygame.image
@@ -11,8 +11,15 @@ CMD_RED = '\033[31m'
 CMD_RESET = '\033[0m'
 
 # ウィンドウサイズ
-_DISPLAY_W: int = windll.user32.GetSystemMetrics(0)
-_DISPLAY_H: int = windll.user32.GetSystemMetrics(1)
+if sys.platform == 'win32':
+  from ctypes import windll
+  _DISPLAY_W: int = windll.user32.GetSystemMetrics(0)
+  _DISPLAY_H: int = windll.user32.GetSystemMetrics(1)
+else:
+  # Windows 以外では画面の大きさを SDL から得る
+  pygame.display.init()
+  _DISPLAY_W = pygame.display.Info().current_w
+  _DISPLAY_H = pygame.display.Info().current_h
 WSIZE = 640 if (_DISPLAY_W < 1920 or _DISPLAY_H < 960) else 960
 
 # ウィンドウアイコン
@@ -1,4 +1,4 @@
-from typing import Dict, Optional, Tuple, Literal, Type
+from typing import Dict, Optional, Tuple, Literal, Type, TypedDict
 
 from pieces.piece import Piece, PositionList, PositionSet
 
@@ -8,3 +8,12 @@ Position = Tuple[int, int]
 Board = Dict[Position, Piece]
 Placers = Dict[int, Tuple[Optional[Type[Piece]], ...]]
 AsymPlacers = Dict[int, Tuple[Optional[Tuple[Type[Piece], Color]], ...]]
+# コンピュータの探索の途中経過
+SearchProgress = TypedDict('SearchProgress', {
+    # 読んでいる深さ
+    'depth': int,
+    # 読み終わった深さでの最善手
+    'best': Optional[Tuple[Position, Position]],
+    # 探索した局面の数
+    'nodes': int,
+})
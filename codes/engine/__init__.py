@@ -0,0 +1,131 @@
+'''
+ウィンドウ・音を使わない(pygame に依存しない)ゲームエンジン
+
+Notes
+-----
+ゲームのルール(Game)，駒，ゲームの種類の定義，コンピュータの探索をまとめて読み込む．
+pygame の UI(main/main_config.py と，それを読む draw.py, event.py など)はこの上で動く．
+ここから読むモジュールは pygame, config.py, draw_utils.py を読まないようにすること．
+
+codes ディレクトリを sys.path に入れれば，どのディレクトリからでも使える．
+
+  import sys
+  sys.path.append('path/to/codes')
+  from engine import new_game, legal_moves
+
+  game = new_game('Normal Chess')
+  startpos, endpos, promote2 = legal_moves(game)[0]
+  undo = game.make_move(startpos, endpos, promote2)
+'''
+
+import sys
+import os
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple, Type, Union, cast
+
+# ゲームのルールのモジュールは codes/main に平たく置かれていて，互いに import main などで読み合う
+_MAIN_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main')
+if _MAIN_DIR not in sys.path:
+  sys.path.append(_MAIN_DIR)
+
+from custom_types import Position
+from games import GameType, Placers, games, init_960
+from main import Game, opponent
+from pieces.piece import Piece
+import computer
+
+__all__ = ['Game', 'GameType', 'Move', 'Timings', 'computer', 'find_game', 'games', 'init_960',
+           'legal_moves', 'new_game', 'notation', 'opponent']
+
+Move = Tuple[Position, Position, Optional[Type[Piece]]]
+# 駒の略記ごとの [valid_moves の呼び出し回数, かかった時間(秒), 返した移動先の数]
+Timings = Dict[str, List[float]]
+
+
+def find_game(kind: Union[int, str]) -> int:
+  '''
+  ゲームの種類の games の番号
+
+  Parameters
+  ----------
+  kind : int | str
+    games の番号か，ゲームの名前(大文字・小文字は区別しない)．
+  '''
+  if isinstance(kind, int):
+    if not 0 <= kind < len(games):
+      raise ValueError(f'unknown game: {kind}')
+    return kind
+  for index, game in enumerate(games):
+    if game['name'].lower() == kind.lower():
+      return index
+  raise ValueError(f'unknown game: {kind}')
+
+
+def new_game(kind: Union[int, str], chess960: Optional[int] = None) -> Game:
+  '''
+  ゲームの初期局面を，ウィンドウを使わずに用意する
+
+  Parameters
+  ----------
+  kind : int | str
+    games の番号か，ゲームの名前．
+  chess960 : int | None
+    Chess 960 の配置の番号．None のときはランダムに選ぶ．
+
+  Returns
+  -------
+  : Game
+    PvsP モードで，白の手番．
+  '''
+  game = Game()
+  kind_ = cast(GameType, dict(games[find_game(kind)]))
+  if kind_['name'] == 'Chess 960':
+    placers = dict(cast(Placers, kind_['placers']))
+    placers[1] = init_960(chess960)
+    kind_['placers'] = placers
+  game.kind = kind_
+  game.mode = 'PvsP'
+  game.process_after_deciding_kind()
+  return game
+
+
+def notation(startpos: Position, endpos: Position, promote2: Optional[str] = None) -> str:
+  '''手の記録．'e2e4'，プロモーションは 'e7e8=Q'．キーボード操作と同じくファイルは a から'''
+  move = ''.join(f'{chr(97 + x)}{y + 1}' for x, y in (startpos, endpos))
+  return move + (f'={promote2}' if promote2 is not None else '')
+
+
+def legal_moves(game: Game, timings: Optional[Timings] = None) -> 'list[Move]':
+  '''
+  手番の側の合法手
+
+  Parameters
+  ----------
+  game : Game
+  timings : Timings | None
+    与えられたとき，駒の種類ごとの valid_moves の時間を足していく．
+
+  Returns
+  -------
+  : list > [(開始位置, 終了位置, プロモーション先 | None), ...]
+    プロモーションは promote2 の駒ごとに別の手とする．
+    アーチャー系の駒の矢は撃たない手だけを返す．
+  '''
+  assert game.kind is not None
+  moves: 'list[Move]' = []
+  for startpos, piece in list(game.gameboard.items()):
+    if piece.color != game.playersturn:
+      continue
+    start = perf_counter()
+    ends = game.valid_moves(piece, startpos)
+    if timings is not None:
+      timing = timings.setdefault(piece.abbr, [0, 0.0, 0])
+      timing[0] += 1
+      timing[1] += perf_counter() - start
+      timing[2] += len(ends)
+    for endpos in ends:
+      if game._promotable(piece, endpos):
+        moves += [(startpos, endpos, promote2) for promote2 in game.kind['promote2']]
+      else:
+        moves.append((startpos, endpos, None))
+  return moves
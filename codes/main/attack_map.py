@@ -0,0 +1,544 @@
+'''局面ごとの利きの表 AttackMap
+
+Notes
+-----
+マスごとに，そのマスを攻撃している駒を駒色ごとに引けるようにする．
+アーチャー系の駒は矢で攻撃できるマスを利きとする(can_see_square と同じ)．
+
+駒ごとの利きは，求めるときに読んだマスといっしょに覚えておく．
+盤面が書き換わったときは ArrayBoard.changed に記録されたマスを読んでいた利きだけを求め直す．
+チェックの判定，キャスリングの条件，CPU の評価関数，合法手の判定，
+オーファン・フレンドが受け取る動きはこの表を引く．
+'''
+
+from typing import Iterable, Optional, Protocol, Tuple, Type, TypedDict
+
+from board import ArrayBoard, SQUARES, code_class, position, square, on_array
+from custom_types import Board, Color, Position, PositionSet
+from pieces.piece import Piece
+from pieces.pieces import Pawn
+from utils import arrow_targets_
+import pieces.piece_utils as pu
+
+# 利きを覚えておけない駒．ほかの駒の利きから動きが決まる
+UNCACHEABLE = ('Op', 'Fr')
+# 盤面全体を走査して範囲を調べる駒．これらが動くと走査した利きを求め直す
+ZONE_PIECES = ('Mi', 'Bz')
+
+# 利きの種類
+# 実際の盤面での利き
+SEES = 0
+# ほかの駒をすべて相手のポーンとしたときに取れるマス
+ATTACK_RANGE = 1
+# 味方の駒をすべて相手の駒としたときに取れるマス(守っているマス)
+DEFENDS = 2
+# 味方の駒をすべて相手の駒としたときの移動先．アーチャー系の駒も矢を使わない
+# (オーファン・フレンドに動きを与える駒を調べる)
+REACHES = 3
+
+Kind = int
+# (駒, 位置, 動かした回数, 利き, 読んだマス, 盤面を走査したか)
+CacheEntry = Tuple[Piece, Position, Optional[int], PositionSet, 'frozenset[Position]', bool]
+
+# キングへの利きの情報
+Pins = TypedDict('Pins', {
+    # キングの位置
+    'king': Optional[Position],
+    # キングを攻撃している相手の駒の位置
+    'checkers': 'list[Position]',
+    # マスごとの，利きを求めるときにそのマスを読んだ相手の駒の位置(駒自身のマスは除く)
+    # 味方の駒がいるマスならピンされているかもしれない
+    'watched': 'dict[Position, list[Position]]',
+    # すべての相手の駒の読んだマスが watched に入っているとき True
+    'exact': bool,
+})
+
+
+class Listener(Protocol):
+  '''AttackMap が同期した盤面の書き換えを受け取るもの'''
+
+  def reset(self, board: ArrayBoard):
+    '''盤面 board を最初から数え直す'''
+
+  def update(self, index: int, old_code: int, old_color: int, code: int, color_code: int):
+    '''マス index の駒コード・色コードが old_code, old_color から code, color_code になった'''
+
+
+class _RecordingBoard(dict):
+  '''
+  読まれたマスを記録する盤面
+
+  Attributes
+  ----------
+  accessed : set > {Position, ...} | None
+    in, [], get で読まれたマス．
+    盤面全体を読まれたときは None．
+  scanned : bool
+    items() で盤面を走査されたとき True．
+    駒の動きの中では utils.in_zone でミスト・ブリザードを探すときだけ走査するので，
+    ZONE_PIECES が動いたときに求め直せばよい．
+  '''
+
+  def __init__(self, board):
+    dict.__init__(self, board)
+    self.accessed: 'Optional[set[Position]]' = set()
+    self.scanned = False
+
+  def _read(self, pos):
+    if self.accessed is not None:
+      self.accessed.add(pos)
+
+  def _read_all(self):
+    self.accessed = None
+
+  def __contains__(self, pos):
+    self._read(pos)
+    return dict.__contains__(self, pos)
+
+  def __getitem__(self, pos):
+    self._read(pos)
+    return dict.__getitem__(self, pos)
+
+  def get(self, pos, default=None):
+    self._read(pos)
+    return dict.get(self, pos, default)
+
+  def items(self):
+    self.scanned = True
+    return dict.items(self)
+
+  def __iter__(self):
+    self._read_all()
+    return dict.__iter__(self)
+
+  def keys(self):
+    self._read_all()
+    return dict.keys(self)
+
+  def values(self):
+    self._read_all()
+    return dict.values(self)
+
+  def __len__(self):
+    self._read_all()
+    return dict.__len__(self)
+
+  def __copy__(self):
+    # 読んだマスを記録しない普通の dict を返す．
+    # dict.copy は __iter__ を上書きしたサブクラスでは keys() と [] を通るので使わない
+    return dict(dict.items(self))
+
+  copy = __copy__
+
+
+class AttackMap:
+  '''
+  盤面のマスごとの，そのマスを攻撃している駒の表
+
+  Attributes
+  ----------
+  size : int
+    盤面の大きさ．
+  cache : bool
+    False のときは利きを覚えておかず，毎回求める．
+    一度しか使わない仮の盤面に使う．
+  board : Board | None
+    表の盤面．
+  hits, misses : int
+    覚えておいた利きを使えた回数，求め直した回数．
+  listeners : list > [Listener, ...]
+    盤面の書き換えを受け取るもの．
+  '''
+
+  def __init__(self, size: int, cache: bool = True):
+    self.size = size
+    self.cache = cache
+    self.board: Optional[Board] = None
+    self.hits = 0
+    self.misses = 0
+    self.listeners: 'list[Listener]' = []
+    self._reset()
+
+  def _reset(self):
+    self._codes = bytearray(SQUARES)
+    self._colors = bytearray(SQUARES)
+    # {(利きの種類, id(駒)): CacheEntry}
+    self._cache: 'dict[tuple[Kind, int], CacheEntry]' = {}
+    # マスの番号 -> そのマスを読んだ利き
+    self._watchers: 'dict[int, set[tuple[Kind, int]]]' = {}
+    # ミスト・ブリザードを探した利き
+    self._zone_watchers: 'set[tuple[Kind, int]]' = set()
+    # 相手の駒に見立てるための駒 : {(駒のクラス, 駒色): Piece}
+    self._dummies: 'dict[tuple[Type[Piece], Color], Piece]' = {}
+    # 駒色ごとの，マス -> そのマスを攻撃している駒 / 守っている駒
+    self._attackers: 'dict[Color, dict[Position, list[Piece]]]' = {}
+    self._defenders: 'dict[Color, dict[Position, list[Piece]]]' = {}
+    # 駒色ごとの，その色のキングへの利きの情報
+    self._pins: 'dict[Color, Pins]' = {}
+
+  def sync(self, board: Board):
+    '''
+    board の書き換わったマスを表に反映する．
+    初めて見る盤面や，記録していない書き換えがあった盤面では表を作り直す．
+
+    Parameters
+    ----------
+    board : Board
+      盤面．cache が True のときは ArrayBoard．
+    '''
+    if not self.cache:
+      if board is not self.board:
+        self.board = board
+        self._attackers = {}
+        self._defenders = {}
+        self._pins = {}
+      return
+
+    assert isinstance(board, ArrayBoard)
+    changed = board.changed
+    if board is not self.board or changed is None:
+      self._reset()
+      self.board = board
+      board.track_changes()
+      self._codes[:] = board.codes
+      self._colors[:] = board.colors
+      for listener in self.listeners:
+        listener.reset(board)
+      return
+    if not changed:
+      return
+
+    board.changed = set()
+    self._attackers = {}
+    self._defenders = {}
+    self._pins = {}
+    for index in changed:
+      self._update(index, board.codes[index], board.colors[index])
+
+  def _update(self, index: int, code: int, color_code: int):
+    '''マス index の中身が code, color_code になったときに，そのマスを読んだ利きを忘れる'''
+    old_code = self._codes[index]
+    old_color = self._colors[index]
+    self._codes[index] = code
+    self._colors[index] = color_code
+    for listener in self.listeners:
+      listener.update(index, old_code, old_color, code, color_code)
+
+    for key in self._watchers.pop(index, ()):
+      self._cache.pop(key, None)
+    if _is_zone_piece(old_code) or _is_zone_piece(code):
+      for key in self._zone_watchers:
+        self._cache.pop(key, None)
+      self._zone_watchers = set()
+
+  def sees(self, piece: Piece, pos: Position) -> PositionSet:
+    '''
+    piece が盤面で攻撃しているマス．
+    アーチャー系の駒は矢で攻撃できるマス．
+
+    Parameters
+    ----------
+    piece : Piece
+    pos : Position
+      piece の位置．
+    '''
+    return self._lookup(SEES, piece, pos)
+
+  def attack_range(self, piece: Piece, pos: Position) -> PositionSet:
+    '''
+    ほかの駒をすべて相手のポーンとしたときに piece が取れるマス
+    '''
+    return self._lookup(ATTACK_RANGE, piece, pos)
+
+  def defends(self, piece: Piece, pos: Position) -> PositionSet:
+    '''
+    味方の駒をすべて相手の駒としたときに piece が動けるマス．
+    アーチャー系の駒は矢で攻撃できるマス．
+    ここに含まれる味方の駒は piece に守られている．
+    '''
+    return self._lookup(DEFENDS, piece, pos)
+
+  def reaches(
+      self, piece: Piece, pos: Position, board: 'Optional[Board]' = None,
+      changed: 'Iterable[Position]' = (),
+  ) -> PositionSet:
+    '''
+    味方の駒をすべて相手の駒としたときに piece が動けるマス．
+    アーチャー系の駒も矢ではなく駒の移動先．
+    相手の駒なら piece が取れる駒，味方の駒なら piece が守っている駒がいる．
+
+    Parameters
+    ----------
+    piece : Piece
+    pos : Position
+      piece の位置．
+    board : Board | None
+      与えられたとき，表の盤面の changed のマスだけを書き換えた盤面で求める(is_attacked と同じ)．
+    changed : Iterable > [Position, ...]
+      board で書き換えたマス．
+    '''
+    if board is None or board is self.board:
+      return self._lookup(REACHES, piece, pos)
+    changed = set(changed)
+    return self._lookup_changed(REACHES, piece, pos, board, changed,
+                                self._zone_changed(board, changed))
+
+  def attackers(self, color: Color) -> 'dict[Position, list[Piece]]':
+    '''
+    マスごとの，そのマスを攻撃している color 側の駒．
+    駒の順番は盤面の順．
+
+    Parameters
+    ----------
+    color : Color
+      攻撃している側の駒色．
+
+    Returns
+    -------
+    : dict > {Position: [Piece, ...], ...}
+    '''
+    assert self.board is not None
+    table = self._attackers.get(color)
+    if table is None:
+      table = self._attackers[color] = {}
+      for pos, piece in self.board.items():
+        if piece.color == color:
+          for target in self.sees(piece, pos):
+            table.setdefault(target, []).append(piece)
+    return table
+
+  def defenders(self, color: Color) -> 'dict[Position, list[Piece]]':
+    '''
+    マスごとの，そのマスの駒を守っている color 側の駒．
+    マスにある駒自身は含まない．
+
+    Parameters
+    ----------
+    color : Color
+      守っている側の駒色．
+
+    Returns
+    -------
+    : dict > {Position: [Piece, ...], ...}
+
+    Notes
+    -----
+    ミスト・ブリザードを守っている駒は，その駒を相手のポーンとしたときの盤面で求める．
+    霧の範囲がなくなるので defends からは分からない．
+    '''
+    assert self.board is not None
+    table = self._defenders.get(color)
+    if table is None:
+      table = self._defenders[color] = {}
+      own = [(pos, piece) for pos, piece in self.board.items() if piece.color == color]
+      for pos, piece in own:
+        for target in self.defends(piece, pos):
+          if target != pos:
+            table.setdefault(target, []).append(piece)
+      for pos, piece in own:
+        if piece.abbr in ZONE_PIECES:
+          table[pos] = self._zone_defenders(pos, own)
+    return table
+
+  def pins(self, color: Color) -> Pins:
+    '''
+    color 側のキングを攻撃している駒と，その利きが読んだマス
+
+    Parameters
+    ----------
+    color : Color
+      キングの色．
+
+    Returns
+    -------
+    : Pins
+
+    Notes
+    -----
+    駒の利きは読んだマスだけで決まるので，
+    watched に入っていないマスだけを書き換える動きでは相手の利きは変わらない．
+    ライダーならキングとの間にある駒，ホッパーなら飛び越える駒のマスが watched に入る．
+    利きを覚えておけない駒があるときや cache が False のときは exact が False になる．
+    '''
+    assert self.board is not None
+    pins = self._pins.get(color)
+    if pins is not None:
+      return pins
+
+    king = king_position(self.board, color)
+    checkers: 'list[Position]' = []
+    watched: 'dict[Position, list[Position]]' = {}
+    exact = True
+    for pos, piece in self.board.items():
+      if piece.color == color:
+        continue
+      entry = self._entry(SEES, piece, pos)
+      if entry is None:
+        exact = False
+        sees = self.sees(piece, pos)
+      else:
+        sees = entry[3]
+        for read in entry[4]:
+          if read != pos:
+            watched.setdefault(read, []).append(pos)
+      if king is not None and king in sees:
+        checkers.append(pos)
+    pins = self._pins[color] = {
+        'king': king, 'checkers': checkers, 'watched': watched, 'exact': exact}
+    return pins
+
+  def _zone_defenders(self, pos: Position, own: 'list[tuple[Position, Piece]]') -> 'list[Piece]':
+    '''pos にあるミスト・ブリザードを守っている，own の中の駒'''
+    assert self.board is not None
+    board = dict(self.board)
+    board[pos] = self._dummy(Pawn, 'B' if board[pos].color == 'W' else 'W')
+    return [piece for position, piece in own
+            if position != pos and pos in self._compute(DEFENDS, piece, position, board)]
+
+  def is_attacked(
+      self, pos: Position, color: Color, board: 'Optional[Board]' = None,
+      changed: 'Iterable[Position]' = (),
+  ) -> bool:
+    '''
+    pos が color 側の駒のどれかに攻撃されているとき True
+
+    Parameters
+    ----------
+    pos : Position
+      マス．
+    color : Color
+      攻撃している側の駒色．
+    board : Board | None
+      与えられたとき，表の盤面の changed のマスだけを書き換えた盤面で調べる．
+      changed のマスを読んでいない駒は表の利きをそのまま使う．
+    changed : Iterable > [Position, ...]
+      board で書き換えたマス．
+
+    Returns
+    -------
+    : bool
+    '''
+    assert self.board is not None
+    if board is None or board is self.board:
+      return any(piece.color == color and pos in self.sees(piece, position)
+                 for position, piece in self.board.items())
+
+    changed = set(changed)
+    zone_changed = self._zone_changed(board, changed)
+    for position, piece in board.items():
+      if piece.color != color:
+        continue
+      if pos in self._lookup_changed(SEES, piece, position, board, changed, zone_changed):
+        return True
+    return False
+
+  def _zone_changed(self, board: Board, changed: 'set[Position]') -> bool:
+    '''表の盤面から board への書き換え changed でミスト・ブリザードが動いたとき True'''
+    assert self.board is not None
+    return any(getattr(b.get(p), 'abbr', None) in ZONE_PIECES
+               for p in changed for b in (self.board, board))
+
+  def _lookup_changed(
+      self, kind: Kind, piece: Piece, pos: Position, board: Board,
+      changed: 'set[Position]', zone_changed: bool,
+  ) -> PositionSet:
+    '''
+    表の盤面の changed のマスだけを書き換えた盤面 board での piece の利き．
+    changed のマスを読んでいない利きは表のものを使う
+    '''
+    entry = self._entry(kind, piece, pos) if pos not in changed else None
+    if (entry is not None and entry[4].isdisjoint(changed)
+            and not (zone_changed and entry[5])):
+      return entry[3]
+    return self._compute(kind, piece, pos, self._simulated_board(kind, piece, pos, board))
+
+  def _entry(self, kind: Kind, piece: Piece, pos: Position) -> Optional[CacheEntry]:
+    '''覚えておいた piece の利き．なければ求めて覚える．覚えておけないときは None'''
+    if not self.cache or piece.abbr in UNCACHEABLE:
+      return None
+    entry = self._cache.get((kind, id(piece)))
+    if (entry is None or entry[0] is not piece or entry[1] != pos
+            or entry[2] != getattr(piece, 'count', None)):
+      self._lookup(kind, piece, pos)
+      entry = self._cache.get((kind, id(piece)))
+    return entry
+
+  def _lookup(self, kind: Kind, piece: Piece, pos: Position) -> PositionSet:
+    assert self.board is not None
+    cache_key = (kind, id(piece))
+    count = getattr(piece, 'count', None)
+    entry = self._cache.get(cache_key)
+    if (entry is not None and entry[0] is piece and entry[1] == pos and entry[2] == count):
+      self.hits += 1
+      return entry[3]
+
+    self.misses += 1
+    if not self.cache or piece.abbr in UNCACHEABLE:
+      return self._compute(kind, piece, pos, self._simulated_board(kind, piece, pos))
+
+    board = _RecordingBoard(self._simulated_board(kind, piece, pos))
+    # この盤面にはバージョンがないので，駒の移動先のキャッシュは使われず，読むマスがすべて記録される
+    result = self._compute(kind, piece, pos, board)
+    if board.accessed is None:
+      return result
+
+    accessed = frozenset(board.accessed)
+    self._cache[cache_key] = (piece, pos, count, result, accessed, board.scanned)
+    for x, y in accessed:
+      if on_array(x, y):
+        self._watchers.setdefault(square(x, y), set()).add(cache_key)
+    # 自分のいるマスが書き換わったとき(取られたときなど)も求め直す
+    self._watchers.setdefault(square(*pos), set()).add(cache_key)
+    if board.scanned:
+      self._zone_watchers.add(cache_key)
+    return result
+
+  def _compute(self, kind: Kind, piece: Piece, pos: Position, board: Board) -> PositionSet:
+    '''盤面 board で，利きの種類 kind に応じた piece の利きを求める'''
+    if kind in (SEES, DEFENDS) and hasattr(piece, 'archer_dir'):
+      result: PositionSet = set()
+      for moved_pos in piece.available_moves(*pos, board, size=self.size):
+        if moved_pos not in board:
+          result |= arrow_targets_(piece, pos, moved_pos, board, pu.rider)
+      return result
+    if kind == ATTACK_RANGE:
+      return set(piece.available_moves(*pos, board, size=self.size, return_capture=True))
+    return set(piece.available_moves(*pos, board, size=self.size))
+
+  def _simulated_board(
+      self, kind: Kind, piece: Piece, pos: Position, board: 'Optional[Board]' = None,
+  ) -> Board:
+    '''利きの種類 kind に応じて，表の盤面(与えられたときは board)から利きを求めるための盤面を返す'''
+    if board is None:
+      board = self.board
+    assert board is not None
+    if kind == SEES:
+      return board
+    opponent_color: Color = 'B' if piece.color == 'W' else 'W'
+    if kind == ATTACK_RANGE:
+      pawn = self._dummy(Pawn, opponent_color)
+      simulated: 'dict[Position, Piece]' = dict.fromkeys(board, pawn)
+    else:
+      simulated = {p: (self._dummy(type(other), opponent_color) if other.color == piece.color else other)
+                   for p, other in board.items()}
+    simulated[pos] = piece
+    return simulated
+
+  def _dummy(self, cls: Type[Piece], color: Color) -> Piece:
+    '''盤面に置くだけの，クラス cls で色 color の駒'''
+    dummy = self._dummies.get((cls, color))
+    if dummy is None:
+      dummy = self._dummies[(cls, color)] = cls(color)
+    return dummy
+
+
+def _is_zone_piece(code: int) -> bool:
+  '''駒コード code の駒が ZONE_PIECES のとき True'''
+  cls = code_class(code)
+  return cls is not None and cls.abbr in ZONE_PIECES
+
+
+def king_position(board: Board, color: Color) -> Optional[Position]:
+  '''board 上の color 側のキングの位置．いなければ None'''
+  name = f'{color}K'
+  return next((pos for pos, piece in board.items() if piece.name == name), None)
@@ -0,0 +1,157 @@
+'''
+コンピュータの探索をバックグラウンドのスレッドで行う
+
+Notes
+-----
+探索は局面を複製した Game で行うので，そのあいだも元のスレッドで実際の盤面を描画したり，
+イベントを処理したりできる．
+search_workers が 2 以上のときは，このスレッドはプロセスの結果を待つだけになる．
+'''
+
+import threading
+from copy import deepcopy
+from time import perf_counter
+from typing import Optional, Tuple
+
+import computer
+from custom_types import Color, Position, SearchProgress
+from main import Game
+import parallel
+from transposition import Entry
+
+
+class BackgroundSearch:
+  '''
+  コンピュータの手を別のスレッドで探す．concurrent.futures.Future のように結果を待つ
+
+  Attributes
+  ----------
+  color : Color
+    手を探す側の駒色．
+  key : tuple > (int, int)
+    探索を始めた局面のハッシュと手数．
+    結果を使う前に，実際の局面が変わっていないか確かめるのに使う．
+  started : float
+    探索を始めた時刻(time.perf_counter)．
+  stop_at : float | None
+    与えられたとき，この時刻(time.perf_counter)を過ぎたら呼び出し側が stop する．
+  '''
+
+  def __init__(self, game: Game, color: Color, *coef, budget: Optional[float] = None):
+    '''
+    game の局面を複製し，color 側の手を探し始める
+
+    Parameters
+    ----------
+    game : Game
+      実際の局面．探索のあいだは読まない．
+    color : Color
+      駒色．
+    *coef : int, ...
+      調整の係数．与えられないときは computer.choose_move と同じく level から決める．
+    budget : float | None
+      一手あたりの思考時間(秒)．None のときは game.time_budget．
+    '''
+    self.color = color
+    self.key = (game.hash_key(), game.count)
+    self.started = perf_counter()
+    self.stop_at: Optional[float] = None
+    self._game = parallel.restore(deepcopy(parallel.snapshot(game, coef)))
+    self._game.foreseeing = game.foreseeing
+    self._game.time_budget = game.time_budget if budget is None else budget
+    self._game.search_workers = game.search_workers
+    self._game.search_progress = {'depth': 0, 'best': None, 'nodes': 0}
+    self._result: Optional[Tuple[Position, Position]] = None
+    self._error: Optional[BaseException] = None
+    self._cancelled = False
+    self._done = threading.Event()
+    self._thread = threading.Thread(target=self._run, args=coef, name='computer-search', daemon=True)
+    self._thread.start()
+
+  def _run(self, *coef):
+    try:
+      self._result = computer.choose_move(self._game, self.color, *coef)
+    except computer.SearchTimeout:
+      self._result = None
+    except BaseException as error:
+      self._error = error
+    finally:
+      self._done.set()
+
+  def progress(self) -> SearchProgress:
+    '''
+    探索の途中経過
+
+    Returns
+    -------
+    : SearchProgress
+      depth, best は読み始めた深さとそれまでの最善手．nodes はいま探索した局面の数．
+    '''
+    progress = self._game.search_progress
+    assert progress is not None
+    ordering = self._game.ordering
+    return {
+        'depth': progress['depth'],
+        'best': progress['best'],
+        'nodes': max(progress['nodes'], ordering.nodes if ordering is not None else 0),
+    }
+
+  def elapsed(self) -> float:
+    '''探索を始めてからの時間(秒)'''
+    return perf_counter() - self.started
+
+  def done(self) -> bool:
+    '''探索が終わったか(取りやめたときも含む)'''
+    return self._done.is_set()
+
+  def cancelled(self) -> bool:
+    '''探索を取りやめるよう求めたか'''
+    return self._cancelled
+
+  def cancel(self):
+    '''探索を取りやめる．スレッドは次に時間を確かめたところで終わり，結果は捨てる'''
+    self._cancelled = True
+    self._game.search_cancelled = True
+
+  def stop(self):
+    '''
+    探索を打ち切る．スレッドは次に時間を確かめたところで終わり，読み終わった深さの最善手を結果にする．
+    先読みしないときは，結果は None
+    '''
+    self._game.search_cancelled = True
+
+  def extend(self, seconds: float):
+    '''探索を打ち切る時刻を，今から seconds 秒後にする．ルートの手を分けて読むプロセスにも伝わる'''
+    self._game.search_deadline = perf_counter() + seconds
+
+  def probe(self, key: int) -> Optional[Entry]:
+    '''探索の置換表で，ハッシュが key の局面を引く．探索が終わったあとも引ける'''
+    tt = self._game.tt
+    return tt.probe(key) if tt is not None else None
+
+  def result(self, timeout: Optional[float] = None) -> Optional[Tuple[Position, Position]]:
+    '''
+    探索の結果
+
+    Parameters
+    ----------
+    timeout : float | None
+      終わるまで待つ時間(秒)．None のときは終わるまで待つ．
+
+    Returns
+    -------
+    : tuple > ((int, int), (int, int)) | None
+      ((動かす駒の位置), (移動先))．cancel で取りやめたときは None．
+
+    Raises
+    ------
+    TimeoutError
+      timeout までに終わらなかったとき．
+    '''
+    if not self._done.wait(timeout):
+      raise TimeoutError
+    if self._error is not None:
+      raise self._error
+    if self.cancelled():
+      return None
+    return self._result
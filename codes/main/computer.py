@@ -1,13 +1,40 @@
 '''コンピュータ対戦モード'''
 
 
-from copy import deepcopy
+from copy import copy
 from random import choice, randint
+from time import perf_counter
+from typing import Optional, cast
 
-from custom_types import Color, Board
+from custom_types import Color, Position
+from pieces.piece import Piece
 from pieces.pieces import Pawn
 from main import opponent
-from utils import value
+from evaluation import IncrementalEvaluation
+from ordering import MoveOrdering
+from transposition import TranspositionTable, Bound, Entry, EXACT, LOWER, UPPER
+from utils import arrow_targets_
+import pieces.piece_utils as pu
+import parallel
+
+# レベルごとの一手あたりの思考時間(秒)
+TIME_BUDGET: 'dict[int, float]' = {1: 1.0, 2: 2.0, 3: 4.0, 4: 6.0, 5: 10.0}
+# 反復深化で読む最大の深さ
+MAX_DEPTH = 10
+# 静止探索のデルタ枝刈りの余裕(駒の価値)
+DELTA_MARGIN = 2.0
+
+
+class SearchTimeout(Exception):
+  '''思考時間を使い切ったときや，取りやめるよう求められたときに探索を打ち切るための例外'''
+
+
+def _check_search(self):
+  '''思考時間を使い切ったか，探索を取りやめるよう求められたとき SearchTimeout を投げる'''
+  if (self.search_cancelled
+          or (self.search_deadline is not None and perf_counter() > self.search_deadline)
+          or (self.search_stale is not None and self.search_stale())):
+    raise SearchTimeout
 
 
 def cpu_static_value(self, color: Color, count: int, *coef):
@@ -38,7 +65,8 @@ def cpu_static_value(self, color: Color, count: int, *coef):
 
   Utens
   -----
-  can_see_square
+  attacks
+  evaluation
   gameboard
   valid_moves
   level
@@ -67,13 +95,24 @@ def cpu_static_value(self, color: Color, count: int, *coef):
     セブンスルーク(10)
   [lv.5]
     ルーク・クイーンを縦横に重ねる(2)
+
+  駒の価値の合計，ポーン・マイナーピース・ルーク・キングの位置は
+  evaluation が書き換わったマスから差分で更新する．
+  駒ごとの利きは attacks の表を引く．
+  駒の交換の損得，スキュア，相手のキングのモビリティ，チェックメイトは毎回求める．
   '''
   _size: int = self.kind['size']
-  _board: Board = self.gameboard
+  _board = self.gameboard
   _level: int = self.level
-  _can_see_sq = self.can_see_square
   _valid_moves = self.valid_moves
-  _board = self.gameboard
+
+  # 駒の価値や利きは盤面の書き換わったところだけ更新する
+  attacks = self.attacks()
+  if self.evaluation is None or self.evaluation.attacks is not attacks:
+    self.evaluation = IncrementalEvaluation(attacks)
+  ev: IncrementalEvaluation = self.evaluation
+  endgame = len(_board) <= _size**2 / 6
+  opening = count <= _size * 3 / 2
 
   # 重要度順
   threatened = {}
@@ -94,91 +133,80 @@ def cpu_static_value(self, color: Color, count: int, *coef):
   minor_front = 0
 
   # 自分のトータルスコアと相手のトータルスコアの差
-  value_dif = value(color, _board) - value(opponent[color], _board)
+  value_dif = ev.value(color) - ev.value(opponent[color])
 
-  # 盤面上のそれぞれの駒の位置，種類について
+  # [終盤]ポーンを突く
+  if endgame:
+    pawn_advancing = ev.pawn_advancing(color)
+
+  own: 'list[tuple[Position, Piece]]' = []
+  others: 'list[tuple[Position, Piece]]' = []
   for pos, piece in _board.items():
-    # 自分の色の駒であるとき
-    if piece.color == color:
-      # 駒が自分のポーンであるとき
-      if piece.abbr == 'P':
-        # [終盤]ポーンを突く
-        if len(_board) <= _size**2 / 6:
-          pawn_advancing += pos[1] if color == 'W' else 7 - pos[1]
+    (own if piece.color == color else others).append((pos, piece))
+
+  # マスごとの，そのマスを攻撃している相手の駒・自分の駒，守っている自分の駒
+  seen_by_opponent = attacks.attackers(opponent[color])
+  seen_by_own = attacks.attackers(color)
+  defended_by = attacks.defenders(color)
 
+  for pos, piece in own:
   # 攻撃にさらされている駒がある(-)
-      # その駒を攻撃している相手の色の駒のリスト
-      threatening_pieces = list(_can_see_sq(pos,
-                                            [(position, piece) for position, piece in _board.items()
-                                             if piece.color == opponent[color]],
-                                            _board))
-      tmp = deepcopy(_board)
-      # その駒を仮に相手色のポーンとして見てみる
-      tmp[pos] = Pawn(opponent[color])
-      # その駒を攻撃している(守っている)自分の色の駒のリスト
-      defending_pieces = list(_can_see_sq(pos,
-                                          [(position, piece) for position, piece in tmp.items()
-                                           if piece.color == color],
-                                          tmp))
-      # その駒が相手の色の駒のどれかに攻撃されているとき
-      if threatening_pieces:
-        threatening_pieces_values = list(map(lambda x: x.value, threatening_pieces))
-        threatened[pos] = piece.value
-        # 味方の駒に守られている(敵駒だったらそれを攻撃できる味方駒があるか)
-        # その駒が自分の色の駒のどれかに攻撃されている(守られている)とき
-        if defending_pieces:
-          defending_pieces_values = list(map(lambda x: x.value, defending_pieces))
-          # 駒の交換が起こり得る最大の回数
-          exchange_number = min(len(threatening_pieces_values), len(defending_pieces_values))
-          balance = 0
-          for number in range(exchange_number):
-            # 黒白それぞれが最小価値の駒で交換をしかけたときの損得
-            # number + 1 と number でずれるのは，攻防が同量だった場合最後にこちらに1つ駒が残るからその分を除いている
-            balance = sum(sorted(threatening_pieces_values)[:(number + 1)]) \
-                - sum(sorted(defending_pieces_values)[:number])
-            # 交換途中で相手のほうが得をして交換に乗らなくなるとき
-            if balance < 0:
-              balance = 0
-              break
-          threatened[pos] = max(0, threatened[pos] - balance)
+    # その駒を攻撃している相手の色の駒のリスト
+    threatening_pieces = seen_by_opponent.get(pos, [])
+    # その駒を攻撃している(守っている)自分の色の駒のリスト
+    defending_pieces = defended_by.get(pos, [])
+    # その駒が相手の色の駒のどれかに攻撃されているとき
+    if threatening_pieces:
+      threatening_pieces_values = sorted(x.value for x in threatening_pieces)
+      threatened[pos] = piece.value
+      # 味方の駒に守られている(敵駒だったらそれを攻撃できる味方駒があるか)
+      # その駒が自分の色の駒のどれかに攻撃されている(守られている)とき
+      if defending_pieces:
+        defending_pieces_values = sorted(x.value for x in defending_pieces)
+        # 駒の交換が起こり得る最大の回数
+        exchange_number = min(len(threatening_pieces_values), len(defending_pieces_values))
+        balance = 0
+        for number in range(exchange_number):
+          # 黒白それぞれが最小価値の駒で交換をしかけたときの損得
+          # number + 1 と number でずれるのは，攻防が同量だった場合最後にこちらに1つ駒が残るからその分を除いている
+          balance = sum(threatening_pieces_values[:(number + 1)]) \
+              - sum(defending_pieces_values[:number])
+          # 交換途中で相手のほうが得をして交換に乗らなくなるとき
+          if balance < 0:
+            balance = 0
+            break
+        threatened[pos] = max(0, threatened[pos] - balance)
 
   # [lv.2]自分の弱い駒を守る
-      if _level >= 2:
-        # その駒が自分の色の駒のどれかに攻撃されている(守られている)とき
-        if defending_pieces:
-          # 評価値に加算
-          defended += 1
+    if _level >= 2:
+      # その駒が自分の色の駒のどれかに攻撃されている(守られている)とき
+      if defending_pieces:
+        # 評価値に加算
+        defended += 1
 
   # [lv.3]自分の攻撃範囲(序盤は中央の支配範囲)
-        # その駒を以外すべてを仮に相手色のポーンとして見てみる
-        tmp: Board = {position: Pawn(opponent[color])
-                      for position in _board}
-        tmp[pos] = piece
-        if hasattr(piece, 'count'):
-          piece_attack_range = piece.available_moves(*pos, tmp,
-                                                     size=_size,
-                                                     return_capture=True)
-        else:
-          piece_attack_range = piece.available_moves(*pos, tmp,
-                                                     size=_size,
-                                                     return_capture=True)
-        # 序盤
-        if count <= _size * 3 / 2:
-          for x, y in piece_attack_range:
-            if (_size / 4 <= x < _size * 3 / 4
-                    and _size / 4 <= y < _size * 3 / 4):
-              attack_range += 1
-        else:
-          attack_range += len(piece_attack_range)
+      # その駒以外すべてを仮に相手色のポーンとして見たときの攻撃範囲
+      piece_attack_range = attacks.attack_range(piece, pos)
+      # 序盤
+      if opening:
+        for x, y in piece_attack_range:
+          if (_size / 4 <= x < _size * 3 / 4
+                  and _size / 4 <= y < _size * 3 / 4):
+            attack_range += 1
+      else:
+        attack_range += len(piece_attack_range)
 
   # [lv.3]スキュア/ピンを決めている
   # pos, piece -> スキュア/ピンを決めている駒
-      if _level >= 3:
-        # 攻撃されている駒の位置・名前
-        attacked = [position
-                    for position in _valid_moves(piece, pos)
-                    if position in _board]
-        tmp = deepcopy(_board)
+    if _level >= 3:
+      # 攻撃されている駒の位置・名前
+      attacked = [position
+                  for position in _valid_moves(piece, pos)
+                  if position in _board]
+      # 攻撃されている駒がなければ，取り除いても盤面は変わらないので背後の駒もない
+      if attacked:
+        # 駒オブジェクトは共有し，盤面だけ浅くコピーする
+        tmp = copy(_board)
         # 攻撃されている(スキュア/ピンを決められて(動けなくなって)いる)駒の位置それぞれについて
         for m_pos in attacked:
           # 攻撃されている駒を取り除いてみる
@@ -187,64 +215,60 @@ def cpu_static_value(self, color: Color, count: int, *coef):
         skewered = {tmp[position].name: tmp[position]
                     for position in _valid_moves(piece, pos, tmp)
                     if position in tmp}
-        # 攻撃されている駒の名前リスト
-        skwd_pieces = skewered.keys()
-        # スキュア/ピンされている背後の駒の価値の総和が評価値
-        skewer += sum([skewered[skwd_piece].value for skwd_piece in skwd_pieces])
-        # 絶対ピンは高評価
-        if 'K' in (skwd_piece[1:] for skwd_piece in skwd_pieces):
-          skewer += 10
-
-  # [lv.4][序盤]マイナーピース（ナイト・ビショップ）を前に出す
-      if _level >= 4:
-        if count <= _size * 3 / 2:
-          if piece.abbr in ('N', 'B'):
-            if ((piece.color == 'W' and pos[1] > 1)
-                    or (piece.color == 'B' and pos[1] < _size - 2)):
-              minor_front += 1
+      else:
+        skewered = {}
+      # 攻撃されている駒の名前リスト
+      skwd_pieces = skewered.keys()
+      # スキュア/ピンされている背後の駒の価値の総和が評価値
+      skewer += sum([skewered[skwd_piece].value for skwd_piece in skwd_pieces])
+      # 絶対ピンは高評価
+      if 'K' in (skwd_piece[1:] for skwd_piece in skwd_pieces):
+        skewer += 10
 
   # [lv.5]ルーク・クイーンを縦横に重ねる
-      if _level >= 5:
-        if piece.abbr in ('R', 'Q'):
-          defending_pieces_names = map(lambda x: x.abbr, defending_pieces)
-          if 'R' in defending_pieces_names:
-            cross_connection += 1
-          if 'Q' in defending_pieces_names:
-            cross_connection += 1
-
-    # 相手の色の駒であるとき
-    if piece.color == opponent[color]:
-      # [lv.2]相手の駒を攻撃する
-      if _level >= 2:
-        if list(_can_see_sq(pos,
-                [(position, piece) for position, piece in _board.items()
-                    if piece.color == color],
-                _board)):
-          if piece.abbr != 'K':
-            threatening += piece.value
+    if _level >= 5:
+      if piece.abbr in ('R', 'Q'):
+        defending_pieces_names = map(lambda x: x.abbr, defending_pieces)
+        if 'R' in defending_pieces_names:
+          cross_connection += 1
+        if 'Q' in defending_pieces_names:
+          cross_connection += 1
+
+  for pos, piece in others:
+    # [lv.2]相手の駒を攻撃する
+    if _level >= 2:
+      if pos in seen_by_own and piece.abbr != 'K':
+        threatening += piece.value
 
   # [終盤]相手のキングのモビリティ(-)
-      if len(_board) <= _size**2 / 6:
-        if piece.abbr == 'K':
-          opponent_king_mobility = len(_valid_moves(piece, pos))
+    if endgame:
+      if piece.abbr == 'K':
+        opponent_king_mobility = len(_valid_moves(piece, pos))
+
+  # [lv.4][序盤]マイナーピース（ナイト・ビショップ）を前に出す
+  if _level >= 4 and opening:
+    minor_front = ev.minor_front[color]
 
   threatened_value = sum(threatened.values())
 
   # [終盤]自分のキングを相手のキングに近づける(距離，-)
-  if len(_board) <= _size**2 / 6:
-    king_pos = [pos for pos, piece in _board.items() if piece.abbr == 'K']
+  if endgame:
+    king_pos = [pos for pos in (ev.king_position('W'), ev.king_position('B')) if pos is not None]
+    if len(king_pos) < 2:
+      king_pos = [pos for pos, piece in _board.items() if piece.abbr == 'K']
     king_dist = (king_pos[0][0] - king_pos[1][0])**2 + (king_pos[0][1] - king_pos[1][1])**2
 
   # [lv.3][終盤]チェックメイトしよう・ステイルメイトは避けよう
     if _level >= 3:
-      if self.cannot_move(opponent[color], _board):
-        if self.is_stalemate(opponent[color], _board):
+      if self.cannot_move(opponent[color]):
+        if self.is_stalemate(opponent[color]):
           stalemate = 1
         else:
           checkmate = 1
 
   # チェックできる
-  if self.is_check(opponent[color], _board):
+  opponent_king = ev.king_position(opponent[color])
+  if opponent_king in seen_by_own:
     checking = 1
 
   # [lv.2]キャスリング済
@@ -259,15 +283,11 @@ def cpu_static_value(self, color: Color, count: int, *coef):
 
   # [lv.4]セブンスルーク(相手の陣地最奥から２番目に自分のルーク)
   if _level >= 4:
-    seventh_pos = 1 if color == 'B' else _size - 2
-    seventh_pieces = [piece.abbr
-                      for pos, piece in _board.items()
-                      if pos[1] == seventh_pos]
-    if 'R' in seventh_pieces:
+    if ev.rooks_on_rank[1 if color == 'B' else _size - 2]:
       rook_on_the_seventh = 1
 
   # 終盤補正
-  if len(_board) <= _size**2 / 6:
+  if endgame:
     value_dif *= 2
     threatened_value *= 2
     rook_on_the_seventh /= 10
@@ -307,13 +327,10 @@ def best_move(self, color: Color, *rand):
   -----
   valid_moves
   cpu_static_value
-  main
-  prev_move
+  make_move
+  unmake_move
   gameboard
   count
-  startpos
-  endpos
-  move_record
   '''
   best_move_dict = {}
   choices_list = {pos: self.valid_moves(piece, pos)
@@ -322,14 +339,13 @@ def best_move(self, color: Color, *rand):
                   and self.valid_moves(piece, pos)}
 
   for startpos, dest in choices_list.items():
+    _check_search(self)
     for endpos in dest:
       # print(startpos, endpos)
-      self.startpos, self.endpos = startpos, endpos
-      self.main()
+      undo = self.make_move(startpos, endpos)
       best_move_dict[(startpos, endpos)] \
           = cpu_static_value(self, color, self.count, *rand)
-      self.prev_move()
-      self.move_record.pop(self.count + 1, None)
+      self.unmake_move(undo)
 
   if not best_move_dict:
     _ = choice(list(choices_list.items()))
@@ -366,49 +382,57 @@ def max_(self, alpha: int, beta: int, depth: int, color: Color, count: int, *ran
 
   Usus
   ----
-  interact / Draw / computer_move
+  iterative_deepening
+  min_
 
   Utens
   -----
   cpu_static_value
   valid_moves
-  main
+  make_move
   min_
-  prev_move
+  unmake_move
+  hash_key
   gameboard
-  startpos
-  endpos
-  move_record
   count
+  search_deadline
+  search_cancelled
+  tt
   '''
   maxv = -9999
   start = None
   end = None
-  evaluation = cpu_static_value(self, color, count, *rand)
+  _check_search(self)
+  if self.ordering is not None:
+    self.ordering.nodes += 1
+  # 置換表に読みの深さが足りる結果があればそれを使う
+  key = self.hash_key()
+  entry = self.tt.probe(key) if self.tt is not None else None
+  if entry is not None and self.tt.cutoff(entry, depth, alpha, beta):
+    return entry[2], entry[4][0], entry[4][1]
+  alpha_orig = alpha
   # 読み深さに達する前
   if depth > 0:
-    choices_list = {pos: self.valid_moves(piece, pos)
-                    for pos, piece in self.gameboard.items()
-                    if piece.color == color
-                    and self.valid_moves(piece, pos)}
-    for startpos, dest in choices_list.items():
-      for endpos in dest:
-        self.startpos, self.endpos = startpos, endpos
-        self.main()
+    for startpos, endpos in _ordered_moves(self, color, entry):
+      undo = self.make_move(startpos, endpos)
+      try:
         m = min_(self, alpha, beta, depth - 1, opponent[color], count + 1, *rand)[0]
-        if m > maxv:
-          maxv = m
-          start, end = startpos, endpos
-        self.prev_move()
-        self.move_record.pop(self.count + 1, None)
-        if maxv >= beta:
-          return maxv, start, end
-        if maxv > alpha:
-          alpha = maxv
+      finally:
+        self.unmake_move(undo)
+      if m > maxv:
+        maxv = m
+        start, end = startpos, endpos
+      if maxv >= beta:
+        if self.ordering is not None:
+          self.ordering.cutoff(self.gameboard, (startpos, endpos), self.count, depth)
+        return _stored(self, key, depth, maxv, LOWER, start, end)
+      if maxv > alpha:
+        alpha = maxv
   # 読み深さに達した
   else:
-    maxv = evaluation
-  return maxv, start, end
+    maxv = quiesce_max(self, alpha, beta, self.quiescence_depth, color, count, *rand)
+  return _stored(self, key, depth, maxv,
+                 LOWER if maxv >= beta else EXACT if maxv > alpha_orig else UPPER, start, end)
 
 
 def min_(self, alpha: int, beta: int, depth: int, color: Color, count: int, *rand):
@@ -435,62 +459,436 @@ def min_(self, alpha: int, beta: int, depth: int, color: Color, count: int, *ran
 
   Usus
   ----
-  interact / Draw / computer_move
+  max_
 
   Utens
   -----
   cpu_static_value
   valid_moves
-  main
+  make_move
   max_
-  prev_move
+  unmake_move
+  hash_key
   gameboard
-  startpos
-  endpos
-  move_record
   count
+  search_deadline
+  search_cancelled
+  tt
   '''
   minv = 9999
   start = None
   end = None
-  evaluation = cpu_static_value(self, color, count, *rand)
+  _check_search(self)
+  if self.ordering is not None:
+    self.ordering.nodes += 1
+  # 置換表に読みの深さが足りる結果があればそれを使う
+  key = self.hash_key()
+  entry = self.tt.probe(key) if self.tt is not None else None
+  if entry is not None and self.tt.cutoff(entry, depth, alpha, beta):
+    return entry[2], entry[4][0], entry[4][1]
+  beta_orig = beta
   # 読み深さに達する前
   if depth > 0:
-    choices_list = {pos: self.valid_moves(piece, pos)
-                    for pos, piece in self.gameboard.items()
-                    if piece.color == color
-                    and self.valid_moves(piece, pos)}
-    for startpos, dest in choices_list.items():
-      for endpos in dest:
-        self.startpos, self.endpos = startpos, endpos
-        self.main()
+    for startpos, endpos in _ordered_moves(self, color, entry):
+      undo = self.make_move(startpos, endpos)
+      try:
         m = max_(self, alpha, beta, depth - 1, opponent[color], count + 1, *rand)[0]
-        if m < minv:
-          minv = m
-          start, end = startpos, endpos
-        self.prev_move()
-        self.move_record.pop(self.count + 1, None)
-        if minv <= alpha:
-          return minv, start, end
-        if minv < beta:
-          beta = minv
+      finally:
+        self.unmake_move(undo)
+      if m < minv:
+        minv = m
+        start, end = startpos, endpos
+      if minv <= alpha:
+        if self.ordering is not None:
+          self.ordering.cutoff(self.gameboard, (startpos, endpos), self.count, depth)
+        return _stored(self, key, depth, minv, UPPER, start, end)
+      if minv < beta:
+        beta = minv
   # 読み深さに達した
   else:
-    minv = evaluation
-  return minv, start, end
+    minv = quiesce_min(self, alpha, beta, self.quiescence_depth, color, count, *rand)
+  return _stored(self, key, depth, minv,
+                 UPPER if minv <= alpha else EXACT if minv < beta_orig else LOWER, start, end)
 
 
-def computer_move(self):
-  '''コンピュータの動き'''
+def quiesce_max(self, alpha: float, beta: float, depth: int, color: Color, count: int, *rand):
+  '''
+  静止探索．max_ の読み深さに達した局面から，駒を取る手だけを depth 手先まで読んで評価値を出力
+
+  Parameters
+  ----------
+  self : obj
+    基底のオブジェクト．
+    属性取り出し用．
+  alpha, beta : float
+  depth : int
+    駒を取る手を何手先まで読むか．0 のときは cpu_static_value と同じ．
+  color : Color
+    駒色．自分の駒色．
+  count : int
+    開始からの手数．cpu_static_value のために必要．
+  *rand : int, ...
+    調整の係数．
+
+  Returns
+  -------
+  : float
+
+  Usus
+  ----
+  max_
+  quiesce_min
+
+  Utens
+  -----
+  cpu_static_value
+  make_move
+  unmake_move
+  is_check
+  quiesce_min
+  search_deadline
+  search_cancelled
+
+  Notes
+  -----
+  駒を取らずにそのままの評価値で止まること(stand pat)を常に選べるものとする．
+  取った駒の価値を足してもαに届かない手は読まない(デルタ枝刈り)．
+  '''
+  _check_search(self)
+  if self.ordering is not None:
+    self.ordering.nodes += 1
+  stand_pat = cpu_static_value(self, color, count, *rand)
+  if depth <= 0 or stand_pat >= beta:
+    return stand_pat
+  alpha = max(alpha, stand_pat)
+  for startpos, endpos, arrow, gain in _capture_moves(self, color):
+    # デルタ枝刈り
+    if stand_pat + (gain + DELTA_MARGIN) * _value_coef(rand) <= alpha:
+      break
+    undo = self.make_move(startpos, endpos, arrow=arrow)
+    try:
+      if arrow is not None and self.is_check(color, self.gameboard):
+        continue
+      v = quiesce_min(self, alpha, beta, depth - 1, opponent[color], count + 1, *rand)
+    finally:
+      self.unmake_move(undo)
+    if v >= beta:
+      return v
+    alpha = max(alpha, v)
+  return alpha
+
+
+def quiesce_min(self, alpha: float, beta: float, depth: int, color: Color, count: int, *rand):
+  '''
+  静止探索．min_ の読み深さに達した局面から，駒を取る手だけを depth 手先まで読んで評価値を出力
+
+  Parameters
+  ----------
+  self : obj
+    基底のオブジェクト．
+    属性取り出し用．
+  alpha, beta : float
+  depth : int
+    駒を取る手を何手先まで読むか．
+  color : Color
+    駒色．相手の駒色．評価値は自分の駒色から見たもの．
+  count : int
+    開始からの手数．cpu_static_value のために必要．
+  *rand : int, ...
+    調整の係数．
+
+  Returns
+  -------
+  : float
+
+  Usus
+  ----
+  min_
+  quiesce_max
+
+  Utens
+  -----
+  cpu_static_value
+  make_move
+  unmake_move
+  is_check
+  quiesce_max
+  search_deadline
+  search_cancelled
+  '''
+  _check_search(self)
+  if self.ordering is not None:
+    self.ordering.nodes += 1
+  stand_pat = cpu_static_value(self, opponent[color], count, *rand)
+  if depth <= 0 or stand_pat <= alpha:
+    return stand_pat
+  beta = min(beta, stand_pat)
+  for startpos, endpos, arrow, gain in _capture_moves(self, color):
+    # デルタ枝刈り
+    if stand_pat - (gain + DELTA_MARGIN) * _value_coef(rand) >= beta:
+      break
+    undo = self.make_move(startpos, endpos, arrow=arrow)
+    try:
+      if arrow is not None and self.is_check(color, self.gameboard):
+        continue
+      v = quiesce_max(self, alpha, beta, depth - 1, opponent[color], count + 1, *rand)
+    finally:
+      self.unmake_move(undo)
+    if v <= alpha:
+      return v
+    beta = min(beta, v)
+  return beta
+
+
+def _capture_moves(self, color: Color) -> 'list[tuple[Position, Position, Optional[Position], float]]':
+  '''
+  color 側の駒を取る手を，取る駒の価値が高い順に返す
+
+  Returns
+  -------
+  : list > [(開始位置, 終了位置, 矢で取る駒の位置 | None, 取る駒の価値), ...]
+
+  Notes
+  -----
+  valid_moves の移動先に相手の駒があれば駒を取る手とする．
+  タンクやライオンのように動き方と取り方が違う駒も，valid_moves がその駒の取り方で返すのでそのまま扱える．
+  アンパッサンと，アーチャー系駒が動いたあとに矢で取る手も含める．
+  '''
+  board = self.gameboard
+  moves: 'list[tuple[Position, Position, Optional[Position], float, float]]' = []
+  for startpos, piece in list(board.items()):
+    if piece.color != color:
+      continue
+    for endpos in self.valid_moves(piece, startpos):
+      target = board.get(endpos)
+      if target is not None and endpos != startpos:
+        moves.append((startpos, endpos, None, target.value, piece.value))
+      elif self.en_passant_requirements(piece, startpos, endpos):
+        moves.append((startpos, endpos, None, Pawn.value, piece.value))
+      elif target is None and hasattr(piece, 'archer_dir'):
+        # 移動で取ったときには矢は撃てない
+        for arrow in arrow_targets_(piece, startpos, endpos, board, pu.rider):
+          if arrow != startpos and board[arrow].color != color:
+            moves.append((startpos, endpos, arrow, board[arrow].value, piece.value))
+  moves.sort(key=lambda move: (-move[3], move[4]))
+  return [move[:4] for move in moves]
+
+
+def _value_coef(rand) -> float:
+  '''cpu_static_value で駒の価値の差にかかる係数(終盤補正を含む)'''
+  return 2 * rand[0] if rand else 2
+
+
+def _ordered_moves(self, color: Color, entry: Optional[Entry]) -> 'list[tuple[Position, Position]]':
+  '''
+  color 側の動きを読む順に並べて返す．
+  置換表に前の反復などでの最善手があれば，それを最初に読む．
+  '''
+  moves = [(startpos, endpos)
+           for startpos, piece in list(self.gameboard.items())
+           if piece.color == color
+           for endpos in self.valid_moves(piece, startpos)]
+  hash_move = cast('Optional[tuple[Position, Position]]', entry[4] if entry is not None else None)
+  if self.ordering is not None:
+    return self.ordering.order(moves, self.gameboard, self.count, hash_move)
+  if hash_move in moves:
+    moves.remove(hash_move)
+    moves.insert(0, hash_move)
+  return moves
+
+
+def search_stats(self) -> 'dict[str, float]':
+  '''
+  直前の探索の統計
+
+  Returns
+  -------
+  : dict
+    nodes -- 探索した局面の数
+    tt_hits, tt_misses -- 置換表で局面が見つかった回数，見つからなかった回数
+    legal_free, legal_refuted, legal_simulated, legal_fallback
+      -- 合法手の判定をそれぞれの方法でした手の数(Game.legality_counts)
+  '''
+  return {
+      'nodes': self.ordering.nodes if self.ordering is not None else 0,
+      'tt_hits': self.tt.hits if self.tt is not None else 0,
+      'tt_misses': self.tt.misses if self.tt is not None else 0,
+      **{f'legal_{key}': count for key, count in self.legality_counts.items()},
+  }
+
+
+def _stored(
+    self, key: int, depth: int, score: float, bound: Bound,
+    start: Optional[Position], end: Optional[Position],
+):
+  '''探索結果を置換表に書き込んでから返す'''
+  if self.tt is not None:
+    self.tt.store(key, depth, score, bound, (start, end))
+  return score, start, end
+
+
+def search_root(self, depth: int, color: Color, count: int, *rand):
+  '''
+  depth 手先まで読んで，最善の手を出力．
+  search_workers が 2 以上のときは，ルートの手をプロセスに分けて読む(parallel.search_root)
+
+  Returns
+  -------
+  (maxv, start, end) : tuple > (float, (int, int), (int, int))
+    max_ と同じ．
+
+  Notes
+  -----
+  深さ 1 はプロセスに渡すほうが時間がかかるので，いつも max_ で読む．
+  '''
+  if self.search_workers > 1 and depth > 1:
+    return parallel.search_root(self, depth, color, count, *rand)
+  return max_(self, -9999, 9999, depth, color, count, *rand)
+
+
+def _report(self, depth: int, start: Optional[Position], end: Optional[Position]):
+  '''search_progress があれば，読んでいる深さとそれまでの最善手を書き込む'''
+  if self.search_progress is None:
+    return
+  self.search_progress['depth'] = depth
+  if start is not None and end is not None:
+    self.search_progress['best'] = (start, end)
+  self.search_progress['nodes'] = self.ordering.nodes if self.ordering is not None else 0
+
+
+def iterative_deepening(self, color: Color, count: int, *rand):
+  '''
+  反復深化により，思考時間の範囲でできるだけ深く読んで最善の手を出力
+
+  Parameters
+  ----------
+  self : obj
+    基底のオブジェクト．
+    属性取り出し用．
+  color : Color
+    駒色．
+  count : int
+    開始からの手数．cpu_static_value のために必要．
+  *rand : int, ...
+    調整の係数．
+
+  Returns
+  -------
+  (start, end) : tuple > ((int, int), (int, int))
+    最後に読み終わった深さでの最善手．
+
+  Usus
+  ----
+  choose_move
+
+  Utens
+  -----
+  _ordered_moves
+  search_root
+  level
+  time_budget
+  quiescence_depth
+  search_deadline
+  search_cancelled
+  tt
+
+  Notes
+  -----
+  深さ 1 から読み，思考時間を超えたときは打ち切ってひとつ浅い深さの結果を使う．
+  深さ 1 も読み終わらなかったときは，手を並べ替えて最初に読む手を返す．
+  search_progress があれば，深さを読み始めるたびに深さと最善手を書き込む．
+  前の深さの最善手は置換表に残るので，次の深さではそれを最初に読む．
+  '''
+  budget = self.time_budget
+  if budget is None:
+    budget = TIME_BUDGET.get(self.level, TIME_BUDGET[max(TIME_BUDGET)])
+  started = perf_counter()
+  # 読み終わらなかったときに返す手
+  entry = self.tt.probe(self.hash_key()) if self.tt is not None else None
+  moves = _ordered_moves(self, color, entry)
+  start, end = moves[0] if moves else (None, None)
+  self.search_deadline = started + budget
+  try:
+    for depth in range(1, MAX_DEPTH + 1):
+      _report(self, depth, start, end)
+      _, _start, _end = search_root(self, depth, color, count, *rand)
+      if _start is None:
+        break
+      start, end = _start, _end
+      # 次の深さは少なくともここまでと同じくらいかかるので，間に合わないなら読まない
+      elapsed = perf_counter() - started
+      if elapsed * 2 > budget:
+        break
+  except SearchTimeout:
+    pass
+  finally:
+    self.search_deadline = None
+  return start, end
+
+
+def cpu_coef(level: int) -> 'tuple[int, int, int]':
+  '''cpu_static_value の調整の係数を，強さ level に応じて乱数で決める'''
+  return randint(5 * level, 35), randint(5 * level, 35), randint(2, 6)
+
+
+def choose_move(self, color: Color, *coef):
+  '''
+  color 側のコンピュータの手を選ぶ．盤面は動かさない
+
+  Parameters
+  ----------
+  self : obj
+    基底のオブジェクト．
+    属性取り出し用．
+  color : Color
+    駒色．
+  *coef : int, ...
+    調整の係数．与えられないときは cpu_coef で決める．
+
+  Returns
+  -------
+  (start, end) : tuple > ((int, int), (int, int))
+
+  Usus
+  ----
+  computer_move
+  selfplay
+
+  Utens
+  -----
+  iterative_deepening
+  best_move
+  level
+  foreseeing
+  count
+  '''
+  # 評価の係数が毎回変わるので，置換表は手ごとに作り直す
+  self.tt = TranspositionTable(self.tt_size_mb)
+  self.ordering = MoveOrdering(self.move_ordering)
+  self.legality_counts = dict.fromkeys(self.legality_counts, 0)
+  if not coef:
+    coef = cpu_coef(self.level)
   if self.foreseeing:
-    _, self.startpos, self.endpos \
-        = max_(self, -9999, 9999, 2, opponent[self.my_color],
-               randint(5 * self.level, 35), randint(5 * self.level, 35), randint(2, 6))
-  else:
-    self.startpos, self.endpos \
-        = best_move(self, opponent[self.my_color],
-                    randint(5 * self.level, 35), randint(5 * self.level, 35), randint(2, 6))
+    return iterative_deepening(self, color, self.count, *coef)
+  return best_move(self, color, *coef)
+
+
+def play_move(self, startpos: Position, endpos: Position):
+  '''
+  コンピュータの選んだ手を盤面に指し，駒を動かすアニメーションを始める
+
+  Usus
+  ----
+  computer_move
+  interact / Draw
+  '''
+  self.startpos, self.endpos = startpos, endpos
   self.main()
   self.time = 0
   self.moving = True
   self.computer_moving = False
+
+
+def computer_move(self):
+  '''コンピュータの動き．手を選び終わるまで戻らない'''
+  play_move(self, *choose_move(self, opponent[self.my_color]))
@@ -1,3 +1,6 @@
+from time import perf_counter
+from typing import Optional
+
 import pygame.display
 import pygame.draw
 from pygame.math import Vector2
@@ -6,12 +9,15 @@ import pygame.surface
 import pygame.time
 import pygame.transform
 
+from background import BackgroundSearch
 import computer
 from config import (FONT_EN_16, FONT_EN_24, FONT_EN_32, FONT_JA_24, FONT_JA_32,
                     BLACK, BROWN, CORAL, IVORY, LIGHTGREEN, ORANGE, PURPLE, WHITE, WISTARIA)
 import draw_utils as du
+from engine import notation
 from games import games
-from main_config import game, screen, check_snd, move_snd, play
+from main_config import game, screen, check_snd, move_snd, opponent, play
+from ponder import Ponder
 import utils
 
 
@@ -114,6 +120,7 @@ def _draw_computer_settings():
   '''コンピュータのレベルや先読みの有無を設定する部分を描画する'''
   _level = game.level
   _foreseeing = game.foreseeing
+  _pondering = game.pondering
   if _level == 0:
     return
 
@@ -140,6 +147,14 @@ def _draw_computer_settings():
   du.draw_button(screen, '✓' if _foreseeing else '  ',
                  du.resize(300, 840), du.resize(40, 40), color=BROWN, font=FONT_JA_32)
 
+  # 相手の番に考えておくか
+  screen.blit(
+      FONT_JA_32.render('相手の番に考える', True, IVORY),
+      du.resize(420, 840),
+  )
+  du.draw_button(screen, '✓' if _pondering else '  ',
+                 du.resize(780, 840), du.resize(40, 40), color=BROWN, font=FONT_JA_32)
+
 
 def _draw_balloon(width: int, height: int, point: 'tuple[int, int]'):
   '''
@@ -418,11 +433,86 @@ def _draw_animations():
   # コンピュータ
   elif (game.computer_moving
         and game.playersturn != game.my_color
-        and not game.checkmate_bool):
-    du.draw_board(screen, _start, _size, game.gameboard, is_black=game.my_color == 'B')
-    pygame.display.update()
-    computer.computer_move(game)
-    play(move_snd)
+        and not game.checkmate_bool
+        and not game.alert):
+    _computer_thinking()
+  # 相手の番にコンピュータが考えておく
+  elif (game.mode == 'PvsC'
+        and game.playersturn == game.my_color
+        and not game.checkmate_bool
+        and not game.alert
+        and not game.prom
+        and not game.arrow_targets):
+    _pondering()
+
+
+def _computer_thinking():
+  '''
+  コンピュータの手をバックグラウンドで探し，探し終わったら指す．
+  探しているあいだは考え中の表示をする
+  '''
+  if game.thinking is None:
+    game.thinking = _pondered() or BackgroundSearch(game, opponent[game.my_color])
+  thinking = game.thinking
+  if not thinking.done():
+    if thinking.stop_at is not None and perf_counter() >= thinking.stop_at:
+      thinking.stop()
+    _draw_thinking(thinking)
+    return
+  game.thinking = None
+  move = thinking.result()
+  # 探しているあいだに局面が変わっていたら，次のフレームで探し直す
+  if thinking.key != (game.hash_key(), game.count):
+    return
+  if move is None:
+    game.computer_moving = False
+    return
+  computer.play_move(game, *move)
+  play(move_snd)
+  if game.pondering and game.foreseeing:
+    game.ponder = Ponder(game, opponent[game.my_color], thinking)
+
+
+def _pondered() -> Optional[BackgroundSearch]:
+  '''相手の番に考えておいた探索のうち，今の局面のもの．なければ None'''
+  if game.ponder is None:
+    return None
+  ponder, game.ponder = game.ponder, None
+  return ponder.take(game)
+
+
+def _pondering():
+  '''
+  相手の番に，相手の手を指したあとの局面でコンピュータの手を探しておく．
+  探しているあいだは考え中の表示をする
+  '''
+  if not (game.pondering and game.foreseeing):
+    return
+  if game.ponder is None:
+    game.ponder = Ponder(game, opponent[game.my_color])
+  game.ponder.step(game)
+  current = game.ponder.current()
+  if current is not None:
+    _draw_thinking(current[1], f'Pondering {notation(*current[0])}')
+
+
+def _draw_thinking(thinking: BackgroundSearch, label: str = 'Thinking'):
+  '''盤面の上の余白に，コンピュータの考え中の表示と探索の途中経過を描画する'''
+  assert game.kind is not None
+  progress = thinking.progress()
+  elapsed = thinking.elapsed()
+  text = label + '.' * (int(elapsed * 2) % 4)
+  text += ' ' * (3 - int(elapsed * 2) % 4)
+  if progress['depth'] > 0:
+    text += f"  depth {progress['depth']}"
+  if progress['best'] is not None:
+    text += f"  best {notation(*progress['best'])}"
+  if progress['nodes'] > 0:
+    text += f"  {progress['nodes']} nodes"
+  text += f'  {elapsed:.1f}s'
+  margin = du.square_size(game.kind['size']) / 2
+  screen.blit(FONT_EN_16.render(text, True, WHITE),
+              (margin, (margin - FONT_EN_16.get_height()) / 2))
 
 
 def _draw_game():
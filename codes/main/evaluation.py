@@ -0,0 +1,110 @@
+'''CPU の評価関数のための差分更新される評価の項
+
+Notes
+-----
+cpu_static_value は探索の葉で毎回呼ばれるが，一手で変わるマスは数マスしかない．
+IncrementalEvaluation は AttackMap が同期した書き換わったマスだけを見て，
+次の項を差分で更新する．
+  - 駒の価値の合計
+  - ポーンの段の合計
+  - 前に出たマイナーピースの数
+  - 段ごとのルークの数
+  - キングの位置
+駒ごとの利きは AttackMap から引く．
+'''
+
+from typing import Optional, Type
+
+from attack_map import AttackMap
+from board import ArrayBoard, MAX_SIZE, WHITE, code_class, position
+from custom_types import Color, Position
+from pieces.piece import Piece
+
+
+class IncrementalEvaluation:
+  '''
+  盤面の書き換わったマスから差分で更新される評価の項
+
+  Attributes
+  ----------
+  attacks : AttackMap
+    利きの表．盤面の書き換えはこの表から受け取る．
+  size : int
+    盤面の大きさ．
+  material : dict > {Color: float}
+    キング以外の駒の価値の合計．
+  pawn_count, pawn_ranks : dict > {Color: int}
+    ポーンの数，ポーンの y 座標の合計．
+  minor_front : dict > {Color: int}
+    自陣の最初の2段より前にあるナイト・ビショップの数．
+  rooks_on_rank : list > [int, ...]
+    段ごとのルークの数(色は問わない)．
+  kings : dict > {Color: set > {int, ...}}
+    キングのいるマスの番号．
+  '''
+
+  def __init__(self, attacks: AttackMap):
+    self.attacks = attacks
+    self.size = attacks.size
+    self._reset_terms()
+    attacks.listeners.append(self)
+    if attacks.board is not None:
+      self.reset(attacks.board)
+
+  def _reset_terms(self):
+    self.material: 'dict[Color, float]' = {'W': 0.0, 'B': 0.0}
+    self.pawn_count: 'dict[Color, int]' = {'W': 0, 'B': 0}
+    self.pawn_ranks: 'dict[Color, int]' = {'W': 0, 'B': 0}
+    self.minor_front: 'dict[Color, int]' = {'W': 0, 'B': 0}
+    self.rooks_on_rank = [0] * MAX_SIZE
+    self.kings: 'dict[Color, set[int]]' = {'W': set(), 'B': set()}
+
+  def reset(self, board: ArrayBoard):
+    '''盤面 board の駒を最初から数え直す'''
+    self._reset_terms()
+    for index, code in enumerate(board.codes):
+      if code:
+        self._count(index, code_class(code), board.colors[index], 1)
+
+  def update(self, index: int, old_code: int, old_color: int, code: int, color_code: int):
+    '''マス index の中身を置き換えたぶんだけ項を更新する'''
+    if old_code:
+      self._count(index, code_class(old_code), old_color, -1)
+    if code:
+      self._count(index, code_class(code), color_code, 1)
+
+  def _count(self, index: int, cls: 'Optional[Type[Piece]]', color_code: int, sign: int):
+    assert cls is not None
+    color: Color = 'W' if color_code == WHITE else 'B'
+    x, y = position(index)
+    abbr = cls.abbr
+    if abbr == 'K':
+      if sign > 0:
+        self.kings[color].add(index)
+      else:
+        self.kings[color].discard(index)
+      return
+    self.material[color] += sign * cls.value
+    if abbr == 'P':
+      self.pawn_count[color] += sign
+      self.pawn_ranks[color] += sign * y
+    elif abbr in ('N', 'B'):
+      if (color == 'W' and y > 1) or (color == 'B' and y < self.size - 2):
+        self.minor_front[color] += sign
+    elif abbr == 'R':
+      self.rooks_on_rank[y] += sign
+
+  def value(self, color: Color) -> float:
+    '''utils.value と同じ，キング以外の駒の価値の合計'''
+    return round(self.material[color], 1)
+
+  def pawn_advancing(self, color: Color) -> int:
+    '''ポーンの進み具合の合計'''
+    if color == 'W':
+      return self.pawn_ranks['W']
+    return 7 * self.pawn_count['B'] - self.pawn_ranks['B']
+
+  def king_position(self, color: Color) -> Optional[Position]:
+    '''color のキングの位置．いなければ None'''
+    kings = self.kings[color]
+    return position(min(kings)) if kings else None
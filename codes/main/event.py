@@ -72,6 +72,9 @@ def _settings_mouse_event(mpos: MousePos):
   # 先読みの有無
   if du.on_button(mpos, (300, 840), (40, 40)):
     eu.toggle_foreseeing_event()
+  # 相手の番に考えておくか
+  elif du.on_button(mpos, (780, 840), (40, 40)) and game.level:
+    eu.toggle_pondering_event()
   # もどる
   elif du.on_button(mpos, (30, 30), (210, 90)):
     eu.back_event()
@@ -102,6 +105,10 @@ def _settings_key_event(key: int):
     elif key == pygame.K_f:
       eu.toggle_foreseeing_event()
       return
+    # [t] 相手の番に考えておくか
+    elif key == pygame.K_t:
+      eu.toggle_pondering_event()
+      return
   # [backspace] もどる
   if key == pygame.K_BACKSPACE:
     eu.back_event()
@@ -413,11 +420,20 @@ def _board_back_forward_key_event(key: int):
 
   # [z] 一手戻す
   if key == pygame.K_z:
+    # コンピュータが考え中なら，考えるのをやめて自分の手だけ戻す
+    if game.mode == 'PvsC' and game.computer_moving and game.playersturn != game.my_color:
+      eu.cancel_thinking_event()
+      game.computer_moving = False
+      game.prev_move()
+      return
+    # 相手の番に考えておいた探索は局面が変わると使えない
+    eu.cancel_thinking_event()
     game.prev_move()
     if game.mode == 'PvsC':
       game.prev_move()
   # [x] 一手進める
   elif key == pygame.K_x:
+    eu.cancel_thinking_event()
     game.next_move()
 
 
@@ -443,7 +459,9 @@ def _game_key_event(key: int, mod: int):
       game.show_user_guide = False
       return
     # [backspace] ゲーム選択メニューに戻るかの確認
+    # コンピュータが考え中なら考えるのをやめ，戻らないときは考え直す
     if key == pygame.K_BACKSPACE:
+      eu.cancel_thinking_event()
       game.alert = True
       game.show_value = False
       game.show_user_guide = False
@@ -466,6 +484,7 @@ def _game_key_event(key: int, mod: int):
       return
     # [ctrl+l] ゲームデータのロード
     if key == pygame.K_l and mod & pygame.KMOD_CTRL:
+      eu.cancel_thinking_event()
       game.load_data()
       return
     # [z] / [x] 一手戻す / 進める
@@ -57,6 +57,12 @@ def toggle_foreseeing_event():
   play(select_snd)
 
 
+def toggle_pondering_event():
+  '''設定画面でコンピュータが相手の番に考えておくかの設定を切り替える'''
+  game.pondering = False if game.pondering else True
+  play(select_snd)
+
+
 def back_event():
   '''設定画面からホーム画面に戻る'''
   game.select_game = True
@@ -73,8 +79,19 @@ def start_game_event():
     game.computer_moving = True
 
 
+def cancel_thinking_event():
+  '''バックグラウンドで動いているコンピュータの探索と，相手の番に考えておいている探索を取りやめる'''
+  if game.thinking is not None:
+    game.thinking.cancel()
+    game.thinking = None
+  if game.ponder is not None:
+    game.ponder.cancel()
+    game.ponder = None
+
+
 def back_to_home_event():
   '''ゲーム画面でホーム画面に戻る'''
+  cancel_thinking_event()
   game.alert = False
   _page = game.page
   game.__init__()
@@ -92,7 +109,7 @@ def archer_attack_event(pos: Optional[Position]):
   '''アーチャーの発射'''
   if pos in game.arrow_targets:
     if game.gameboard[pos].color != game.playersturn:
-      del game.gameboard[pos]
+      game.shoot_arrow(pos)
       # チェック状態の記録
       game.check_bool = game.is_check(
           'W', game.gameboard) or game.is_check('B', game.gameboard)
@@ -189,7 +206,7 @@ def promotion_event(index: int):
   '''プロモーション'''
   assert game.kind is not None
   assert game.endpos is not None
-  game.gameboard[game.endpos] = game.kind['promote2'][index](game.playersturn)
+  game.promote(game.kind['promote2'][index])
   game.prom = False
   game.process_after_renewing_board()
   game.endpos = None
@@ -35,11 +35,13 @@ GameType = TypedDict('Game', {
     'placers': Union[Placers, AsymPlacers],
 })
 
-_file_nums = len(os.listdir('main/games'))
+# ゲームの種類を定義した yml のあるディレクトリ
+_GAMES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'games')
+_file_nums = len(os.listdir(_GAMES_DIR))
 games: List[GameType] = []
 
 for i in range(_file_nums):
-  with open(f'main/games/{i+1}.yml', encoding='utf8') as file:
+  with open(os.path.join(_GAMES_DIR, f'{i+1}.yml'), encoding='utf8') as file:
     _yml: List[GameYml] = yaml.safe_load(file)
     _game_list = cast(List[GameType], copy(_yml))
     for index, game in enumerate(_yml):
@@ -84,9 +86,17 @@ def generate_krn_code():
   return pos_id
 
 
-def init_960():
-  '''チェス 960 における駒の配置の決定'''
-  pos_id = generate_krn_code()
+def init_960(pos_id: Optional[int] = None):
+  '''
+  チェス 960 における駒の配置の決定
+
+  Parameters
+  ----------
+  pos_id : int | None
+    配置の番号(0-959)．None のときは通常のチェス(518)以外から選ぶ．
+  '''
+  if pos_id is None:
+    pos_id = generate_krn_code()
 
   placers: 'list[Optional[Type[Piece]]]' = [None] * 8
 
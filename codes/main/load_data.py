@@ -1,5 +1,6 @@
 '''ゲームの途中のデータを data.yml にセーブすると、あとからロードできます'''
 
+import os
 from typing import TypedDict, List, Tuple, Literal, Optional, cast
 import yaml
 
@@ -57,7 +58,7 @@ def put_piece(orig_data: PieceData, replace_data: Board):
 
 
 try:
-  with open('main/data.yml', encoding='utf8') as file:
+  with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data.yml'), encoding='utf8') as file:
     yml: 'list[Data]' = yaml.full_load(file)
     for y in yml:
       if y['pick']:
@@ -12,20 +12,57 @@ https://gist.github.com/rsheldiii/2993225
 
 
 from copy import copy, deepcopy
-from typing import Tuple, Optional, Literal, cast
+from typing import TYPE_CHECKING, Callable, Tuple, Type, TypedDict, Optional, Literal, cast
 
-from custom_types import Position, PositionSet, Board, Color, Mode
+from board import ArrayBoard, position, state_key
+from attack_map import AttackMap, Pins, ZONE_PIECES, king_position
+from custom_types import Position, PositionSet, Board, Color, Mode, SearchProgress
+from evaluation import IncrementalEvaluation
 from games import GameType, Placers, AsymPlacers
+from ordering import MoveOrdering
 from pieces import pieces
 from pieces.fairy_pieces3 import Orphan, Friend
+from powers import PowerGraph, RECEIVERS
+from transposition import TranspositionTable
 import pieces.piece_utils as pu
 import utils
 
+if TYPE_CHECKING:
+  from background import BackgroundSearch
+  from ponder import Ponder
+
 
 # 相手の駒色
 opponent: 'dict[Color, Color]' = {'W': 'B', 'B': 'W'}
 
 
+# 一手ぶんの差分．make_move で作られ，unmake_move で元に戻すのに使う
+MoveUndo = TypedDict('MoveUndo', {
+    # 開始位置，終了位置
+    'startpos': Position,
+    'endpos': Position,
+    # 動かした駒
+    'piece': pieces.Piece,
+    # 終了位置にあった駒
+    'captured': Optional[pieces.Piece],
+    # アンパッサンで取った駒 : (位置, 駒)
+    'en_passant': Optional[Tuple[Position, pieces.Piece]],
+    # キャスリングで動かしたルーク : (元の位置, ルーク, 移動先)
+    'castling_rook': Optional[Tuple[Position, pieces.Piece, Position]],
+    # プロモーション後の駒
+    'promoted': Optional[pieces.Piece],
+    # アーチャーの矢で取った駒 : (位置, 駒)
+    'arrow': Optional[Tuple[Position, pieces.Piece]],
+    # 動かした駒の count を増やしたか
+    'counted': bool,
+    # 動かす前の状態
+    'advanced2_pos': Optional[Position],
+    'can_castling': 'dict[Color, list[bool]]',
+    'can_castling_tmp': 'dict[Color, list[bool]]',
+    'finish_castling': 'dict[Color, int]',
+})
+
+
 class Game:
   '''ゲームのルールを決めたり進行を管理したりするクラス'''
 
@@ -36,13 +73,54 @@ class Game:
     self.level: int = 0
     # コンピュータ先読み有無 : bool
     self.foreseeing: bool = False
+    # 相手の番にコンピュータが考えておくか(先読みするときだけ) : bool
+    self.pondering: bool = False
+    # コンピュータの一手あたりの思考時間(秒)．None のときは level で決まる : float | None
+    self.time_budget: Optional[float] = None
+    # コンピュータの置換表に使うメモリの大きさ(MB) : float
+    self.tt_size_mb: float = 16
+    # コンピュータの置換表 : TranspositionTable | None
+    self.tt: Optional[TranspositionTable] = None
+    # コンピュータの探索を打ち切る時刻(time.perf_counter) : float | None
+    self.search_deadline: Optional[float] = None
+    # コンピュータの探索を取りやめるよう求められたか : bool
+    # ほかのスレッドから True にすると，探索は SearchTimeout で打ち切られる
+    self.search_cancelled: bool = False
+    # コンピュータの探索がもう要らなくなったかを返す関数 : Callable[[], bool] | None
+    # parallel のプロセスの中で，元のプロセスの探索が先に進んだり打ち切られたりしたかを確かめる
+    self.search_stale: Optional[Callable[[], bool]] = None
+    # コンピュータの探索の途中経過 : SearchProgress | None
+    # 与えられたとき，反復深化で深さを読み終わるたびに書き換える
+    self.search_progress: Optional[SearchProgress] = None
+    # コンピュータの静止探索で駒を取る手を読む深さ : int
+    self.quiescence_depth: int = 4
+    # コンピュータの探索で手を並べ替えるか : bool
+    self.move_ordering: bool = True
+    # コンピュータの探索でルートの手を分けて読むプロセスの数．1 のときは分けない : int
+    self.search_workers: int = 1
+    # コンピュータの探索の手の並べ替え : MoveOrdering | None
+    self.ordering: Optional[MoveOrdering] = None
+    # コンピュータの評価関数の差分更新される項 : IncrementalEvaluation | None
+    self.evaluation: Optional[IncrementalEvaluation] = None
+    # gameboard の利きの表 : AttackMap | None
+    self.attack_map: Optional[AttackMap] = None
+    # gameboard のオーファン・フレンドの受け取る動きのグラフ : PowerGraph | None
+    self.power_graph: Optional[PowerGraph] = None
+    # 合法手の判定で，それぞれの方法で判定した手の数 : dict > {str: int}
+    # free -- 盤面を動かさずに合法と分かった
+    # refuted -- 盤面を動かさずにチェックが残ると分かった
+    # simulated -- 動かした盤面で，書き換えたマスを読んだ相手の駒の利きだけ求め直した
+    #              (オーファン・フレンドの受け取る動きも変わった部分だけ求め直した)
+    # fallback -- 盤面を複製して調べた(ミスト・ブリザード，アーチャー)
+    self.legality_counts: 'dict[str, int]' = dict.fromkeys(
+        ('free', 'refuted', 'simulated', 'fallback'), 0)
     # ゲームの種類 : GameType
     self.kind: Optional[GameType] = None
     # ターン : str > 'W', 'B'
     self.playersturn: Color = 'W'
-    # 盤面 : dict
-    # {(int, int): Piece, ...}
-    self.gameboard: Board = {}
+    # 盤面 : ArrayBoard
+    # {(int, int): Piece, ...} としても扱える
+    self.gameboard: Board = ArrayBoard()
     # ルークの初期位置
     self.rook_init_pos: Optional[Tuple[int, int]] = None
     self.king_init_pos: Optional[int] = None
@@ -63,12 +141,8 @@ class Game:
     self.confirm_castling: bool = False
     # キャスリングするかの確認の後，キャスリングすることをプレイヤーが選択したか : bool
     self.do_castling: bool = False
-    # 何手目で何色のどちら側のキャスリングの可能性がなくなったかの記録:
-    # dict > {int: ((Color, 0), (Color, 1)), ...}
-    self.give_up_castling: 'dict[int, tuple[tuple[Color, Literal[0]], tuple[Color, Literal[1]]]]' = {}
     # キャスリングが何手目で完了したか : dict > {'W': int, 'B': int}
     self.finish_castling: 'dict[Color, int]' = {'W': 0, 'B': 0}
-    self.finish_castling_tmp: 'dict[Color, int]' = {}
     # プロモーション : bool
     self.prom: bool = False
     # ゲーム選択 : bool
@@ -92,6 +166,12 @@ class Game:
     self.stalemate_bool: bool = False
     self.checkmate_bool: bool = False
     # 記録
+    # 何手目の動きの差分か : dict > {int: MoveUndo, ...}
+    self.history: 'dict[int, MoveUndo]' = {}
+    # 直前に動かした手の差分 : MoveUndo | None
+    self.last_move: Optional[MoveUndo] = None
+    # ロードしたデータの盤面の記録 : dict > {int: Board, ...}
+    # 差分の記録がない手数に戻るときだけ使う
     self.record: 'dict[int, Board]' = {}
     self.count: int = 0
 
@@ -104,6 +184,10 @@ class Game:
     self.shooting_target: Optional[Position] = None
     # コンピュータが動作中 : bool
     self.computer_moving = False
+    # バックグラウンドで動いているコンピュータの探索 : BackgroundSearch | None
+    self.thinking: 'Optional[BackgroundSearch]' = None
+    # 相手の番にコンピュータが考えておいている探索 : Ponder | None
+    self.ponder: 'Optional[Ponder]' = None
     # アニメーションのコマ数 : int
     self.time: int = 1
     # 始点・終点 : tuple > (int, int)
@@ -138,7 +222,8 @@ class Game:
     self.refresh_memo()
     self.move_record = {}
     # データの保持
-    self.record = {0: deepcopy(self.gameboard)}
+    self.history = {}
+    self.record = {}
     self.count = 0
 
   def place_pieces(self):
@@ -188,18 +273,182 @@ class Game:
     if target is None or target.color != self.playersturn:
       return
 
+    # 駒を動かす
+    # プロモーション・矢の射撃が決まるまでターンは交代しない
+    self.last_move = self._apply_move(
+        startpos, endpos, None if self.do_castling else False)
+    self.promotion(target, endpos)
+    self.process_after_renewing_board()
+
+  def make_move(
+      self, startpos: Position, endpos: Position,
+      promote2: 'Optional[Type[pieces.Piece]]' = None, castling: Optional[bool] = None,
+      arrow: Optional[Position] = None,
+  ) -> MoveUndo:
+    '''
+    一手指してターンを交代し，元に戻すための差分を返す．
+    盤面をコピーしないので，unmake_move とあわせて探索や盤面の行き来に使う．
+
+    Parameters
+    ----------
+    startpos, endpos : Position
+      開始位置，終了位置．絶対座標．
+    promote2 : Type[Piece] | None
+      プロモーション先．None のときは promote2 の最後の駒．
+    castling : bool | None
+      True のときキャスリングとして動かす，False のときキャスリングしない．
+      None のときはキャスリングの条件を満たせばキャスリングする．
+    arrow : Position | None
+      アーチャーの矢で取る駒の位置．
+
+    Returns
+    -------
+    : MoveUndo
+    '''
+    assert self.kind is not None
+    undo = self._apply_move(startpos, endpos, castling)
+    if self._promotable(undo['piece'], endpos):
+      self._promote(undo, promote2 or self.kind['promote2'][-1])
+    if arrow is not None:
+      self._shoot_arrow(undo, arrow)
+    self.playersturn = opponent[self.playersturn]
+    self.count += 1
+    self.refresh_memo()
+    return undo
+
+  def unmake_move(self, undo: MoveUndo):
+    '''
+    make_move で指した手を元に戻す
+
+    Parameters
+    ----------
+    undo : MoveUndo
+      make_move の返り値．
+    '''
+    self.count -= 1
+    self.playersturn = opponent[self.playersturn]
+    self._revert_move(undo)
+    self.refresh_memo()
+
+  def _apply_move(self, startpos: Position, endpos: Position, castling: Optional[bool]) -> MoveUndo:
+    '''盤面と駒の状態を一手ぶん更新し，差分を返す．ターン交代はしない'''
+    assert self.kind is not None
+    board = self.gameboard
+    piece = board[startpos]
+    undo: MoveUndo = {
+        'startpos': startpos,
+        'endpos': endpos,
+        'piece': piece,
+        'captured': board.get(endpos) if startpos != endpos else None,
+        'en_passant': None,
+        'castling_rook': None,
+        'promoted': None,
+        'arrow': None,
+        'counted': hasattr(piece, 'count'),
+        'advanced2_pos': self.advanced2_pos,
+        'can_castling': {color: list(sides) for color, sides in self.can_castling.items()},
+        'can_castling_tmp': self.can_castling_tmp,
+        'finish_castling': copy(self.finish_castling),
+    }
+    # アンパッサン・キャスリングかどうかは動かす前の盤面で判定する
+    en_passant = bool(endpos not in board
+                      and self.en_passant_requirements(piece, startpos, endpos))
+    castling_side = self._castling_side(piece, endpos, castling)
+
     # 駒を動かした回数によって動きが変わる駒が動いた
-    if hasattr(target, 'count'):
-      target.count += 1
+    # 盤面のハッシュに回数が含まれるので，置く前に増やす
+    if undo['counted']:
+      piece.count += 1
     # ポーンが2歩進んだ
-    self._update_advanced2_pos(target, startpos, endpos)
+    self._update_advanced2_pos(piece, startpos, endpos)
     # キャスリング
-    self._update_castling_potentials(target.name, startpos[0])
+    self._update_castling_potentials(piece.name, startpos[0])
     # 通常の動き
-    self.renew_gameboard(
-        startpos, endpos, self.gameboard, target.color)
-    self.promotion(target, endpos)
-    self.process_after_renewing_board()
+    if startpos != endpos:
+      del board[startpos]
+    board[endpos] = piece
+    # アンパッサン
+    if en_passant:
+      victim_pos = cast(Position, undo['advanced2_pos'])
+      undo['en_passant'] = (victim_pos, board[victim_pos])
+      del board[victim_pos]
+    # キャスリング
+    if castling_side is not None:
+      assert self.rook_init_pos is not None
+      _size = self.kind['size']
+      rank = 0 if piece.color == 'W' else _size - 1
+      rook_from = (self.rook_init_pos[castling_side], rank)
+      rook_to = (3 if castling_side == 0 else _size - 3, rank)
+      # キングがルークの位置に動いたときは，ルークは captured に入っている
+      rook = undo['captured'] if rook_from == endpos else board.pop(rook_from)
+      assert rook is not None
+      board[rook_to] = rook
+      undo['castling_rook'] = (rook_from, rook, rook_to)
+      self.finish_castling[piece.color] = self.count
+    return undo
+
+  def _revert_move(self, undo: MoveUndo):
+    '''_apply_move などで更新した盤面と駒の状態を元に戻す'''
+    board = self.gameboard
+    startpos, endpos, piece = undo['startpos'], undo['endpos'], undo['piece']
+    if undo['arrow'] is not None:
+      board[undo['arrow'][0]] = undo['arrow'][1]
+    if undo['castling_rook'] is not None:
+      rook_from, rook, rook_to = undo['castling_rook']
+      del board[rook_to]
+      if rook_from != endpos:
+        board[rook_from] = rook
+    if undo['en_passant'] is not None:
+      board[undo['en_passant'][0]] = undo['en_passant'][1]
+    del board[endpos]
+    if undo['captured'] is not None:
+      board[endpos] = undo['captured']
+    # 盤面のハッシュに回数が含まれるので，戻してから置く
+    if undo['counted']:
+      piece.count -= 1
+    board[startpos] = piece
+    self.advanced2_pos = undo['advanced2_pos']
+    self.can_castling = undo['can_castling']
+    self.can_castling_tmp = undo['can_castling_tmp']
+    self.finish_castling = undo['finish_castling']
+
+  def _castling_side(
+      self, piece: pieces.Piece, endpos: Position, castling: Optional[bool]
+  ) -> Optional[Literal[0, 1]]:
+    '''piece が endpos に動くのがキャスリングであるとき，その側(0, 1)を返す'''
+    assert self.kind is not None
+    if castling is False or not self.kind['castling'] or piece.name != f'{piece.color}K':
+      return None
+    _size = self.kind['size']
+    rank = 0 if piece.color == 'W' else _size - 1
+    sides: 'tuple[tuple[Literal[0, 1], int], ...]' = ((0, 2), (1, _size - 2))
+    for side, file_ in sides:
+      if (endpos == (file_, rank)
+              and (castling or self.castling_requirements(
+                  piece, endpos, side, self.gameboard, self.can_castling))):
+        return side
+    return None
+
+  def _promote(self, undo: MoveUndo, piece_type: 'Type[pieces.Piece]'):
+    '''undo の手で動かした駒を piece_type にプロモーションする'''
+    promoted = piece_type(undo['piece'].color)
+    self.gameboard[undo['endpos']] = promoted
+    undo['promoted'] = promoted
+
+  def _shoot_arrow(self, undo: MoveUndo, pos: Position):
+    '''undo の手で動かしたアーチャーの矢で pos の駒を取る'''
+    undo['arrow'] = (pos, self.gameboard[pos])
+    del self.gameboard[pos]
+
+  def promote(self, piece_type: 'Type[pieces.Piece]'):
+    '''直前に動かした駒を piece_type にプロモーションする'''
+    assert self.last_move is not None
+    self._promote(self.last_move, piece_type)
+
+  def shoot_arrow(self, pos: Position):
+    '''直前に動かしたアーチャーの矢で pos の駒を取る'''
+    assert self.last_move is not None
+    self._shoot_arrow(self.last_move, pos)
 
   def _update_advanced2_pos(self, target: pieces.Piece, startpos: Position, endpos: Position):
     '''`advanced2_pos` を更新する'''
@@ -267,9 +516,7 @@ class Game:
       result: PositionSet = set()
     elif utils.in_zone(_board, 2, startpos, 'Mi') and piece.abbr not in ('Mi', 'Bz'):
       # ミスト範囲内
-      result = (pieces.King('W').available_moves(*startpos, _board, size=_size)
-                if piece.color == 'W'
-                else pieces.King('B').available_moves(*startpos, _board, size=_size))
+      result = pieces.piece_moves(pieces.King, *startpos, _board, piece.color, _size)
     else:
       result = piece.available_moves(*startpos, _board, size=_size)
       # アンパッサン
@@ -323,6 +570,7 @@ class Game:
     result = copy(moves)
     if hasattr(piece, 'archer_dir'):
       # 動かす駒がアーチャーのとき
+      self.legality_counts['fallback'] += len(moves)
       for endpos in moves:
         gameboard_tmp = copy(board)
         self.renew_gameboard(
@@ -359,17 +607,101 @@ class Game:
             # 矢で取り除いてもチェック解除されないなら、
             # その動きでチェックを解除することはできない
             result.remove(endpos)
+    elif any(type(other) is Orphan or type(other) is Friend for other in board.values()):
+      # オーファン・フレンドの動きはほかの駒の利きから決まるので，受け取る動きも求め直してみる
+      for endpos in moves:
+        if self._exposes_king_with_powers(piece, startpos, endpos, board):
+          result.remove(endpos)
     else:
+      attacks = self.attacks(board)
+      pins = attacks.pins(piece.color)
       for endpos in moves:
-        gameboard_tmp = deepcopy(board)
-        self.renew_gameboard(
-            startpos, endpos, gameboard_tmp, piece.color)
-        self.refresh_memo(gameboard_tmp)
-        if self.is_check(piece.color, gameboard_tmp):
+        if self._exposes_king(piece, startpos, endpos, board, attacks, pins):
           result.remove(endpos)
 
     return result
 
+  def _exposes_king(
+      self, piece: pieces.Piece, startpos: Position, endpos: Position, board: Board,
+      attacks: AttackMap, pins: Pins,
+  ) -> bool:
+    '''
+    startpos の piece を endpos に動かすと自分がチェックされた状態になるとき，True
+
+    Notes
+    -----
+    キングでない駒の動きは，盤面を動かす前に pins で次のように判定する．
+      - チェックされておらず，書き換えるマスを読んだ相手の駒がなければ合法
+      - チェックしている駒を取らず，その駒が読んだマスも書き換えないならチェックが残る
+    それ以外は動かした盤面で，書き換えたマスを読んだ相手の駒の利きだけ求め直す．
+    ミスト・ブリザードは盤面全体の利きを変えるので，盤面ごと動かしてみる．
+    '''
+    captured = board.get(endpos)
+    if piece.abbr in ZONE_PIECES or (captured is not None and captured.abbr in ZONE_PIECES):
+      return self._exposes_king_by_copy(piece, startpos, endpos, board)
+
+    if pins['king'] is None:
+      self.legality_counts['free'] += 1
+      return False
+    # アンパッサンでは取るポーンのマスも書き換わるので，動かしてみる
+    if pins['exact'] and piece.abbr != 'K' and not self.en_passant:
+      watchers = {pos for square in (startpos, endpos)
+                  for pos in pins['watched'].get(square, ()) if pos != endpos}
+      checkers = [pos for pos in pins['checkers'] if pos != endpos]
+      if not checkers and not watchers:
+        self.legality_counts['free'] += 1
+        return False
+      if any(pos not in watchers for pos in checkers):
+        self.legality_counts['refuted'] += 1
+        return True
+
+    self.legality_counts['simulated'] += 1
+    gameboard_tmp = copy(board) if isinstance(board, ArrayBoard) else ArrayBoard(board)
+    changed = gameboard_tmp.track_changes()
+    self.renew_gameboard(startpos, endpos, gameboard_tmp, piece.color)
+    king = king_position(gameboard_tmp, piece.color)
+    return king is not None and attacks.is_attacked(
+        king, opponent[piece.color], gameboard_tmp, map(position, changed))
+
+  def _exposes_king_with_powers(
+      self, piece: pieces.Piece, startpos: Position, endpos: Position, board: Board,
+  ) -> bool:
+    '''
+    オーファン・フレンドのいる盤面で，startpos の piece を endpos に動かすと
+    自分がチェックされた状態になるとき True
+
+    Notes
+    -----
+    オーファン・フレンドだけを複製した盤面を動かし，受け取る動きは実際の盤面のグラフを
+    PowerGraph.fork で引き継いで変わった部分だけ求め直す．
+    ほかの駒の利きは，書き換えたマスを読んだものだけ求め直す．
+    実際の盤面でないときは盤面ごと複製する．
+    '''
+    if board is not self.gameboard or self.power_graph is None:
+      return self._exposes_king_by_copy(piece, startpos, endpos, board)
+
+    self.legality_counts['simulated'] += 1
+    attacks = self.attacks()
+    gameboard_tmp = copy(board)
+    graph = self.power_graph.fork(gameboard_tmp)
+    changed = gameboard_tmp.track_changes()
+    self.renew_gameboard(startpos, endpos, gameboard_tmp, piece.color)
+    positions = [position(index) for index in changed]
+    graph.refresh(gameboard_tmp, attacks, positions)
+    king = king_position(gameboard_tmp, piece.color)
+    return king is not None and attacks.is_attacked(
+        king, opponent[piece.color], gameboard_tmp, positions)
+
+  def _exposes_king_by_copy(
+      self, piece: pieces.Piece, startpos: Position, endpos: Position, board: Board,
+  ) -> bool:
+    '''盤面を複製して動かしてみて，自分がチェックされた状態になるとき True'''
+    self.legality_counts['fallback'] += 1
+    gameboard_tmp = deepcopy(board)
+    self.renew_gameboard(startpos, endpos, gameboard_tmp, piece.color)
+    self.refresh_memo(gameboard_tmp)
+    return self.is_check(piece.color, gameboard_tmp)
+
   def en_passant_requirements(self, piece: pieces.Piece, startpos: Position, endpos: Position):
     '''
     アンパッサンの条件を満たす
@@ -440,16 +772,15 @@ class Game:
       assert self.king_init_pos is not None
 
       # キングが通過するマスが敵に攻撃されていない
+      # キングの元の位置と通過するマスを読んでいない駒の利きは，今の盤面の表をそのまま使う
+      attacks = self.attacks(gameboard)
+      king_init = (self.king_init_pos, endpos[1])
       for pos in ((x, 0 if piece.color == 'W' else size - 1)
                   for x in utils.castling_king_route(self.king_init_pos, size=size)[side]):
-        _gameboard_tmp = utils.create_tmp_board(gameboard, (self.king_init_pos, endpos[1]), pos)
-        if list(self.can_see_square(next(position
-                                         for position, pc in _gameboard_tmp.items()
-                                         if pc.name == f'{piece.color}K'),
-                                    [(position, pc)
-                                     for position, pc in _gameboard_tmp.items()
-                                     if pc.color == opponent[piece.color]],
-                                    _gameboard_tmp)):
+        _gameboard_tmp = utils.create_tmp_board(gameboard, king_init, pos)
+        king = king_position(_gameboard_tmp, piece.color)
+        if king is not None and attacks.is_attacked(
+                king, opponent[piece.color], _gameboard_tmp, (king_init, pos)):
           return False
 
       return (endpos == target
@@ -540,11 +871,15 @@ class Game:
     endpos : Position
       終了位置．
     '''
-    assert self.kind is not None
-    if (piece.name == 'WP' and endpos[1] == self.kind['size'] - 1
-            or piece.name == 'BP' and endpos[1] == 0):
+    if self._promotable(piece, endpos):
       self.prom = True
 
+  def _promotable(self, piece: pieces.Piece, endpos: Position) -> bool:
+    '''piece が endpos に動いたときプロモーションできるとき True'''
+    assert self.kind is not None
+    return (piece.name == 'WP' and endpos[1] == self.kind['size'] - 1
+            or piece.name == 'BP' and endpos[1] == 0)
+
   def can_see_square(
       self, pos: Position, piecelist: 'list[tuple[Position, pieces.Piece]]', gameboard: Board
   ):
@@ -567,19 +902,37 @@ class Game:
     piece : Piece
       攻撃している駒．
     '''
-    assert self.kind is not None
+    attacks = self.attacks(gameboard)
     for position, piece in piecelist:
-      if hasattr(piece, 'archer_dir'):
-        arrow_targets: PositionSet = set()
-        for moved_pos in piece.available_moves(*position, gameboard, size=self.kind['size']):
-          if moved_pos not in gameboard:
-            arrow_targets |= utils.arrow_targets_(
-                piece, position, moved_pos, gameboard, pu.rider)
-        if pos in arrow_targets:
-          yield piece
-      else:
-        if pos in piece.available_moves(*position, gameboard, size=self.kind['size']):
-          yield piece
+      if pos in attacks.sees(piece, position):
+        yield piece
+
+  def attacks(self, gameboard: 'Optional[Board]' = None) -> AttackMap:
+    '''
+    盤面の利きの表を返す．
+    実際の盤面の表は持っておき，書き換わったマスの分だけ更新する．
+
+    Parameters
+    ----------
+    gameboard : Board | None
+      与えられたとき，シミュレーションで使う盤面．
+      その盤面だけで使う利きを覚えない表を返す．
+
+    Returns
+    -------
+    : AttackMap
+    '''
+    assert self.kind is not None
+    size = self.kind['size']
+    if gameboard is not None and gameboard is not self.gameboard:
+      attacks = AttackMap(size, cache=False)
+      attacks.sync(gameboard)
+      return attacks
+
+    if self.attack_map is None or self.attack_map.size != size:
+      self.attack_map = AttackMap(size)
+    self.attack_map.sync(self.gameboard)
+    return self.attack_map
 
   def is_check(self, color: Color, gameboard: Board):
     '''
@@ -596,19 +949,8 @@ class Game:
     -------
     : bool
     '''
-    if (color == 'W'
-            and list(self.can_see_square(next(position for position, piece in gameboard.items() if piece.name == 'WK'),
-                                         [(position, piece) for position, piece in gameboard.items(
-                                         ) if piece.color == 'B'],
-                                         gameboard))):
-      return True
-    if (color == 'B'
-            and list(self.can_see_square(next(position for position, piece in gameboard.items() if piece.name == 'BK'),
-                                         [(position, piece) for position, piece in gameboard.items(
-                                         ) if piece.color == 'W'],
-                                         gameboard))):
-      return True
-    return False
+    king = king_position(gameboard, color)
+    return king is not None and self.attacks(gameboard).is_attacked(king, opponent[color])
 
   def cannot_move(self, color: Color):
     '''
@@ -665,7 +1007,7 @@ class Game:
     return False
 
   def renew_gameboard(self, startpos: Position, endpos: Position, gameboard: Board, color: Color):
-    '''盤面の更新
+    '''シミュレーション用の盤面の更新
 
     Parameters
     ----------
@@ -675,6 +1017,11 @@ class Game:
       盤面．
     color : Color
       駒色．
+
+    Notes
+    -----
+    実際の盤面を動かすときは make_move を使う．
+    gameboard が ArrayBoard のときは，その Zobrist キーも差分で更新される．
     '''
     assert self.kind is not None
     # 通常の動き
@@ -683,8 +1030,6 @@ class Game:
       del gameboard[startpos]
     # アンパッサン
     self._handle_en_passant(endpos, gameboard, color)
-    # キャスリング
-    self._handle_castling(endpos, gameboard)
 
   def _handle_en_passant(self, endpos: Position, gameboard: Board, color: Color):
     '''アンパッサンによる盤面更新を行う'''
@@ -692,7 +1037,7 @@ class Game:
       return
 
     try:
-      advanced2_pos = self.advanced2_record.get(self.count, (None, None))
+      advanced2_pos = self.advanced2_pos or (None, None)
       # 2歩進んだ人のx位置が、アンパッサン後のアンパッサンしたポーンのx位置に等しい
       if advanced2_pos[0] != endpos[0]:
         return
@@ -707,78 +1052,52 @@ class Game:
     except KeyError:
       pass
 
-  def _handle_castling(self, endpos: Position, gameboard: Board):
-    '''キャスリングによる盤面更新を行う'''
-    assert self.kind is not None
-    # キャスリングできるゲームである
-    if not self.kind['castling']:
-      return
+  def hash_key(self, gameboard: 'Optional[Board]' = None, color: 'Optional[Color]' = None) -> int:
+    '''
+    局面の Zobrist ハッシュ
 
-    # キャスリング確認でキャスリングすることを選択した
-    # 終了位置指定がある
-    if not self.do_castling or self.endpos is None:
-      return
+    Parameters
+    ----------
+    gameboard : Board | None
+      盤面．None のときは実際の盤面．
+    color : Color | None
+      手番．None のときは playersturn．
 
-    assert self.rook_init_pos is not None
-    _size = self.kind['size']
-    # クイーンサイド
-    if self.castling_requirements(gameboard[endpos], endpos, 0, self.record[self.count], self.can_castling_tmp):
-      rook_pos = self.rook_init_pos[0]
-      # 白
-      if (self.endpos == (2, 0)
-              and self.gameboard[self.endpos].color == 'W'
-              and (rook_pos, 0) in self.gameboard):
-        if self.gameboard[(rook_pos, 0)].abbr == 'R':
-          del self.gameboard[(rook_pos, 0)]
-        self.gameboard[(3, 0)] = pieces.Rook('W')
-        self.finish_castling['W'] = self.count
-      # 黒
-      if (self.endpos == (2, _size - 1)
-              and self.gameboard[self.endpos].color == 'B'
-              and (rook_pos, _size - 1) in self.gameboard):
-        if self.gameboard[(rook_pos, _size - 1)].abbr == 'R':
-          del self.gameboard[(rook_pos, _size - 1)]
-        self.gameboard[(3, _size - 1)] = pieces.Rook('B')
-        self.finish_castling['B'] = self.count
-    # キングサイド
-    if self.castling_requirements(gameboard[endpos], endpos, 1, self.record[self.count], self.can_castling_tmp):
-      rook_pos = self.rook_init_pos[1]
-      # 白
-      if (self.endpos == (_size - 2, 0)
-              and self.gameboard[self.endpos].color == 'W'
-              and (rook_pos, 0) in self.gameboard):
-        if self.gameboard[(rook_pos, 0)].abbr == 'R':
-          del self.gameboard[(rook_pos, 0)]
-        self.gameboard[(_size - 3, 0)] = pieces.Rook('W')
-        self.finish_castling['W'] = self.count
-      # 黒
-      if (self.endpos == (_size - 2, _size - 1)
-              and self.gameboard[self.endpos].color == 'B'
-              and (rook_pos, _size - 1) in self.gameboard):
-        if self.gameboard[(rook_pos, _size - 1)].abbr == 'R':
-          del self.gameboard[(rook_pos, _size - 1)]
-        self.gameboard[(_size - 3,
-                        _size - 1)] = pieces.Rook('B')
-        self.finish_castling['B'] = self.count
+    Returns
+    -------
+    : int
+      駒の種類・色・位置・動かした回数，手番，キャスリングの可能性，
+      直前に2歩進んだポーンの位置から決まる 64 ビットの整数．
+    '''
+    assert self.kind is not None
+    board = self.gameboard if gameboard is None else gameboard
+    if not isinstance(board, ArrayBoard):
+      board = ArrayBoard(board)
+    return board.key ^ state_key(
+        color or self.playersturn,
+        self.can_castling if self.kind['castling'] else None,
+        self.advanced2_pos,
+    )
 
   def refresh_memo(self, board: 'Optional[Board]' = None):
-    # 駒の動きのメモを初期化
+    '''
+    駒の動きのメモを初期化し，オーファン・フレンドの受け取る動きを求める．
+    実際の盤面のグラフは持っておき，一手で変わった部分だけ求め直す
+    '''
     assert self.kind is not None
-    board_is_none = False
+    size = self.kind['size']
     if board is None:
-      board_is_none = True
       board = self.gameboard
-    for pos, piece in board.items():
-      if board_is_none:
+      for piece in board.values():
         piece.recalc = True
-      if type(piece) is Orphan or type(piece) is Friend:
-        piece.tmp_moves = set()
-        piece.tmp_potentials = set()
-        piece.res_potentials = set()
-        piece.compounded_normal_pieces_memo = None
-    for pos, piece in board.items():
-      if type(piece) is Orphan or type(piece) is Friend:
-        piece.give_moves(*pos, board, self.kind['size'])
+    if board is self.gameboard:
+      if self.power_graph is None or self.power_graph.size != size:
+        self.power_graph = PowerGraph(size)
+      graph = self.power_graph
+    else:
+      graph = PowerGraph(size)
+    if graph.nodes or any(piece.abbr in RECEIVERS for piece in board.values()):
+      graph.refresh(board, self.attacks(board))
 
   def process_after_renewing_board(self):
     '''駒を動かしたあとの処理'''
@@ -789,7 +1108,13 @@ class Game:
       # ターン交代
       self.playersturn = opponent[self.playersturn]
       # 動きの記録
-      self.record[self.count + 1] = deepcopy(self.gameboard)
+      # 戻った局面から指したときは，その先の記録を上書きする
+      for number in [n for n in self.history if n >= self.count]:
+        del self.history[number]
+      for number in [n for n in self.record if n > self.count]:
+        del self.record[number]
+      assert self.last_move is not None
+      self.history[self.count] = self.last_move
       self.count += 1
       # 駒の動きのメモを初期化
       self.refresh_memo()
@@ -803,15 +1128,9 @@ class Game:
             and self.mode == 'PvsC'
             and self.playersturn != self.my_color):
       self.prom = False
+      self.promote(self.kind['promote2'][-1])
       self.process_after_renewing_board()
-      self.gameboard[self.endpos] = self.kind['promote2'][-1](piece.color)
       return
-    # 動きの上書き
-    len_record = len(self.record)
-    last_record = list(self.record.keys())[-1]
-    if len_record - 1 != last_record:
-      for i in range(len_record, last_record):
-        del self.record[i]
     # 回数によって動きが変わる駒が何手目でどこの駒が何回動いたか記録する
     if hasattr(piece, 'count'):
       self.move_record[self.count] = self.endpos
@@ -820,66 +1139,79 @@ class Game:
       self.advanced2_record[self.count] = self.advanced2_pos
     elif self.count in self.advanced2_record.keys():
       del self.advanced2_record[self.count]
-    # 何手目でどちらのどこのキャスリングの可能性がなくなったか記録する
-    if self.can_castling != self.can_castling_tmp:
-      status = tuple((k, i)
-                     for k, v in self.can_castling.items()
-                     for i in (0, 1)
-                     if v[i] != self.can_castling_tmp[k][i])
-      self.give_up_castling[self.count] = cast(
-          Tuple[Tuple[Color, Literal[0]], Tuple[Color, Literal[1]]], status)
 
   def prev_move(self):
     '''一手戻す'''
-    self.count -= 1
-    if self.count < 0:
-      self.count = 0
+    if self.count <= 0:
+      return
+
+    undo = self.history.get(self.count - 1)
+    if undo is not None:
+      self.unmake_move(undo)
+    elif self.count - 1 in self.record:
+      # ロードしたデータで差分の記録がないとき
+      # 今の盤面は差分の記録と同じ駒オブジェクトを持つので，コピーせずに記録と入れ替える
+      self.record[self.count] = self.gameboard
+      self.count -= 1
       self.playersturn = opponent[self.playersturn]
-    self.gameboard = deepcopy(self.record[self.count])
-    self.playersturn = opponent[self.playersturn]
-    # 駒の動きのメモを初期化
-    self.refresh_memo()
-    # ポーンが2歩進んだ直後であるとき
-    for k in self.advanced2_record:
-      if self.count == k:
-        self.advanced2_pos = self.advanced2_record[k]
-    # キャスリング
-    for color, count in self.finish_castling.items():
-      if count == self.count:
-        self.finish_castling_tmp[color] = count
-        self.finish_castling[color] = 0
-    for k in self.give_up_castling:
-      if self.count == k - 1:
-        for i in range(len(self.give_up_castling[k])):
-          self.can_castling[
-              self.give_up_castling[k][i][0]][self.give_up_castling[k][i][1]] = True
+      self.gameboard = self.record[self.count]
+      self.advanced2_pos = self.advanced2_record.get(self.count)
+      # 駒の動きのメモを初期化
+      self.refresh_memo()
     self.startpos, self.endpos = None, None
 
   def next_move(self):
     '''一手進める'''
-    self.count += 1
-    if self.count > len(self.record) - 1:
-      self.count = len(self.record) - 1
+    count = self.count
+    undo = self.history.get(count)
+    if undo is not None:
+      promoted, arrow, castling_rook = undo['promoted'], undo['arrow'], undo['castling_rook']
+      self.history[count] = self.make_move(
+          undo['startpos'], undo['endpos'],
+          promote2=type(promoted) if promoted is not None else None,
+          castling=castling_rook is not None,
+          arrow=arrow[0] if arrow is not None else None,
+      )
+    elif self.count + 1 in self.record:
+      # ロードしたデータで差分の記録がないとき
+      self.record[self.count] = self.gameboard
+      self.count += 1
       self.playersturn = opponent[self.playersturn]
-    self.gameboard = deepcopy(self.record[self.count])
-    self.playersturn = opponent[self.playersturn]
-    # 駒の動きのメモを初期化
-    self.refresh_memo()
-    # ポーンが2歩進んだ直後であるとき
-    for k in self.advanced2_record.keys():
-      if self.count == k:
-        self.advanced2_pos = self.startpos
-    # キャスリング
-    for color, count in self.finish_castling_tmp.items():
-      if count == self.count:
-        self.finish_castling[color] = count
-    for k in self.give_up_castling.keys():
-      if self.count == k:
-        for i in range(len(self.give_up_castling[k])):
-          self.can_castling[self.give_up_castling[k][i]
-                            [0]][self.give_up_castling[k][i][1]] = False
+      self.gameboard = self.record[self.count]
+      self.advanced2_pos = self.advanced2_record.get(self.count)
+      # 駒の動きのメモを初期化
+      self.refresh_memo()
     self.startpos, self.endpos = None, None
 
+  def record_boards(self) -> 'dict[int, Board]':
+    '''
+    これまでの各手数の盤面を返す．
+    一手ずつ戻してから進めなおして盤面を集め，最後に現在の局面に戻す．
+
+    Returns
+    -------
+    : dict > {int: Board, ...}
+    '''
+    count = self.count
+    startpos, endpos = self.startpos, self.endpos
+    boards: 'dict[int, Board]' = {count: deepcopy(self.gameboard)}
+    while self.count > 0:
+      before = self.count
+      self.prev_move()
+      if self.count == before:
+        break
+      boards[self.count] = deepcopy(self.gameboard)
+    while True:
+      before = self.count
+      self.next_move()
+      if self.count == before:
+        break
+      boards[self.count] = deepcopy(self.gameboard)
+    while self.count > count:
+      self.prev_move()
+    self.startpos, self.endpos = startpos, endpos
+    return dict(sorted(boards.items()))
+
   def load_data(self):
     '''ゲームデータのロード'''
     import load_data
@@ -888,14 +1220,14 @@ class Game:
     self.mode = data['mode']
     self.level = data['level']
     self.foreseeing = data['foreseeing']
-    self.gameboard = data['gameboard']
+    self.gameboard = ArrayBoard(data['gameboard'])
     self.playersturn = data['playersturn']
     self.move_record = data['move_record']
     self.advanced2_pos = data['advanced2_pos']
     self.advanced2_record = data['advanced2_record']
     self.can_castling = data['can_castling']
     self.count = data['count']
-    self.record = data['record']
+    self.record = {number: ArrayBoard(board) for number, board in data['record'].items()}
     # ルーク・キングの初期位置の記録
     if self.kind['castling']:
       self.rook_init_pos = utils.rook_init_pos(cast(Placers, self.kind['placers']))
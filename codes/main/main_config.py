@@ -6,7 +6,7 @@ import pygame.display
 import pygame.mixer
 
 from config import WSIZE, w_icon
-from main import Game
+from engine import Game
 
 # 音声の設定
 pygame.mixer.init()
@@ -33,6 +33,12 @@ pygame.display.set_caption('Fairy Chess')
 
 game = Game()
 
+# コマンドラインで j4 のように指定されたとき
+for _arg in sys.argv[1:]:
+  if _arg[:1] == 'j' and _arg[1:].isdigit():
+    # コンピュータの探索でルートの手をその数のプロセスに分けて読む
+    game.search_workers = max(1, int(_arg[1:]))
+
 opponent = {'W': 'B', 'B': 'W'}
 
 
@@ -0,0 +1,112 @@
+'''αβ探索で読む手の並べ替え'''
+
+from typing import Optional, Tuple
+
+from custom_types import Position, Board
+
+Move = Tuple[Position, Position]
+
+# 一手数あたりに覚えておくキラー手の数
+KILLERS_PER_PLY = 2
+
+
+class MoveOrdering:
+  '''
+  αβ探索で枝刈りが早く起こるように手を並べ替える
+
+  Attributes
+  ----------
+  enabled : bool
+    False のときは置換表の最善手以外は並べ替えない．
+    並べ替えの効果を nodes で比べるのに使う．
+  killers : dict > {int: [Move, ...], ...}
+    手数ごとの，カットを起こした駒を取らない手(キラー手)．
+  history : dict > {(str, Position): int, ...}
+    (駒の name, 移動先) ごとの，カットを起こした駒を取らない手の点数．
+  nodes : int
+    探索した局面の数．
+
+  Notes
+  -----
+  読む順は次のとおり．
+    1. 置換表の最善手
+    2. 駒を取る手．取られる駒の価値が高い順，同じなら取る駒の価値が低い順(MVV-LVA)
+    3. その手数のキラー手
+    4. 駒を取らない手．history の点数が高い順
+  '''
+
+  def __init__(self, enabled: bool = True):
+    self.enabled = enabled
+    self.killers: 'dict[int, list[Move]]' = {}
+    self.history: 'dict[tuple[str, Position], int]' = {}
+    self.nodes = 0
+
+  def order(
+      self, moves: 'list[Move]', gameboard: Board, ply: int, hash_move: Optional[Move] = None,
+  ) -> 'list[Move]':
+    '''
+    moves を読む順に並べ替えて返す
+
+    Parameters
+    ----------
+    moves : list > [Move, ...]
+      動きのリスト．
+    gameboard : Board
+      動かす前の盤面．
+    ply : int
+      開始からの手数．
+    hash_move : Move | None
+      置換表の最善手．
+
+    Returns
+    -------
+    : list > [Move, ...]
+    '''
+    first: 'list[Move]' = []
+    if hash_move is not None and hash_move in moves:
+      first.append(hash_move)
+    if not self.enabled:
+      return first + [move for move in moves if move not in first]
+
+    captures: 'list[Move]' = []
+    quiets: 'list[Move]' = []
+    for move in moves:
+      if move in first:
+        continue
+      if move[1] in gameboard and move[0] != move[1]:
+        captures.append(move)
+      else:
+        quiets.append(move)
+    captures.sort(key=lambda move: (-gameboard[move[1]].value, gameboard[move[0]].value))
+    killers = [move for move in self.killers.get(ply, []) if move in quiets]
+    quiets = [move for move in quiets if move not in killers]
+    quiets.sort(key=lambda move: -self.history.get((gameboard[move[0]].name, move[1]), 0))
+    return first + captures + killers + quiets
+
+  def cutoff(self, gameboard: Board, move: Move, ply: int, depth: int):
+    '''
+    move でカットが起こったことを記録する
+
+    Parameters
+    ----------
+    gameboard : Board
+      動かす前の盤面．
+    move : Move
+      カットを起こした手．
+    ply : int
+      開始からの手数．
+    depth : int
+      残りの読みの深さ．深いところでのカットほど点数を高くする．
+    '''
+    startpos, endpos = move
+    # 駒を取る手は MVV-LVA で前に来るので記録しない
+    if endpos in gameboard and startpos != endpos:
+      return
+
+    killers = self.killers.setdefault(ply, [])
+    if move in killers:
+      killers.remove(move)
+    killers.insert(0, move)
+    del killers[KILLERS_PER_PLY:]
+    key = (gameboard[startpos].name, endpos)
+    self.history[key] = self.history.get(key, 0) + depth * depth
@@ -0,0 +1,272 @@
+'''
+ルートの手をプロセスに分けて読む αβ 探索
+
+Notes
+-----
+ルートの手を一手ずつプロセスプールに渡し，それぞれのプロセスが自分の盤面でその手の下を min_ で読む．
+盤面は Snapshot にして渡す(ArrayBoard は色プレーンと Zobrist キーごと pickle される)．
+プロセスは同じ探索の盤面と置換表を持っておき，反復深化の次の深さでも使う．
+
+α はプロセスのあいだで共有する．
+手を読み始めるときに共有の α を読み，読み終わってそれより良ければ書き込む．
+最初の手(置換表の最善手)だけを先に読んで α を決めてから，残りの手を並べて読む．
+
+共有の α は [探索の番号, α, 打ち切る時刻] の配列で，反復ごとに番号を進める．
+時間切れで打ち切った前の反復の手が残っていても，番号が違えば α を読み書きしない．
+プロセスは読んでいるあいだも番号と打ち切る時刻を確かめ，番号が変わったか時刻を過ぎたら手を読むのをやめる．
+打ち切る時刻は元のプロセスが結果を待つあいだ search_deadline から書き直すので，
+search_deadline を延ばせば読んでいる手の時間も延びる．
+'''
+
+import atexit
+import math
+import multiprocessing
+from multiprocessing.pool import Pool
+from time import perf_counter, time
+from typing import Any, Optional, Tuple, TypedDict
+
+import computer
+from custom_types import Board, Color, Position
+from games import GameType
+from main import Game, opponent
+from ordering import MoveOrdering
+from transposition import TranspositionTable, EXACT
+
+# 局面と探索の設定
+Snapshot = TypedDict('Snapshot', {
+    # 同じ探索かどうかを見分けるキー
+    'key': Tuple[Any, ...],
+    'kind': GameType,
+    'board': Board,
+    'playersturn': Color,
+    'count': int,
+    'advanced2_pos': Optional[Position],
+    'can_castling': 'dict[Color, list[bool]]',
+    'can_castling_tmp': 'dict[Color, list[bool]]',
+    'finish_castling': 'dict[Color, int]',
+    'rook_init_pos': Optional[Tuple[int, int]],
+    'king_init_pos': Optional[int],
+    'level': int,
+    'quiescence_depth': int,
+    'move_ordering': bool,
+    'tt_size_mb': float,
+})
+
+# 手の結果を待つあいだに search_cancelled と search_deadline を確かめる間隔(秒)
+POLL_INTERVAL = 0.05
+
+# プロセスの数ごとのプロセスプールと共有の α
+_pools: 'dict[int, Tuple[Pool, Any]]' = {}
+# プロセスの中の共有の α
+_shared: Any = None
+# プロセスの中の，いま読んでいる探索の盤面
+_worker: 'dict[str, Any]' = {'key': None, 'game': None}
+
+
+def snapshot(game: Game, coef: 'Tuple[int, ...]') -> Snapshot:
+  '''game の局面と探索の設定を，ほかのプロセスに渡せる形にする'''
+  assert game.kind is not None
+  return {
+      'key': (game.hash_key(), game.count, game.level, game.quiescence_depth,
+              game.move_ordering, coef),
+      'kind': game.kind,
+      'board': game.gameboard,
+      'playersturn': game.playersturn,
+      'count': game.count,
+      'advanced2_pos': game.advanced2_pos,
+      'can_castling': game.can_castling,
+      'can_castling_tmp': game.can_castling_tmp,
+      'finish_castling': game.finish_castling,
+      'rook_init_pos': game.rook_init_pos,
+      'king_init_pos': game.king_init_pos,
+      'level': game.level,
+      'quiescence_depth': game.quiescence_depth,
+      'move_ordering': game.move_ordering,
+      'tt_size_mb': game.tt_size_mb,
+  }
+
+
+def restore(state: Snapshot) -> Game:
+  '''snapshot から探索に使う Game を作る'''
+  game = Game()
+  game.kind = state['kind']
+  game.gameboard = state['board']
+  game.playersturn = state['playersturn']
+  game.count = state['count']
+  game.advanced2_pos = state['advanced2_pos']
+  game.can_castling = state['can_castling']
+  game.can_castling_tmp = state['can_castling_tmp']
+  game.finish_castling = state['finish_castling']
+  game.rook_init_pos = state['rook_init_pos']
+  game.king_init_pos = state['king_init_pos']
+  game.level = state['level']
+  game.quiescence_depth = state['quiescence_depth']
+  game.move_ordering = state['move_ordering']
+  game.tt_size_mb = state['tt_size_mb']
+  game.tt = TranspositionTable(game.tt_size_mb)
+  game.ordering = MoveOrdering(game.move_ordering)
+  game.refresh_memo()
+  return game
+
+
+def _init_worker(shared: Any):
+  global _shared
+  _shared = shared
+
+
+def _pool(workers: int) -> 'Tuple[Pool, Any]':
+  '''workers 個のプロセスのプールと共有の α．はじめて使うときに作る'''
+  if workers not in _pools:
+    shared = multiprocessing.Array('d', [0, -9999, math.inf])
+    pool = multiprocessing.Pool(workers, _init_worker, (shared,))
+    _pools[workers] = (pool, shared)
+  return _pools[workers]
+
+
+@atexit.register
+def close_pools():
+  '''プロセスプールを閉じる'''
+  for pool, _ in _pools.values():
+    pool.terminate()
+  _pools.clear()
+
+
+def _stale(generation: int) -> bool:
+  '''プロセスの中で，generation 番の探索がもう要らなくなったか'''
+  return _shared[0] != generation or time() > _shared[2]
+
+
+def _search_move(
+    task: 'Tuple[int, int, Snapshot, Tuple[Position, Position], int, Color, int, Tuple[int, ...]]',
+) -> 'Optional[Tuple[int, float, bool, int]]':
+  '''
+  プロセスの中で，ルートの手をひとつ指してその下を読む
+
+  Returns
+  -------
+  : tuple > (手の番号, 評価値, 評価値が正確か, 読んだ局面の数) | None
+    時間切れか，ほかの反復に移っていたときは None．
+  '''
+  index, generation, state, move, depth, color, count, coef = task
+  if _worker['key'] != state['key']:
+    _worker['key'], _worker['game'] = state['key'], restore(state)
+  game: Game = _worker['game']
+  assert game.ordering is not None
+  with _shared.get_lock():
+    if _shared[0] != generation:
+      return None
+    alpha = _shared[1]
+  nodes = game.ordering.nodes
+  game.search_stale = lambda: _stale(generation)
+  undo = game.make_move(*move)
+  try:
+    score = computer.min_(game, alpha, 9999, depth - 1, opponent[color], count + 1, *coef)[0]
+  except computer.SearchTimeout:
+    return None
+  finally:
+    game.unmake_move(undo)
+    game.search_stale = None
+  with _shared.get_lock():
+    if _shared[0] == generation and score > _shared[1]:
+      _shared[1] = score
+  return index, score, score > alpha, game.ordering.nodes - nodes
+
+
+def _deadline(self) -> float:
+  '''search_deadline をプロセスのあいだで比べられる時刻(time)にする．ないときは inf'''
+  if self.search_deadline is None:
+    return math.inf
+  return time() + self.search_deadline - perf_counter()
+
+
+def _check_cancelled(self, shared: Any, generation: int):
+  '''
+  探索を取りやめるよう求められていたか，思考時間を使い切っていたら，
+  残りの手を読まないように反復の番号を進めて SearchTimeout を投げる．
+  ほかの探索がすでに番号を進めていたら，その探索の番号は変えない．
+  続けるときは，プロセスが読む打ち切る時刻を search_deadline に合わせる
+  '''
+  with shared.get_lock():
+    if shared[0] != generation:
+      raise computer.SearchTimeout
+    if self.search_cancelled or (self.search_deadline is not None and perf_counter() > self.search_deadline):
+      shared[0] += 1
+      raise computer.SearchTimeout
+    shared[2] = _deadline(self)
+
+
+def search_root(self, depth: int, color: Color, count: int, *coef):
+  '''
+  ルートの手を search_workers 個のプロセスに分けて，depth 手先まで読む
+
+  Parameters
+  ----------
+  self : obj
+    基底のオブジェクト．
+    属性取り出し用．
+  depth : int
+    何手先まで読むか．
+  color : Color
+    駒色．
+  count : int
+    開始からの手数．
+  *coef : int, ...
+    調整の係数．
+
+  Returns
+  -------
+  (maxv, start, end) : tuple > (float, (int, int), (int, int))
+    max_ と同じ．
+
+  Raises
+  ------
+  SearchTimeout
+    search_deadline までに読み終わらなかったとき．
+
+  Notes
+  -----
+  perf_counter の基準はプロセスごとに違うかもしれないので，打ち切る時刻は time で渡す．
+  search_cancelled と search_deadline は手の結果を受け取るたびと，待つあいだ POLL_INTERVAL ごとに確かめる．
+  プールをほかの探索と共有していて前の手がまだ読まれていても，打ち切る時刻を過ぎれば待たない．
+  取りやめたり打ち切ったりすると反復の番号が進むので，すでに読み始めた手もプロセスの中で読むのをやめる．
+  評価値が同じ手が複数あるときは，max_ と同じく読む順が早い手を選ぶ．
+  '''
+  pool, shared = _pool(self.search_workers)
+  key = self.hash_key()
+  entry = self.tt.probe(key) if self.tt is not None else None
+  moves = computer._ordered_moves(self, color, entry)
+  if not moves:
+    return computer.max_(self, -9999, 9999, depth, color, count, *coef)
+  with shared.get_lock():
+    shared[0] += 1
+    shared[1] = -9999
+    shared[2] = _deadline(self)
+    generation = int(shared[0])
+  state = snapshot(self, coef)
+
+  def task(index: int):
+    return index, generation, state, moves[index], depth, color, count, coef
+
+  # 最初の手で α を決めてから，残りの手を並べて読む
+  first = pool.apply_async(_search_move, (task(0),))
+  while not first.ready():
+    first.wait(POLL_INTERVAL)
+    _check_cancelled(self, shared, generation)
+  results = [first.get()]
+  rest = pool.imap_unordered(_search_move, [task(i) for i in range(1, len(moves))])
+  while len(results) < len(moves):
+    try:
+      result = rest.next(POLL_INTERVAL)
+    except multiprocessing.TimeoutError:
+      _check_cancelled(self, shared, generation)
+      continue
+    _check_cancelled(self, shared, generation)
+    results.append(result)
+  if any(result is None for result in results):
+    raise computer.SearchTimeout
+  if self.ordering is not None:
+    self.ordering.nodes += sum(result[3] for result in results)
+  # 正確な評価値を，α で切られた同じ値の上界より優先する
+  index, maxv, _, _ = max(results, key=lambda result: (result[1], result[2], -result[0]))
+  start, end = moves[index]
+  return computer._stored(self, key, depth, maxv, EXACT, start, end)
@@ -0,0 +1,247 @@
+'''
+指し手生成の検証と計測(perft)
+
+Notes
+-----
+ゲームの種類ごとに，初期局面から深さ N までの合法手の木の葉の数を数え，
+一秒あたりの局面数と，駒の種類ごとの valid_moves にかかった時間を出す．
+葉の数は perft.yml の値と比べる．Normal Chess は既知の値(REFERENCE)とも比べる．
+
+合法手は engine.legal_moves で，ポーンのプロモーションは promote2 の駒ごとに別の手とする．
+アーチャー系の駒の矢は撃たない手だけを数える．
+Chess 960 は配置の番号を --chess960 で指定する(省略すると CHESS960_ID)．
+
+ウィンドウを開かずに，codes ディレクトリで次のように実行する．
+
+  python main/perft.py                      # すべてのゲームを深さ 2 まで
+  python main/perft.py 'Normal Chess' -d 4  # ゲームは名前か games の番号で指定
+  python main/perft.py -d 3 -o perft.json   # 結果を JSON に書き出す
+  python main/perft.py -d 3 --update        # perft.yml を今の葉の数で書き換える
+  python main/perft.py -d 3 --baseline perft.json  # 前に書き出した結果と速さを比べる
+
+perft.yml と合わない葉の数があると終了コード 1 で終わる．
+'''
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import argparse
+import json
+from time import perf_counter
+from typing import Optional, TypedDict
+
+import yaml
+
+from engine import Game, Timings, find_game, games, legal_moves, new_game
+
+# 深さごとの葉の数の記録
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perft.yml')
+# 既知の葉の数
+REFERENCE: 'dict[str, dict[int, int]]' = {
+    'Normal Chess': {1: 20, 2: 400, 3: 8902, 4: 197281, 5: 4865609},
+}
+# Chess 960 で使う配置の番号
+CHESS960_ID = 0
+
+# 一つの深さの結果
+DepthResult = TypedDict('DepthResult', {
+    'depth': int,
+    'nodes': int,
+    'seconds': float,
+    'nps': float,
+    # 記録や既知の値．ないときは None
+    'expected': Optional[int],
+    # expected と合うか．expected がないときは None
+    'ok': Optional[bool],
+})
+
+# 一つのゲームの結果
+GameResult = TypedDict('GameResult', {
+    'index': int,
+    'game': str,
+    'chess960': Optional[int],
+    'depths': 'list[DepthResult]',
+    # 駒の略記ごとの {'calls': int, 'seconds': float, 'moves': int}
+    'pieces': 'dict[str, dict[str, float]]',
+})
+
+
+def perft(game: Game, depth: int, timings: Optional[Timings] = None) -> int:
+  '''
+  今の局面から depth 手先までの合法手の木の葉の数
+
+  Notes
+  -----
+  盤面は make_move / unmake_move で動かして戻す．
+  最後の一手は指さずに合法手の数を数える．
+  '''
+  if depth == 0:
+    return 1
+  moves = legal_moves(game, timings)
+  if depth == 1:
+    return len(moves)
+  nodes = 0
+  for startpos, endpos, promote2 in moves:
+    undo = game.make_move(startpos, endpos, promote2)
+    try:
+      nodes += perft(game, depth - 1, timings)
+    finally:
+      game.unmake_move(undo)
+  return nodes
+
+
+def divide(game: Game, depth: int) -> 'dict[str, int]':
+  '''最初の手ごとの perft(depth - 1)．葉の数が合わないときに，どの手の下で違うかを探す'''
+  result: 'dict[str, int]' = {}
+  for startpos, endpos, promote2 in legal_moves(game):
+    undo = game.make_move(startpos, endpos, promote2)
+    try:
+      name = f'{startpos}-{endpos}' + (f'={promote2.abbr}' if promote2 is not None else '')
+      result[name] = perft(game, depth - 1)
+    finally:
+      game.unmake_move(undo)
+  return result
+
+
+def load_golden() -> 'dict[str, dict[int, int]]':
+  '''perft.yml の葉の数 : {ゲームの名前: {深さ: 葉の数}}'''
+  if not os.path.exists(GOLDEN_PATH):
+    return {}
+  with open(GOLDEN_PATH, encoding='utf8') as file:
+    return yaml.safe_load(file) or {}
+
+
+def save_golden(golden: 'dict[str, dict[int, int]]'):
+  '''葉の数を perft.yml に書き込む．ゲームの順は games の順'''
+  order = {game['name']: index for index, game in enumerate(games)}
+  ordered = {name: dict(sorted(golden[name].items()))
+             for name in sorted(golden, key=lambda name: order.get(name, len(order)))}
+  with open(GOLDEN_PATH, 'w', encoding='utf8') as file:
+    file.write('# perft の葉の数 : {ゲームの名前: {深さ: 葉の数}}\n')
+    file.write(f'# Chess 960 は配置の番号 {CHESS960_ID}．main/perft.py --update で書き換える\n')
+    yaml.safe_dump(ordered, file, allow_unicode=True, sort_keys=False)
+
+
+def expected_nodes(name: str, depth: int, golden: 'dict[str, dict[int, int]]') -> Optional[int]:
+  '''ゲーム name の深さ depth の葉の数の既知の値か記録．なければ None'''
+  reference = REFERENCE.get(name, {}).get(depth)
+  if reference is not None:
+    return reference
+  return golden.get(name, {}).get(depth)
+
+
+def run(
+    index: int, depth: int, golden: 'dict[str, dict[int, int]]',
+    chess960: int = CHESS960_ID,
+) -> GameResult:
+  '''
+  games の index 番目のゲームで，深さ 1 から depth までの perft を測る
+
+  Returns
+  -------
+  : GameResult
+  '''
+  game = new_game(index, chess960)
+  assert game.kind is not None
+  name = game.kind['name']
+  timings: Timings = {}
+  depths: 'list[DepthResult]' = []
+  for current in range(1, depth + 1):
+    start = perf_counter()
+    nodes = perft(game, current, timings)
+    seconds = perf_counter() - start
+    expected = expected_nodes(name, current, golden)
+    depths.append({
+        'depth': current,
+        'nodes': nodes,
+        'seconds': seconds,
+        'nps': nodes / seconds if seconds > 0 else 0.0,
+        'expected': expected,
+        'ok': None if expected is None else nodes == expected,
+    })
+  return {
+      'index': index,
+      'game': name,
+      'chess960': chess960 if name == 'Chess 960' else None,
+      'depths': depths,
+      'pieces': {abbr: {'calls': int(calls), 'seconds': seconds, 'moves': int(moves)}
+                 for abbr, (calls, seconds, moves) in sorted(timings.items(), key=lambda item: -item[1][1])},
+  }
+
+
+def select_games(names: 'list[str]') -> 'list[int]':
+  '''コマンドラインのゲームの指定(名前か番号)を games の番号にする．空のときはすべて'''
+  if not names:
+    return list(range(len(games)))
+  indices: 'list[int]' = []
+  for name in names:
+    try:
+      indices.append(find_game(int(name) if name.isdigit() else name))
+    except ValueError as error:
+      raise SystemExit(error)
+  return indices
+
+
+def report(result: GameResult, baseline: 'Optional[dict[tuple[str, int], float]]' = None):
+  '''結果を表にして表示する'''
+  print(f"[{result['index']}] {result['game']}")
+  for entry in result['depths']:
+    mark = '' if entry['ok'] is None else ' ok' if entry['ok'] else f" NG (expected {entry['expected']})"
+    line = f"  depth {entry['depth']}: {entry['nodes']:>10} nodes {entry['seconds']:8.2f}s {entry['nps']:9.0f} nps{mark}"
+    if baseline is not None and (result['game'], entry['depth']) in baseline:
+      before = baseline[(result['game'], entry['depth'])]
+      if before > 0:
+        line += f"  x{entry['nps'] / before:.2f}"
+    print(line)
+  total = sum(timing['seconds'] for timing in result['pieces'].values()) or 1.0
+  for abbr, timing in result['pieces'].items():
+    print(f"    {abbr:>3}: {int(timing['calls']):>8} calls {timing['seconds']:8.2f}s"
+          f" ({100 * timing['seconds'] / total:4.1f}%)")
+
+
+def main(argv: 'Optional[list[str]]' = None) -> int:
+  parser = argparse.ArgumentParser(description='perft: 合法手の木の葉の数を数えて指し手生成を検証・計測する')
+  parser.add_argument('games', nargs='*', help='ゲームの名前か games の番号．省略するとすべて')
+  parser.add_argument('-d', '--depth', type=int, default=2, help='深さ(既定 2)')
+  parser.add_argument('-o', '--output', help='結果を書き出す JSON ファイル')
+  parser.add_argument('--chess960', type=int, default=CHESS960_ID, help='Chess 960 の配置の番号')
+  parser.add_argument('--update', action='store_true', help='perft.yml を今の葉の数で書き換える')
+  parser.add_argument('--divide', action='store_true', help='最初の手ごとの葉の数を表示する')
+  parser.add_argument('--baseline', help='前に書き出した JSON と一秒あたりの局面数を比べる')
+  args = parser.parse_args(argv)
+
+  golden = load_golden()
+  baseline: 'Optional[dict[tuple[str, int], float]]' = None
+  if args.baseline:
+    with open(args.baseline, encoding='utf8') as file:
+      baseline = {(result['game'], entry['depth']): entry['nps']
+                  for result in json.load(file) for entry in result['depths']}
+
+  results: 'list[GameResult]' = []
+  for index in select_games(args.games):
+    if args.divide:
+      for move, nodes in divide(new_game(index, args.chess960), args.depth).items():
+        print(f'{move}: {nodes}')
+      continue
+    result = run(index, args.depth, {} if args.update else golden, args.chess960)
+    report(result, baseline)
+    results.append(result)
+    if args.update and (result['game'] != 'Chess 960' or args.chess960 == CHESS960_ID):
+      golden.setdefault(result['game'], {}).update(
+          {entry['depth']: entry['nodes'] for entry in result['depths']})
+
+  if args.update:
+    save_golden(golden)
+  if args.output:
+    with open(args.output, 'w', encoding='utf8') as file:
+      json.dump(results, file, ensure_ascii=False, indent=2)
+  failed = [(result['game'], entry['depth']) for result in results
+            for entry in result['depths'] if entry['ok'] is False]
+  for name, depth in failed:
+    print(f'mismatch: {name} depth {depth}', file=sys.stderr)
+  return 1 if failed else 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -5,10 +5,17 @@
 import sys
 from traceback import print_exc
 
-from main_config import game
-import draw
-import event
-import utils
+import pygame.time
+
+# 一秒あたりの描画の回数の上限
+FPS = 50
+
+# コンピュータの探索のプロセスが(spawn で)このファイルを読み直しても，ウィンドウを開かないようにする
+if __name__ == '__main__':
+  from main_config import game
+  import draw
+  import event
+  import utils
 
 
 def main():
@@ -21,18 +28,22 @@ def main():
     game.select_game = False
     game.refresh_memo()
 
+  # コンピュータが考えているあいだも一定の間隔で描画・イベント処理をする
+  clock = pygame.time.Clock()
   while True:
     draw.draw()
     event.event()
-
-
-try:
-  main()
-except Exception:
-  print('Oh, it seems that you caught an error....\n')
-  print('*' * 12)
-  print_exc()
-  print('*' * 12)
-  print('\nSave the data in data.yml...\n')
-  utils.save_print(game, error=True)
-  sys.exit(1)
+    clock.tick(FPS)
+
+
+if __name__ == '__main__':
+  try:
+    main()
+  except Exception:
+    print('Oh, it seems that you caught an error....\n')
+    print('*' * 12)
+    print_exc()
+    print('*' * 12)
+    print('\nSave the data in data.yml...\n')
+    utils.save_print(game, error=True)
+    sys.exit(1)
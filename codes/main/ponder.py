@@ -0,0 +1,135 @@
+'''
+相手(人)の番にコンピュータが考えておく(ポンダー)
+
+Notes
+-----
+人の手を予想して，その手を指したあとの局面でコンピュータの手を BackgroundSearch で探し始めておく．
+盤面が SMALL_BOARD 以下のときは人のすべての手を一手ずつ通常の思考時間で読み，
+それより大きいときは予想した手だけを人が指すまで読み続ける．
+読み続けるときも打ち切る時刻は決めておき，ポンダーが続くあいだ LEASE ずつ延ばす．
+延ばされなくなった探索は，取りやめ損ねても LEASE のうちに終わる．
+
+人が考えておいた手を指したら，その探索(置換表と最善手)をそのまま使う．
+考えた時間が思考時間に足りなければ，残りの時間だけ読み続けてから指す．
+考えておいた結果をそのまま使えるよう，人の手のあとの探索の評価の係数は，ポンダーを始めたときに決めておく．
+'''
+
+import math
+from time import perf_counter
+from typing import Optional, Tuple
+
+from background import BackgroundSearch
+import computer
+from custom_types import Color, Position
+from main import Game, opponent
+
+# 人のすべての手を考えておく盤面の大きさ
+SMALL_BOARD = 6
+# 予想した手だけを読み続けるとき，打ち切る時刻を今からどれだけ先にしておくか(秒)
+LEASE = 1.0
+
+
+class Ponder:
+  '''
+  人の番に，人の手を指したあとの局面でコンピュータの手を探しておく
+
+  Attributes
+  ----------
+  color : Color
+    コンピュータの駒色．
+  coef : tuple > (int, ...)
+    評価の係数．
+  budget : float
+    一手あたりの思考時間(秒)．
+  replies : list > [((int, int), (int, int)), ...]
+    考えておく人の手．読む順．
+  searches : dict > {(int, int): (((int, int), (int, int)), BackgroundSearch)}
+    人の手を指したあとの局面のハッシュと手数ごとの，人の手と探索．読み終わったものも残しておく．
+  '''
+
+  def __init__(self, game: Game, color: Color, previous: Optional[BackgroundSearch] = None):
+    '''
+    Parameters
+    ----------
+    game : Game
+      人の番の実際の局面．
+    color : Color
+      コンピュータの駒色．
+    previous : BackgroundSearch | None
+      直前のコンピュータの探索．与えられたとき，その置換表にある今の局面の最善手を人の手の予想にする．
+    '''
+    assert game.kind is not None
+    self.color = color
+    self.coef = computer.cpu_coef(game.level)
+    self.budget: float = (game.time_budget if game.time_budget is not None
+                          else computer.TIME_BUDGET[game.level])
+    entry = previous.probe(game.hash_key()) if previous is not None else None
+    self.replies = computer._ordered_moves(game, opponent[color], entry)
+    self._all = game.kind['size'] <= SMALL_BOARD
+    if not self._all:
+      del self.replies[1:]
+    self.searches: 'dict[Tuple[int, int], Tuple[Tuple[Position, Position], BackgroundSearch]]' = {}
+    self._next = 0
+    self._current: Optional[BackgroundSearch] = None
+
+  def step(self, game: Game):
+    '''
+    いま読んでいる探索が終わっていたら，次の人の手を指したあとの局面で探し始める．
+    人の番のあいだ，毎フレーム呼ぶ
+    '''
+    if self._current is not None and not self._current.done():
+      if not self._all:
+        self._current.extend(LEASE)
+      return
+    if self._next >= len(self.replies):
+      return
+    reply = self.replies[self._next]
+    self._next += 1
+    undo = game.make_move(*reply)
+    try:
+      key = (game.hash_key(), game.count)
+      if key not in self.searches:
+        self._current = BackgroundSearch(game, self.color, *self.coef,
+                                         budget=self.budget if self._all else math.inf)
+        self.searches[key] = reply, self._current
+    finally:
+      game.unmake_move(undo)
+
+  def current(self) -> 'Optional[Tuple[Tuple[Position, Position], BackgroundSearch]]':
+    '''いま読んでいる人の手と探索．読んでいなければ None'''
+    for reply, search in self.searches.values():
+      if search is self._current and not search.done():
+        return reply, search
+    return None
+
+  def take(self, game: Game) -> Optional[BackgroundSearch]:
+    '''
+    人が指したあとの局面の探索を取り出し，ほかの探索は取りやめる
+
+    Parameters
+    ----------
+    game : Game
+      コンピュータの番の実際の局面．
+
+    Returns
+    -------
+    : BackgroundSearch | None
+      考えておいた局面でなければ None．
+      読み終わっていなければ，思考時間の残りが過ぎたら打ち切るようにしておく．
+    '''
+    _, search = self.searches.pop((game.hash_key(), game.count), (None, None))
+    self.cancel()
+    if search is None or search.cancelled():
+      return None
+    if not search.done():
+      remaining = max(self.budget - search.elapsed(), 0)
+      search.extend(remaining)
+      search.stop_at = perf_counter() + remaining
+    return search
+
+  def cancel(self):
+    '''すべての探索を取りやめる'''
+    for _, search in self.searches.values():
+      search.cancel()
+    self.searches.clear()
+    self._next = len(self.replies)
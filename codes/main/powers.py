@@ -0,0 +1,228 @@
+'''オーファン・フレンドが受け取る動きのグラフ PowerGraph
+
+Notes
+-----
+オーファンは自分を攻撃している相手の駒の動きを，フレンドは自分を守っている味方の駒の動きを受け取る．
+オーファン・フレンドは受け取った動きで攻撃している相手のオーファンと，
+守っている味方のフレンドに，その動きをさらに与える．
+
+オーファン・フレンドを頂点，動きを与える向きを辺とするグラフで，
+頂点ごとの受け取る動き(駒のクラスの集合)を次の最小の解として求める．
+  受け取る動き(T) = 普通の駒から受け取る動き(T) ∪ (T に辺が向いている頂点 P の受け取る動き(P))
+辺は受け取る動きが増えるほど増えるので，増えた頂点だけを待ち行列に入れ直して
+変わらなくなるまで繰り返す(再帰しない)．
+動きは駒のクラスの数しかないので，頂点が待ち行列に入る回数は 頂点の数 × 駒のクラスの数 までで終わる．
+
+一手指したあとは，普通の駒から受け取る動きと，受け取っている動きのクラスごとの辺が
+変わらなかった頂点はそのまま使い，変わった頂点と，元のグラフでそれとつながっていた頂点だけを求め直す．
+普通の駒から受け取る動きは AttackMap.reaches で引くので，
+書き換わったマスを読んでいない駒の移動先は求め直さない．
+合法手の判定で動かしてみる盤面には fork でグラフを引き継ぎ，同じように変わった部分だけ求め直す．
+'''
+
+from collections import deque
+from copy import copy
+from typing import Iterable, Optional, Type, TypedDict
+
+from attack_map import AttackMap
+from custom_types import Board, Color, Position, PositionSet
+from pieces.piece import Piece, piece_moves
+
+# 動きを受け取る駒
+RECEIVERS = ('Op', 'Fr')
+
+# グラフの頂点
+Node = TypedDict('Node', {
+    # 駒
+    'piece': Piece,
+    # 普通の駒から受け取る動き
+    'base': 'frozenset[Type[Piece]]',
+    # 受け取る動き
+    'power': 'set[Type[Piece]]',
+    # 受け取る動きのクラスごとの，そのクラスの動きで動きを与える頂点の位置
+    'targets': 'dict[Type[Piece], frozenset[Position]]',
+})
+
+
+class PowerGraph:
+  '''
+  オーファン・フレンドが受け取る動きのグラフ
+
+  Attributes
+  ----------
+  size : int
+    盤面の大きさ．
+  board : Board | None
+    グラフの盤面．
+    ほかの盤面で求めるときはグラフを作り直す．
+  nodes : dict > {Position: Node}
+    オーファン・フレンドの位置ごとの頂点．
+  recomputed : int
+    受け取る動きを求め直した頂点の数．
+  '''
+
+  def __init__(self, size: int):
+    self.size = size
+    self.board: Optional[Board] = None
+    self.nodes: 'dict[Position, Node]' = {}
+    self.recomputed = 0
+
+  def fork(self, board: Board) -> 'PowerGraph':
+    '''
+    グラフの盤面を複製した board で使うグラフ．
+    board のオーファン・フレンドを複製に置き換え，受け取る動きを引き継ぐ．
+    グラフの盤面の駒の受け取る動きは書き換えない
+
+    Parameters
+    ----------
+    board : Board
+      グラフの盤面を複製した盤面．動かす前に渡す．
+    '''
+    graph = PowerGraph(self.size)
+    graph.board = board
+    for pos, node in self.nodes.items():
+      if board.get(pos) is not node['piece']:
+        continue
+      replica = copy(node['piece'])
+      board[pos] = replica
+      graph.nodes[pos] = {'piece': replica, 'base': node['base'],
+                          'power': set(node['power']), 'targets': dict(node['targets'])}
+    return graph
+
+  def refresh(
+      self, board: Board, attacks: AttackMap, changed: 'Optional[Iterable[Position]]' = None,
+  ):
+    '''
+    盤面 board のオーファン・フレンドの受け取る動きを求め，
+    駒の tmp_potentials と tmp_moves に入れる
+
+    Parameters
+    ----------
+    board : Board
+      盤面．
+    attacks : AttackMap
+      board に同期した利きの表．
+    changed : Iterable > [Position, ...] | None
+      与えられたとき，board は attacks の盤面の changed のマスだけを書き換えた盤面．
+    '''
+    receivers = {pos: piece for pos, piece in board.items() if piece.abbr in RECEIVERS}
+    old_nodes = self.nodes if board is self.board else {}
+    self.board = board
+    if not receivers:
+      self.nodes = {}
+      return
+
+    bases = self._bases(board, attacks, receivers, () if changed is None else set(changed))
+    nodes: 'dict[Position, Node]' = {}
+    # 求め直す頂点 : 新しい頂点，普通の駒から受け取る動きか辺が変わった頂点，なくなった頂点
+    dirty: 'set[Position]' = set(pos for pos, node in old_nodes.items()
+                                 if receivers.get(pos) is not node['piece'])
+    for pos, piece in receivers.items():
+      old = old_nodes.get(pos)
+      if old is None or old['piece'] is not piece or old['base'] != bases[pos]:
+        dirty.add(pos)
+        continue
+      targets = {cls: self._targets(cls, pos, piece.color, board, receivers) for cls in old['power']}
+      if targets != old['targets']:
+        dirty.add(pos)
+        continue
+      nodes[pos] = {'piece': piece, 'base': old['base'], 'power': old['power'], 'targets': targets}
+
+    # 元のグラフで求め直す頂点とつながっていた頂点も求め直す
+    affected = self._component(old_nodes, dirty)
+    for pos in affected:
+      if pos in receivers:
+        nodes[pos] = {'piece': receivers[pos], 'base': bases[pos],
+                      'power': set(bases[pos]), 'targets': {}}
+    self.nodes = nodes
+    self.recomputed += len(affected & receivers.keys())
+    self._solve(board, receivers, [pos for pos in receivers if pos in affected])
+
+    for pos, node in nodes.items():
+      piece = node['piece']
+      piece.tmp_potentials = set(node['power'])
+      moves: PositionSet = set()
+      for cls in node['power']:
+        moves |= piece_moves(cls, *pos, board, piece.color, self.size)
+      piece.tmp_moves = moves
+
+  def _bases(
+      self, board: Board, attacks: AttackMap, receivers: 'dict[Position, Piece]',
+      changed: 'Iterable[Position]',
+  ) -> 'dict[Position, frozenset[Type[Piece]]]':
+    '''
+    オーファン・フレンドごとの，普通の駒(オーファン・フレンドでない駒)から受け取る動き．
+    オーファンは攻撃している相手の駒，フレンドは守っている味方の駒から受け取る
+    '''
+    bases: 'dict[Position, set[Type[Piece]]]' = {pos: set() for pos in receivers}
+    for pos, piece in board.items():
+      if piece.abbr in RECEIVERS:
+        continue
+      for target in attacks.reaches(piece, pos, board, changed):
+        receiver = receivers.get(target)
+        if receiver is not None and (receiver.color == piece.color) == (receiver.abbr == 'Fr'):
+          bases[target].add(type(piece))
+    return {pos: frozenset(base) for pos, base in bases.items()}
+
+  def _targets(
+      self, cls: Type[Piece], pos: Position, color: Color, board: Board,
+      receivers: 'dict[Position, Piece]',
+  ) -> 'frozenset[Position]':
+    '''
+    pos にいる color のオーファン・フレンドが cls の動きを与える頂点の位置．
+    cls の動きで攻撃している相手のオーファンと，守っている味方のフレンド
+    '''
+    opponent_color: Color = 'B' if color == 'W' else 'W'
+    targets = set()
+    for target in piece_moves(cls, *pos, board, color, self.size):
+      if target in receivers and receivers[target].abbr == 'Op':
+        targets.add(target)
+    # 相手の駒としたときの移動先にいる味方の駒は守られている
+    for target in piece_moves(cls, *pos, board, opponent_color, self.size):
+      if target in receivers and receivers[target].abbr == 'Fr':
+        targets.add(target)
+    return frozenset(targets)
+
+  def _component(self, nodes: 'dict[Position, Node]', starts: 'set[Position]') -> 'set[Position]':
+    '''グラフ nodes で starts とつながっている(辺の向きは問わない)頂点の位置．starts も含む'''
+    neighbors: 'dict[Position, set[Position]]' = {}
+    for pos, node in nodes.items():
+      for targets in node['targets'].values():
+        for target in targets:
+          neighbors.setdefault(pos, set()).add(target)
+          neighbors.setdefault(target, set()).add(pos)
+    component = set(starts)
+    stack = list(starts)
+    while stack:
+      for neighbor in neighbors.get(stack.pop(), ()):
+        if neighbor not in component:
+          component.add(neighbor)
+          stack.append(neighbor)
+    return component
+
+  def _solve(self, board: Board, receivers: 'dict[Position, Piece]', queue: 'list[Position]'):
+    '''
+    queue の頂点から受け取る動きを与えていき，変わらなくなるまで繰り返す
+
+    Notes
+    -----
+    頂点が待ち行列に入るのは受け取る動きが増えたときだけで，
+    受け取る動きは駒のクラスの数より増えないので，有限回で終わる．
+    '''
+    waiting = deque(queue)
+    queued = set(queue)
+    while waiting:
+      pos = waiting.popleft()
+      queued.discard(pos)
+      node = self.nodes[pos]
+      color = node['piece'].color
+      for cls in node['power']:
+        if cls not in node['targets']:
+          node['targets'][cls] = self._targets(cls, pos, color, board, receivers)
+      for target in frozenset().union(*node['targets'].values()):
+        target_node = self.nodes[target]
+        if not node['power'] <= target_node['power']:
+          target_node['power'] |= node['power']
+          if target not in queued:
+            waiting.append(target)
+            queued.add(target)
@@ -0,0 +1,123 @@
+'''
+コンピュータの探索の計測
+
+Notes
+-----
+決まった局面を決まった深さまで読み，プロセスひとつのときと，
+ルートの手を分けて読んだとき(search_workers)の時間・局面の数・速さの比を出す．
+局面は初期局面と，乱数の種から決まる手を何手か指した局面．
+評価の係数は COEF に決めておき，一回ごとに置換表と手の並べ替えを作り直す．
+
+ウィンドウを開かずに，codes ディレクトリで次のように実行する．
+
+  python main/search_bench.py                          # Normal Chess と Chess 960 を深さ 3 で
+  python main/search_bench.py 'Normal Chess' -d 4 -j 8  # ゲームは名前か games の番号で指定
+'''
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import argparse
+import random
+from time import perf_counter
+from typing import Optional, TypedDict
+
+from engine import Game, computer, find_game, legal_moves, new_game
+from ordering import MoveOrdering
+from transposition import TranspositionTable
+import parallel
+
+# 既定で測るゲーム
+STANDARD_GAMES = ['Normal Chess', 'Chess 960']
+# cpu_static_value の調整の係数
+COEF = (20, 20, 4)
+# Chess 960 で使う配置の番号
+CHESS960_ID = 0
+
+# 一つの局面の結果
+BenchResult = TypedDict('BenchResult', {
+    'game': str,
+    'plies': int,
+    'workers': int,
+    'seconds': float,
+    'nodes': int,
+    'move': str,
+    'score': float,
+})
+
+
+def positions(kind: int, count: int, seed: int = 0) -> 'list[Game]':
+  '''初期局面と，乱数で 4 手，8 手，... 指した局面．あわせて count 個'''
+  result: 'list[Game]' = []
+  rng = random.Random(seed)
+  for index in range(count):
+    game = new_game(kind, CHESS960_ID)
+    plies = 0 if index == 0 else 4 * index
+    for _ in range(plies):
+      moves = legal_moves(game)
+      if not moves:
+        break
+      game.make_move(*rng.choice(moves))
+    result.append(game)
+  return result
+
+
+def search(game: Game, depth: int, workers: int) -> BenchResult:
+  '''game の手番の側で depth 手先まで読む'''
+  assert game.kind is not None
+  game.level = 3
+  game.search_workers = workers
+  game.tt = TranspositionTable(game.tt_size_mb)
+  game.ordering = MoveOrdering(game.move_ordering)
+  start = perf_counter()
+  score, startpos, endpos = computer.search_root(game, depth, game.playersturn, game.count, *COEF)
+  seconds = perf_counter() - start
+  return {
+      'game': game.kind['name'],
+      'plies': game.count,
+      'workers': workers,
+      'seconds': seconds,
+      'nodes': game.ordering.nodes,
+      'move': f'{startpos}-{endpos}',
+      'score': score,
+  }
+
+
+def main(argv: 'Optional[list[str]]' = None) -> int:
+  parser = argparse.ArgumentParser(description='コンピュータの探索を，プロセスひとつのときと分けて読んだときで比べる')
+  parser.add_argument('games', nargs='*', help=f"ゲームの名前か games の番号．省略すると {', '.join(STANDARD_GAMES)}")
+  parser.add_argument('-d', '--depth', type=int, default=3, help='深さ(既定 3)')
+  parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                      help='ルートの手を分けて読むプロセスの数(既定は CPU のコア数)')
+  parser.add_argument('-n', '--positions', type=int, default=3, help='ゲームごとの局面の数(既定 3)')
+  parser.add_argument('--seed', type=int, default=0, help='局面を作る乱数の種(既定 0)')
+  args = parser.parse_args(argv)
+  if args.workers < 2:
+    parser.error('--workers must be 2 or more')
+
+  try:
+    kinds = [find_game(int(name) if name.isdigit() else name) for name in args.games or STANDARD_GAMES]
+  except ValueError as error:
+    raise SystemExit(error)
+  # プロセスを作る時間は測らない
+  parallel._pool(args.workers)
+
+  totals = {1: 0.0, args.workers: 0.0}
+  for kind in kinds:
+    for game in positions(kind, args.positions, args.seed):
+      serial = search(game, args.depth, 1)
+      split = search(game, args.depth, args.workers)
+      totals[1] += serial['seconds']
+      totals[args.workers] += split['seconds']
+      same = '' if (serial['move'], serial['score']) == (split['move'], split['score']) else '  (differs)'
+      print(f"{serial['game']} ply {serial['plies']:>2}: {serial['seconds']:7.2f}s {serial['nodes']:>8} nodes"
+            f" -> {split['seconds']:7.2f}s {split['nodes']:>8} nodes with {args.workers} workers"
+            f"  x{serial['seconds'] / split['seconds']:.2f}  {split['move']} {split['score']:.1f}{same}")
+  if totals[args.workers] > 0:
+    print(f'total: {totals[1]:.2f}s -> {totals[args.workers]:.2f}s  x{totals[1] / totals[args.workers]:.2f}')
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,336 @@
+'''
+コンピュータどうしの対局(自己対局)
+
+Notes
+-----
+ふたつのコンピュータの設定 a, b で同じゲームを N 局指し，一局ごとの結果を JSONL に一行ずつ書き出す．
+評価の係数(cpu_static_value の coef)や強さを変えたときに，どちらが強いかを統計的に比べるのに使う．
+
+対局は multiprocessing のプロセスで並べて指す(既定は CPU のコア数)．
+一局が終わるたびに書き出すので，途中で止めても同じコマンドでもう一度実行すれば，
+書き出してある対局を飛ばして続きから指す．
+
+コンピュータの設定は YAML の辞書(ファイルのパスか文字列)で指定する．
+  level : int -- 強さ(1-5)．既定 3
+  foreseeing : bool -- 先読みするか．既定 false
+  coef : list > [int, int, int] | null -- 評価の係数．null のときは level から手ごとに乱数で決める
+  budget : float | null -- 先読みするときの一手あたりの思考時間(秒)．null のときは level で決まる
+
+既定では a と b が一局ごとに白黒を入れ替える．
+id 番目の対局の乱数の種は seed + id なので，同じ設定なら同じ対局になる(思考時間で読みの深さが変わらない限り)．
+
+ウィンドウを開かずに，codes ディレクトリで次のように実行する．
+
+  python main/selfplay.py 'Normal Chess' -n 100 -o selfplay.jsonl \\
+      -a '{level: 3, coef: [20, 20, 4]}' -b '{level: 3, coef: [30, 20, 4]}'
+  python main/selfplay.py 0 -n 20 -j 4 -a '{foreseeing: true, budget: 0.5}' -b b.yml
+'''
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
+
+import argparse
+import json
+import math
+import multiprocessing
+import random
+from time import perf_counter
+from typing import Iterable, Optional, TypedDict
+
+import yaml
+
+from engine import Game, computer, find_game, games, legal_moves, new_game, notation
+
+# 一局の最大の手数(片方の一手を一手と数える)．超えたら引き分け
+MAX_PLIES = 200
+# 同じ局面が何回現れたら引き分けにするか
+REPETITIONS = 3
+
+# コンピュータの設定
+Player = TypedDict('Player', {
+    # 'a' か 'b'
+    'name': str,
+    'level': int,
+    'foreseeing': bool,
+    'coef': 'Optional[list[int]]',
+    'budget': Optional[float],
+})
+
+# 一局の設定
+Task = TypedDict('Task', {
+    'id': int,
+    # games の番号
+    'game': int,
+    'chess960': Optional[int],
+    'seed': int,
+    'white': Player,
+    'black': Player,
+    'max_plies': int,
+})
+
+# 一局の結果
+GameRecord = TypedDict('GameRecord', {
+    'id': int,
+    'game': str,
+    'chess960': Optional[int],
+    'seed': int,
+    'white': Player,
+    'black': Player,
+    # '1-0', '0-1', '1/2-1/2'
+    'result': str,
+    # 'checkmate', 'stalemate', 'repetition', 'max plies'
+    'reason': str,
+    'plies': int,
+    # 'e2e4' のような手の記録．プロモーションは 'e7e8=Q'
+    'moves': 'list[str]',
+    # 一手ごとの思考時間(秒)
+    'seconds': 'list[float]',
+})
+
+DEFAULT_PLAYER: Player = {'name': '', 'level': 3, 'foreseeing': False, 'coef': None, 'budget': None}
+
+
+def parse_player(name: str, spec: Optional[str]) -> Player:
+  '''
+  コマンドラインのコンピュータの設定を Player にする
+
+  Parameters
+  ----------
+  name : str
+    'a' か 'b'．
+  spec : str | None
+    YAML ファイルのパスか YAML の辞書の文字列．None のときは既定の設定．
+  '''
+  data = {}
+  if spec is not None:
+    if os.path.exists(spec):
+      with open(spec, encoding='utf8') as file:
+        data = yaml.safe_load(file) or {}
+    else:
+      data = yaml.safe_load(spec) or {}
+  if not isinstance(data, dict):
+    raise SystemExit(f'player {name}: expected a mapping, got {spec!r}')
+  unknown = set(data) - set(DEFAULT_PLAYER)
+  if unknown:
+    raise SystemExit(f"player {name}: unknown keys {', '.join(sorted(unknown))}")
+  player: Player = {**DEFAULT_PLAYER, **data, 'name': name}  # type: ignore
+  if not 1 <= player['level'] <= 5:
+    raise SystemExit(f"player {name}: level must be 1-5, got {player['level']}")
+  if player['coef'] is not None and len(player['coef']) != 3:
+    raise SystemExit(f"player {name}: coef must have 3 numbers, got {player['coef']}")
+  return player
+
+
+def _set_player(game: Game, player: Player):
+  '''コンピュータの設定を game に入れる'''
+  game.level = player['level']
+  game.foreseeing = player['foreseeing']
+  game.time_budget = player['budget']
+
+
+def play(task: Task) -> GameRecord:
+  '''
+  一局指す
+
+  Notes
+  -----
+  手は computer.choose_move で選び，make_move で指す(プロモーションは promote2 の最後の駒)．
+  手番の側に合法手がなくなったら，チェックされていればチェックメイト，いなければステイルメイト．
+  '''
+  random.seed(task['seed'])
+  game = new_game(task['game'], task['chess960'])
+  assert game.kind is not None
+  players = {'W': task['white'], 'B': task['black']}
+  seen: 'dict[int, int]' = {game.hash_key(): 1}
+  moves: 'list[str]' = []
+  seconds: 'list[float]' = []
+  while True:
+    color = game.playersturn
+    if not legal_moves(game):
+      if game.is_check(color, game.gameboard):
+        result, reason = ('0-1' if color == 'W' else '1-0'), 'checkmate'
+      else:
+        result, reason = '1/2-1/2', 'stalemate'
+      break
+    if len(moves) >= task['max_plies']:
+      result, reason = '1/2-1/2', 'max plies'
+      break
+    player = players[color]
+    _set_player(game, player)
+    start = perf_counter()
+    startpos, endpos = computer.choose_move(game, color, *(player['coef'] or ()))
+    seconds.append(round(perf_counter() - start, 4))
+    assert startpos is not None and endpos is not None
+    promotable = game._promotable(game.gameboard[startpos], endpos)
+    game.make_move(startpos, endpos)
+    moves.append(notation(startpos, endpos, game.gameboard[endpos].abbr if promotable else None))
+    key = game.hash_key()
+    seen[key] = seen.get(key, 0) + 1
+    if seen[key] >= REPETITIONS:
+      result, reason = '1/2-1/2', 'repetition'
+      break
+  return {
+      'id': task['id'],
+      'game': game.kind['name'],
+      'chess960': task['chess960'],
+      'seed': task['seed'],
+      'white': task['white'],
+      'black': task['black'],
+      'result': result,
+      'reason': reason,
+      'plies': len(moves),
+      'moves': moves,
+      'seconds': seconds,
+  }
+
+
+def make_tasks(
+    kind: int, count: int, a: Player, b: Player, seed: int = 0,
+    chess960: Optional[int] = None, swap: bool = True, max_plies: int = MAX_PLIES,
+) -> 'list[Task]':
+  '''
+  count 局の設定
+
+  Parameters
+  ----------
+  kind : int
+    games の番号．
+  chess960 : int | None
+    Chess 960 の配置の番号．None のときは対局ごとに乱数の種から決める．
+  swap : bool
+    True のとき，奇数番目の対局は b が白．
+  '''
+  tasks: 'list[Task]' = []
+  for id_ in range(count):
+    position = None
+    if games[kind]['name'] == 'Chess 960':
+      position = chess960 if chess960 is not None else random.Random(seed + id_).choice(
+          [pos_id for pos_id in range(960) if pos_id != 518])
+    white, black = (b, a) if swap and id_ % 2 == 1 else (a, b)
+    tasks.append({'id': id_, 'game': kind, 'chess960': position, 'seed': seed + id_,
+                  'white': white, 'black': black, 'max_plies': max_plies})
+  return tasks
+
+
+def load_records(path: str, tasks: 'Iterable[Task]') -> 'list[GameRecord]':
+  '''
+  path に書き出してある結果．続きから指すときに使う
+
+  Notes
+  -----
+  途中で止めたときに書きかけになった行は捨て，ファイルも書き直す．
+  同じ id の対局の設定が tasks と違うときは，別の対局の記録なので終了する．
+  '''
+  if not os.path.exists(path):
+    return []
+  with open(path, encoding='utf8') as file:
+    lines = file.read().splitlines()
+  records: 'list[GameRecord]' = []
+  broken = False
+  for line in lines:
+    try:
+      records.append(json.loads(line))
+    except json.JSONDecodeError:
+      broken = True
+  if broken:
+    with open(path, 'w', encoding='utf8') as file:
+      file.writelines(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+
+  by_id = {task['id']: task for task in tasks}
+  for record in records:
+    task = by_id.get(record['id'])
+    if task is not None and (record['white'], record['black'], record['seed'], record['chess960']) \
+            != (task['white'], task['black'], task['seed'], task['chess960']):
+      raise SystemExit(f"{path}: game {record['id']} was played with other settings; use another output file")
+  return records
+
+
+def summary(records: 'Iterable[GameRecord]') -> 'dict[str, float]':
+  '''
+  a から見た成績
+
+  Returns
+  -------
+  : dict
+    games, wins, draws, losses -- 対局数，a の勝ち・引き分け・負けの数
+    score -- a の得点率(勝ち 1，引き分け 0.5)
+    elo, elo_error -- 得点率から求めた a と b のレーティングの差と，その 95% 信頼区間の幅の半分
+  '''
+  points: 'list[float]' = []
+  for record in records:
+    if record['result'] == '1/2-1/2':
+      points.append(0.5)
+    else:
+      white_won = record['result'] == '1-0'
+      points.append(1.0 if white_won == (record['white']['name'] == 'a') else 0.0)
+  n = len(points)
+  stats = {'games': n, 'wins': points.count(1.0), 'draws': points.count(0.5), 'losses': points.count(0.0),
+           'score': 0.0, 'elo': 0.0, 'elo_error': math.inf}
+  if n == 0:
+    return stats
+  score = sum(points) / n
+  deviation = math.sqrt(sum((point - score) ** 2 for point in points) / n)
+  margin = 1.96 * deviation / math.sqrt(n)
+
+  def elo(score: float) -> float:
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1) + 0.0
+
+  stats.update(score=score, elo=elo(score),
+               elo_error=(elo(score + margin) - elo(score - margin)) / 2)
+  return stats
+
+
+def main(argv: 'Optional[list[str]]' = None) -> int:
+  parser = argparse.ArgumentParser(description='コンピュータどうしで対局し，結果を JSONL に書き出す')
+  parser.add_argument('game', help='ゲームの名前か games の番号')
+  parser.add_argument('-n', '--games', type=int, default=10, help='対局数(既定 10)')
+  parser.add_argument('-o', '--output', default='selfplay.jsonl', help='結果を書き出す JSONL ファイル')
+  parser.add_argument('-a', help='コンピュータ a の設定(YAML ファイルのパスか YAML の辞書)')
+  parser.add_argument('-b', help='コンピュータ b の設定')
+  parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                      help='並べて指すプロセスの数(既定は CPU のコア数)')
+  parser.add_argument('--seed', type=int, default=0, help='乱数の種(既定 0)')
+  parser.add_argument('--chess960', type=int, help='Chess 960 の配置の番号．省略すると対局ごとに決める')
+  parser.add_argument('--max-plies', type=int, default=MAX_PLIES, help=f'一局の最大の手数(既定 {MAX_PLIES})')
+  parser.add_argument('--no-swap', action='store_true', help='白黒を入れ替えず，a がいつも白')
+  args = parser.parse_args(argv)
+
+  try:
+    kind = find_game(int(args.game) if args.game.isdigit() else args.game)
+  except ValueError as error:
+    raise SystemExit(error)
+  a, b = parse_player('a', args.a), parse_player('b', args.b)
+  tasks = make_tasks(kind, args.games, a, b, args.seed, args.chess960, not args.no_swap, args.max_plies)
+  records = load_records(args.output, tasks)
+  done = {record['id'] for record in records}
+  todo = [task for task in tasks if task['id'] not in done]
+  if done:
+    print(f'resume: {len(done)} games already in {args.output}')
+
+  with open(args.output, 'a', encoding='utf8') as file:
+    def write(record: GameRecord):
+      file.write(json.dumps(record, ensure_ascii=False) + '\n')
+      file.flush()
+      records.append(record)
+      per_move = sum(record['seconds']) / max(record['plies'], 1)
+      print(f"[{record['id']}] {record['white']['name']}-{record['black']['name']} {record['result']:>7}"
+            f" {record['reason']:<10} {record['plies']:>4} plies {per_move:6.2f}s/move")
+
+    if args.workers <= 1 or len(todo) <= 1:
+      for task in todo:
+        write(play(task))
+    else:
+      with multiprocessing.Pool(min(args.workers, len(todo))) as pool:
+        for record in pool.imap_unordered(play, todo):
+          write(record)
+
+  stats = summary(record for record in records if record['id'] < args.games)
+  print(f"a: +{stats['wins']} ={stats['draws']} -{stats['losses']} / {stats['games']}"
+        f"  score {100 * stats['score']:.1f}%  elo {stats['elo']:+.0f} ± {stats['elo_error']:.0f}")
+  return 0
+
+
+if __name__ == '__main__':
+  sys.exit(main())
@@ -0,0 +1,128 @@
+'''αβ探索のための置換表'''
+
+from typing import Optional, Tuple, Literal
+
+from custom_types import Position
+
+# 評価値の種類
+# 正確な値
+EXACT = 0
+# 下界(β カットされた)
+LOWER = 1
+# 上界(α カットされた)
+UPPER = 2
+
+Bound = Literal[0, 1, 2]
+Move = Tuple[Optional[Position], Optional[Position]]
+# (ハッシュ, 深さ, 評価値, 評価値の種類, 最善手)
+Entry = Tuple[int, int, float, Bound, Move]
+
+# 1 エントリあたりの大きさの見積もり(バイト)
+# エントリのタプル，ハッシュの int，評価値，最善手のタプルとリストの要素ぶん
+ENTRY_SIZE = 256
+
+
+class TranspositionTable:
+  '''
+  固定の大きさの置換表
+
+  Attributes
+  ----------
+  size : int
+    エントリを入れるスロットの数．
+  hits, misses : int
+    probe で局面が見つかった回数，見つからなかった回数．
+  stores : int
+    store でエントリを書き込んだ回数．
+
+  Notes
+  -----
+  スロットはハッシュを size で割った余りで決まる．
+  同じスロットにすでに別の局面があるときは，読みの深さが同じかより深いときだけ置き換える．
+  '''
+
+  def __init__(self, size_mb: float = 16):
+    '''
+    Parameters
+    ----------
+    size_mb : float
+      使ってよいメモリの大きさ(MB)．
+    '''
+    self.size = max(1, int(size_mb * 2**20) // ENTRY_SIZE)
+    self.entries: 'list[Optional[Entry]]' = [None] * self.size
+    self.hits = 0
+    self.misses = 0
+    self.stores = 0
+
+  def clear(self):
+    '''エントリと回数をすべて消す'''
+    self.entries = [None] * self.size
+    self.hits = 0
+    self.misses = 0
+    self.stores = 0
+
+  def probe(self, key: int) -> Optional[Entry]:
+    '''
+    局面のエントリを返す．なければ None
+
+    Parameters
+    ----------
+    key : int
+      局面のハッシュ．
+
+    Returns
+    -------
+    : Entry | None
+    '''
+    entry = self.entries[key % self.size]
+    if entry is not None and entry[0] == key:
+      self.hits += 1
+      return entry
+    self.misses += 1
+    return None
+
+  def store(self, key: int, depth: int, value: float, bound: Bound, move: Move):
+    '''
+    局面のエントリを書き込む
+
+    Parameters
+    ----------
+    key : int
+      局面のハッシュ．
+    depth : int
+      読みの深さ．
+    value : float
+      評価値．
+    bound : int > EXACT, LOWER, UPPER
+      評価値の種類．
+    move : tuple > (Position | None, Position | None)
+      最善手．
+    '''
+    index = key % self.size
+    entry = self.entries[index]
+    if entry is None or entry[0] == key or depth >= entry[1]:
+      self.entries[index] = (key, depth, value, bound, move)
+      self.stores += 1
+
+  def cutoff(self, entry: Entry, depth: int, alpha: float, beta: float) -> bool:
+    '''
+    entry の評価値をそのまま探索結果として使えるとき True
+
+    Parameters
+    ----------
+    entry : Entry
+      probe の返り値．
+    depth : int
+      これから読む深さ．
+    alpha, beta : float
+    '''
+    _, entry_depth, value, bound, _ = entry
+    if entry_depth < depth:
+      return False
+    return (bound == EXACT
+            or bound == LOWER and value >= beta
+            or bound == UPPER and value <= alpha)
+
+  def usage(self) -> float:
+    '''使われているスロットの割合'''
+    return sum(entry is not None for entry in self.entries) / self.size
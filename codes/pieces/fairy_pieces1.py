@@ -33,9 +33,9 @@ class Unicorn(Piece):
   abbr = 'Un'
   value = 5.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, rider,
-                      (x, y, gameboard, self.color, dir8(1, 2), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return rider(x, y, gameboard, color, dir8(1, 2), size)
 
 
 class Tank(Piece):
@@ -52,77 +52,74 @@ class Tank(Piece):
     if kwargs.get('return_capture'):
       return capture
 
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
       move = rider(x, y, gameboard, self.color, dir8(0, 1), size, move_only=True)
-      self.tmp_moves = move | capturing_moves(capture, gameboard, self.color, size)
-    return self.tmp_moves
+      moves = move | capturing_moves(capture, gameboard, self.color, size)
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
 
 class Griffin(Piece):
   abbr = 'Gr'
   value = 11.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (leaper(x, y, gameboard, self.color, dir8(1, 1), size=kwargs['size'])
-                        | slide_rider(x, y, gameboard, self.color,
-                                      [[(1, 1)], [(1, -1)], [(-1, -1)], [(-1, 1)]],
-                                      [[(0, 1), (1, 0)], [(1, 0), (0, -1)], [(0, -1), (-1, 0)], [(-1, 0), (0, 1)]],
-                                      size=kwargs['size']))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (leaper(x, y, gameboard, color, dir8(1, 1), size=size)
+             | slide_rider(x, y, gameboard, color,
+                           [[(1, 1)], [(1, -1)], [(-1, -1)], [(-1, 1)]],
+                           [[(0, 1), (1, 0)], [(1, 0), (0, -1)], [(0, -1), (-1, 0)], [(-1, 0), (0, 1)]],
+                           size=size))
+    return moves
 
 
 class LaserMachine(Piece):
   abbr = 'LM'
   value = 12.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (leaper(x, y, gameboard, self.color, dir8(0, 1), size=kwargs['size'])
-                        | slide_rider(x, y, gameboard, self.color,
-                                      [[(0, 1)], [(1, 0)], [(0, -1)], [(-1, 0)]],
-                                      [[(-1, 1), (1, 1)], [(1, 1), (1, -1)], [(1, -1), (-1, -1)], [(-1, -1), (-1, 1)]],
-                                      size=kwargs['size']))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (leaper(x, y, gameboard, color, dir8(0, 1), size=size)
+             | slide_rider(x, y, gameboard, color,
+                           [[(0, 1)], [(1, 0)], [(0, -1)], [(-1, 0)]],
+                           [[(-1, 1), (1, 1)], [(1, 1), (1, -1)], [(1, -1), (-1, -1)], [(-1, -1), (-1, 1)]],
+                           size=size))
+    return moves
 
 
 class Rhinoceros(Piece):
   abbr = 'Rh'
   value = 12.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (Knight(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | slide_rider(x, y, gameboard, self.color,
-                                      [[i] for i in dir8(1, 2)],
-                                      sum([[[(1, 1)]] * 2,
-                                           [[(1, -1)]] * 2,
-                                          [[(-1, -1)]] * 2,
-                                          [[(-1, 1)]] * 2], []),
-                                      size=kwargs['size']))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(Knight, x, y, gameboard, color, size)
+             | slide_rider(x, y, gameboard, color,
+                           [[i] for i in dir8(1, 2)],
+                           sum([[[(1, 1)]] * 2,
+                                [[(1, -1)]] * 2,
+                               [[(-1, -1)]] * 2,
+                               [[(-1, 1)]] * 2], []),
+                           size=size))
+    return moves
 
 
 class Hippopotamus(Piece):
   abbr = 'Hp'
   value = 20.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (Knight(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | slide_rider(x, y, gameboard, self.color,
-                                      [[i] for i in dir8(1, 2)],
-                                      sum([[[(0, 1), (1, 0)]] * 2,
-                                           [[(1, 0), (0, -1)]] * 2,
-                                          [[(0, -1), (-1, 0)]] * 2,
-                                          [[(-1, 0), (0, 1)]] * 2], []),
-                                      size=kwargs['size']))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(Knight, x, y, gameboard, color, size)
+             | slide_rider(x, y, gameboard, color,
+                           [[i] for i in dir8(1, 2)],
+                           sum([[[(0, 1), (1, 0)]] * 2,
+                                [[(1, 0), (0, -1)]] * 2,
+                               [[(0, -1), (-1, 0)]] * 2,
+                               [[(-1, 0), (0, 1)]] * 2], []),
+                           size=size))
+    return moves
 
 
 class Tiger(Piece):
@@ -136,11 +133,12 @@ class Tiger(Piece):
     if kwargs.get('return_capture'):
       return capture
 
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
       move = leaper(x, y, gameboard, self.color, list(king_move), move_only=True, size=size)
-      self.tmp_moves = move | capturing_moves(capture, gameboard, self.color, size)
-    return self.tmp_moves
+      moves = move | capturing_moves(capture, gameboard, self.color, size)
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
 
 class Lion(Piece):
@@ -148,16 +146,17 @@ class Lion(Piece):
   value = 7.0
 
   def available_moves(self, x, y, gameboard, **kwargs):
-    capture = Queen(self.color).available_moves(x, y, gameboard, **kwargs)
+    capture = piece_moves(Queen, x, y, gameboard, self.color, kwargs['size'])
     if kwargs.get('return_capture'):
       return capture
 
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      move = King(self.color).available_moves(x, y, gameboard, **kwargs)
-      self.tmp_moves = move | {pos for pos in capture
-                               if (pos in gameboard and no_conflict(gameboard, self.color, *pos, size=kwargs['size']))}
-    return self.tmp_moves
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
+      move = piece_moves(King, x, y, gameboard, self.color, kwargs['size'])
+      moves = move | {pos for pos in capture
+                      if (pos in gameboard and no_conflict(gameboard, self.color, *pos, size=kwargs['size']))}
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
 
 class Deer(Piece):
@@ -170,276 +169,262 @@ class Deer(Piece):
     if kwargs.get('return_capture'):
       return capture
 
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
       move = leaper(x, y, gameboard, self.color, dir8(1, 2), move_only=True, size=size)
-      self.tmp_moves = move | capturing_moves(capture, gameboard, self.color, size)
-    return self.tmp_moves
+      moves = move | capturing_moves(capture, gameboard, self.color, size)
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
 
 class Giraffe(Piece):
   abbr = 'Gf'
   value = 5.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color, dir8(1, 4), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color, dir8(1, 4), size)
 
 
 class Lynx(Piece):
   abbr = 'Lx'
   value = 21.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = (Bishop(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | slide_leaper(x, y, gameboard, self.color, size,
-                                       [[(i, i) for i in range(1, size)],
-                                        [(i, -i) for i in range(1, size)],
-                                           [(-i, -i) for i in range(1, size)],
-                                           [(-i, i) for i in range(1, size)]],
-                                       [dir8(1, 2)[7:] + dir8(1, 2)[:3],
-                                           dir8(1, 2)[1:5],
-                                           dir8(1, 2)[3:7],
-                                           dir8(1, 2)[5:] + dir8(1, 2)[:1]]))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(Bishop, x, y, gameboard, color, size)
+             | slide_leaper(x, y, gameboard, color, size,
+                            [[(i, i) for i in range(1, size)],
+                             [(i, -i) for i in range(1, size)],
+                                [(-i, -i) for i in range(1, size)],
+                                [(-i, i) for i in range(1, size)]],
+                            [dir8(1, 2)[7:] + dir8(1, 2)[:3],
+                                dir8(1, 2)[1:5],
+                                dir8(1, 2)[3:7],
+                                dir8(1, 2)[5:] + dir8(1, 2)[:1]]))
+    return moves
 
 
 class Wave(Piece):
   abbr = 'Wv'
   value = 10.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, wave_rider,
-                      (x, y, gameboard, self.color, dir8(1, 1), size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return wave_rider(x, y, gameboard, color, dir8(1, 1), size)
 
 
 class Horse(Piece):
   abbr = 'Hs'
   value = 9.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, wave_rider,
-                      (x, y, gameboard, self.color, dir8(1, 2), size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return wave_rider(x, y, gameboard, color, dir8(1, 2), size)
 
 
 class Donkey(Piece):
   abbr = 'Dn'
   value = 11.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, wave_rider,
-                      (x, y, gameboard, self.color, dir8(2, 1), size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return wave_rider(x, y, gameboard, color, dir8(2, 1), size)
 
 
 class Octagram(Piece):
   abbr = 'Og'
   value = 8.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      dirs = dir8(1, 2)
-      self.tmp_moves = (Knight(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | slide_leaper(x, y, gameboard, self.color, size,
-                                       [[i] for i in dirs],
-                                       [[dirs[6], dirs[2]],
-                                           [dirs[7], dirs[3]],
-                                           [dirs[0], dirs[4]],
-                                           [dirs[1], dirs[5]],
-                                           [dirs[2], dirs[6]],
-                                           [dirs[3], dirs[7]],
-                                           [dirs[4], dirs[0]],
-                                           [dirs[5], dirs[1]]]))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    dirs = dir8(1, 2)
+    moves = (piece_moves(Knight, x, y, gameboard, color, size)
+             | slide_leaper(x, y, gameboard, color, size,
+                            [[i] for i in dirs],
+                            [[dirs[6], dirs[2]],
+                                [dirs[7], dirs[3]],
+                                [dirs[0], dirs[4]],
+                                [dirs[1], dirs[5]],
+                                [dirs[2], dirs[6]],
+                                [dirs[3], dirs[7]],
+                                [dirs[4], dirs[0]],
+                                [dirs[5], dirs[1]]]))
+    return moves
 
 
 class ReflectingBishop1(Piece):
   abbr = 'RB'
   value = 10.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, reflect_rider,
-                      (x, y, gameboard, self.color, dir8(1, 1), 1, size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return reflect_rider(x, y, gameboard, color, dir8(1, 1), 1, size)
 
 
 class ReflectingBishop2(Piece):
   abbr = 'RB'
   value = 12.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, reflect_rider,
-                      (x, y, gameboard, self.color, dir8(1, 1), 2, size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return reflect_rider(x, y, gameboard, color, dir8(1, 1), 2, size)
 
 
 class ReflectingBishop3(Piece):
   abbr = 'RB'
   value = 14.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, reflect_rider,
-                      (x, y, gameboard, self.color, dir8(1, 1), 3, size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return reflect_rider(x, y, gameboard, color, dir8(1, 1), 3, size)
 
 
 class ReflectingBishop4(Piece):
   abbr = 'RB'
   value = 18.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    size = kwargs['size']
-    return self.prune(gameboard, reflect_rider,
-                      (x, y, gameboard, self.color, dir8(1, 1), 4, size))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return reflect_rider(x, y, gameboard, color, dir8(1, 1), 4, size)
 
 
 class ReflectingQueen1(Piece):
   abbr = 'RQ'
   value = 18.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (ReflectingBishop1(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | Rook(self.color).available_moves(x, y, gameboard, **kwargs))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(ReflectingBishop1, x, y, gameboard, color, size)
+             | piece_moves(Rook, x, y, gameboard, color, size))
+    return moves
 
 
 class ReflectingQueen2(Piece):
   abbr = 'RQ'
   value = 22.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (ReflectingBishop2(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | Rook(self.color).available_moves(x, y, gameboard, **kwargs))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(ReflectingBishop2, x, y, gameboard, color, size)
+             | piece_moves(Rook, x, y, gameboard, color, size))
+    return moves
 
 
 class ReflectingQueen3(Piece):
   abbr = 'RQ'
   value = 26.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (ReflectingBishop3(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | Rook(self.color).available_moves(x, y, gameboard, **kwargs))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(ReflectingBishop3, x, y, gameboard, color, size)
+             | piece_moves(Rook, x, y, gameboard, color, size))
+    return moves
 
 
 class ReflectingQueen4(Piece):
   abbr = 'RQ'
   value = 30.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves = (ReflectingBishop4(self.color).available_moves(x, y, gameboard, **kwargs)
-                        | Rook(self.color).available_moves(x, y, gameboard, **kwargs))
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = (piece_moves(ReflectingBishop4, x, y, gameboard, color, size)
+             | piece_moves(Rook, x, y, gameboard, color, size))
+    return moves
 
 
 def math_leaper_moves(ls: 'list[int]'):
-  return sum([dist_dir(i) for i in ls], [])
+  return dist_leaps(ls)
 
 
 class PrimeLeaper(Piece):
   abbr = 'PrL'
   value = 29.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(primes), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(primes), size)
 
 
 class FibonacciLeaper(Piece):
   abbr = 'FL'
   value = 13.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(fibos), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(fibos), size)
 
 
 class TribonacciLeaper(Piece):
   abbr = 'TrL'
   value = 13.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(tribos), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(tribos), size)
 
 
 class TetranacciLeaper(Piece):
   abbr = 'TtL'
   value = 8.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(tetras), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(tetras), size)
 
 
 class PentanacciLeaper(Piece):
   abbr = 'PnL'
   value = 8.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(pentas), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(pentas), size)
 
 
 class LucasLeaper(Piece):
   abbr = 'LL'
   value = 11.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(lucas), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(lucas), size)
 
 
 class PellLeaper(Piece):
   abbr = 'PlL'
   value = 12.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(pells), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(pells), size)
 
 
 class PerrinLeaper(Piece):
   abbr = 'PeL'
   value = 17.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       math_leaper_moves(perrins), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  math_leaper_moves(perrins), size)
 
 
 class PythagorasLeaper(Piece):
   abbr = 'PtL'
   value = 25.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color,
-                       sum([dist_dir(i ** 2) for i in range(15)], []), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color,
+                  dist_leaps(i ** 2 for i in range(15)), size)
 
 
 def math_leaper2_moves(ls: 'list[int]', lim: int, x, y, gameboard, color, size):
@@ -461,120 +446,102 @@ class PrimeLeaper2(Piece):
   abbr = 'PrL2'
   value = 23.2
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(primes, 7, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(primes, 7, x, y, gameboard, color, size)
+    return moves
 
 
 class FibonacciLeaper2(Piece):
   abbr = 'FL2'
   value = 10.4
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(fibos, 8, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(fibos, 8, x, y, gameboard, color, size)
+    return moves
 
 
 class TribonacciLeaper2(Piece):
   abbr = 'TrL2'
   value = 10.4
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(tribos, 7, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(tribos, 7, x, y, gameboard, color, size)
+    return moves
 
 
 class TetranacciLeaper2(Piece):
   abbr = 'TtL2'
   value = 6.4
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(tetras, 6, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(tetras, 6, x, y, gameboard, color, size)
+    return moves
 
 
 class PentanacciLeaper2(Piece):
   abbr = 'PnL2'
   value = 6.4
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(pentas, 7, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(pentas, 7, x, y, gameboard, color, size)
+    return moves
 
 
 class LucasLeaper2(Piece):
   abbr = 'LL2'
   value = 8.8
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(lucas, 6, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(lucas, 6, x, y, gameboard, color, size)
+    return moves
 
 
 class PellLeaper2(Piece):
   abbr = 'PlL2'
   value = 9.6
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(pells, 5, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(pells, 5, x, y, gameboard, color, size)
+    return moves
 
 
 class PerrinLeaper2(Piece):
   abbr = 'PeL2'
   value = 13.6
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      self.tmp_moves = math_leaper2_moves(perrins, 9, x, y, gameboard, self.color, size)
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    moves = math_leaper2_moves(perrins, 9, x, y, gameboard, color, size)
+    return moves
 
 
 class PythagorasLeaper2(Piece):
   abbr = 'PtL2'
   value = 8.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      size = kwargs['size']
-      a = sum([k for k in
-               [dist_dir(i ** 2, sep=True) for i in range(1, 15)]
-               if k != []], [])
-      a = cast('list[PositionList]', a)
-      _ = [{tuple(i[m] for i in a)[:j]:
-            [[i[m] for i in a][j]]
-            for j in range(14)} for m in range(8)]
-      self.tmp_moves = set()
-      for i in range(8):
-        self.tmp_moves |= slide_leaper(x, y, gameboard, self.color, size,
-                                       list(map(list, _[i].keys())),
-                                       list(_[i].values()),
-                                       absolute='dest')
-    return self.tmp_moves
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    a = sum([k for k in
+             [dist_dir(i ** 2, sep=True) for i in range(1, 15)]
+             if k != []], [])
+    a = cast('list[PositionList]', a)
+    _ = [{tuple(i[m] for i in a)[:j]:
+          [[i[m] for i in a][j]]
+          for j in range(14)} for m in range(8)]
+    moves = set()
+    for i in range(8):
+      moves |= slide_leaper(x, y, gameboard, color, size,
+                            list(map(list, _[i].keys())),
+                            list(_[i].values()),
+                            absolute='dest')
+    return moves
 
 
 # 動きテスト用
@@ -26,8 +26,8 @@ class DevelopingMan(Piece):
     self.count = 0
 
   def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper, (x, y, gameboard, self.color,
-                                          sum([dist_dir(i) for i in range(1, self.count + 2)], []),
+    return self.prune(x, y, gameboard, leaper, (x, y, gameboard, self.color,
+                                          dist_leaps(range(1, self.count + 2)),
                                           kwargs['size']))
 
 
@@ -40,10 +40,10 @@ class NacciLeaper(Piece):
     self.count = 0
 
   def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper, (x, y, gameboard, self.color,
-                                          sum([dist_dir(k) for k in (
+    return self.prune(x, y, gameboard, leaper, (x, y, gameboard, self.color,
+                                          dist_leaps(
                                               [knacci(self.count + 2, i) for i in range(1, self.count + 12)]
-                                              if self.count <= 6 else [2 ** i for i in range(9)])], []),
+                                              if self.count <= 6 else [2 ** i for i in range(9)]),
                                           kwargs['size']))
 
 
@@ -56,8 +56,8 @@ class DevelopingPrime(Piece):
     self.count = 0
 
   def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper, (x, y, gameboard, self.color,
-                                          sum([dist_dir(i) for i in range(2, self.count + 3) if is_prime(i)], []),
+    return self.prune(x, y, gameboard, leaper, (x, y, gameboard, self.color,
+                                          dist_leaps(i for i in range(2, self.count + 3) if is_prime(i)),
                                           kwargs['size']))
 
 
@@ -70,21 +70,22 @@ class DevelopingMan2(Piece):
     self.count = 0
 
   def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
       size = kwargs['size']
       a = sum([k for k in [dist_dir(i, sep=True) for i in range(1, self.count + 2)] if k != []], [])
       a = cast('list[PositionList]', a)
       lenA = len(a)
       _ = [{tuple(i[m] for i in a)[:j]: [[i[m] for i in a][j]] for j in range(lenA)}
            for m in range(8)]
-      self.tmp_moves = set()
+      moves = set()
       for i in range(8):
-        self.tmp_moves |= slide_leaper(x, y, gameboard, self.color, size,
-                                       list(map(list, _[i].keys())),
-                                       list(_[i].values()),
-                                       absolute='dest')
-    return self.tmp_moves
+        moves |= slide_leaper(x, y, gameboard, self.color, size,
+                              list(map(list, _[i].keys())),
+                              list(_[i].values()),
+                              absolute='dest')
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
 
 class NacciLeaper2(Piece):
@@ -96,8 +97,8 @@ class NacciLeaper2(Piece):
     self.count = 0
 
   def available_moves(self, x, y, gameboard, **kwargs):
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
       size = kwargs['size']
       a = sum([k for k in [dist_dir(j, sep=True)
               for j in ([knacci(self.count + 2, i) for i in range(1, self.count + 12)]
@@ -108,13 +109,14 @@ class NacciLeaper2(Piece):
       _ = [{tuple(i[m] for i in a)[:j]:
             [[i[m] for i in a][j]]
             for j in range(lenA)} for m in range(8)]
-      self.tmp_moves = set()
+      moves = set()
       for i in range(8):
-        self.tmp_moves |= slide_leaper(x, y, gameboard, self.color, size,
-                                       list(map(list, _[i].keys())),
-                                       list(_[i].values()),
-                                       absolute='dest')
-    return self.tmp_moves
+        moves |= slide_leaper(x, y, gameboard, self.color, size,
+                              list(map(list, _[i].keys())),
+                              list(_[i].values()),
+                              absolute='dest')
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
 
 class Imitator(Piece):
@@ -128,15 +130,15 @@ class Imitator(Piece):
   def available_moves(self, x, y, gameboard, **kwargs):
     move = None
     if self.count % 5 == 0:
-      move = Knight(self.color).available_moves(x, y, gameboard, **kwargs)
+      move = piece_moves(Knight, x, y, gameboard, self.color, kwargs['size'])
     if self.count % 5 == 1:
-      move = Bishop(self.color).available_moves(x, y, gameboard, **kwargs)
+      move = piece_moves(Bishop, x, y, gameboard, self.color, kwargs['size'])
     if self.count % 5 == 2:
-      move = Rook(self.color).available_moves(x, y, gameboard, **kwargs)
+      move = piece_moves(Rook, x, y, gameboard, self.color, kwargs['size'])
     if self.count % 5 == 3:
-      move = Queen(self.color).available_moves(x, y, gameboard, **kwargs)
+      move = piece_moves(Queen, x, y, gameboard, self.color, kwargs['size'])
     if self.count % 5 == 4:
-      move = King(self.color).available_moves(x, y, gameboard, **kwargs)
+      move = piece_moves(King, x, y, gameboard, self.color, kwargs['size'])
     assert move is not None
     return move
 
@@ -148,18 +150,18 @@ class Mist(Piece):
   abbr = 'Mi'
   value = 4.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, rider,
-                      (x, y, gameboard, self.color, dir8(0, 1), kwargs['size'], 2, False, True))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return rider(x, y, gameboard, color, dir8(0, 1), size, 2, False, True)
 
 
 class Blizzard(Piece):
   abbr = 'Bz'
   value = 8.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, moves_from,
-                      ('2+', x, y, gameboard, self.color, kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return moves_from('2+', x, y, gameboard, color, size)
 
 
 '周りの駒によって動きが変わる'
@@ -171,44 +173,10 @@ class Orphan(Piece):
 
   def __init__(self, color):
     super().__init__(color)
+    # 受け取った動きによる移動先
+    self.tmp_moves: PositionSet = set()
+    # 受け取った動き
     self.tmp_potentials: 'set[Type[Piece]]' = set()
-    self.res_potentials: 'set[Type[Piece]]' = set()
-    # ↓ 完成された値しか入れない
-    self.compounded_normal_pieces_memo: 'Optional[set[Type[Piece]]]' = None
-
-  def compounded_normal_pieces(self, x: int, y: int, gameboard: Board, size: int) -> 'set[Type[Piece]]':
-    '''
-    フレンド・オーファン以外の駒で動きを受け取るものの集合を返す
-    '''
-    if self.compounded_normal_pieces_memo:
-      return self.compounded_normal_pieces_memo
-
-    ret: 'set[Type[Piece]]' = set()
-    for pos, piece in gameboard.items():
-      # 対象が敵の駒であってフレンド・オーファンでない
-      # 対象の駒に攻撃されている
-      if (piece.color != self.color and piece.abbr not in ('Fr', 'Op')
-              and (x, y) in piece.available_moves(*pos, gameboard, size=size)):
-        # その駒の種類を追加
-        ret.add(type(piece))
-    self.compounded_normal_pieces_memo = ret
-    return ret
-
-  def give_moves(self, x: int, y: int, gameboard: Board, size: int):
-    '''
-    「自分が攻撃している敵のオーファン」または「自分が守っている味方のフレンド」が
-    自分と同じ動きをしていないなら、自分の動きを付与
-    tmp_moves を更新
-    '''
-    opponent: 'dict[Color, Color]' = {'W': 'B', 'B': 'W'}
-
-    pot = self.compounded_normal_pieces(x, y, gameboard, size)
-    self.tmp_potentials |= pot
-    if self.tmp_moves == set():
-      for piece in self.tmp_potentials:
-        self.tmp_moves |= piece(self.color).available_moves(x, y, gameboard, size=size)
-    _propagate(self, self.color, 'Op', x, y, gameboard, size)
-    _propagate(self, opponent[self.color], 'Fr', x, y, gameboard, size)
 
   def available_moves(self, x: int, y: int, gameboard: Board, **kwargs):
     return self.tmp_moves
@@ -220,81 +188,15 @@ class Friend(Piece):
 
   def __init__(self, color):
     super().__init__(color)
+    # 受け取った動きによる移動先
+    self.tmp_moves: PositionSet = set()
+    # 受け取った動き
     self.tmp_potentials: 'set[Type[Piece]]' = set()
-    self.res_potentials: 'set[Type[Piece]]' = set()
-    # ↓ 完成された値しか入れない
-    self.compounded_normal_pieces_memo: 'Optional[set[Type[Piece]]]' = None
-
-  def compounded_normal_pieces(self, x: int, y: int, gameboard: Board, size: int) -> 'set[Type[Piece]]':
-    '''
-    フレンド・オーファン以外の駒で動きを受け取るものの集合を返す
-    '''
-    if self.compounded_normal_pieces_memo:
-      return self.compounded_normal_pieces_memo
-
-    opponent = {'W': 'B', 'B': 'W'}
-    ret: 'set[Type[Piece]]' = set()
-    tmp_board = copy(gameboard)
-    tmp_board[(x, y)] = type(self)(opponent[self.color])
-    for pos, piece in gameboard.items():
-      # 対象が味方の駒であってフレンド・オーファンでない
-      # 対象の駒に守られている
-      if (piece.color == self.color and piece.abbr not in ('Fr', 'Op')
-          and (x, y) in piece.available_moves(
-              *pos, tmp_board, size=size)):
-        # その駒の種類を追加
-        ret.add(type(piece))
-    self.compounded_normal_pieces_memo = ret
-    return ret
-
-  def give_moves(self, x: int, y: int, gameboard: Board, size: int):
-    '''
-    「自分が守っている味方のフレンド」または「自分が攻撃している敵のオーファン」が
-    自分と同じ動きをしていないなら、自分の動きを付与
-    tmp_moves を更新
-    '''
-    opponent: 'dict[Color, Color]' = {'W': 'B', 'B': 'W'}
-
-    pot = self.compounded_normal_pieces(x, y, gameboard, size)
-    self.tmp_potentials |= pot
-    if self.tmp_moves == set():
-      for piece in self.tmp_potentials:
-        self.tmp_moves |= piece(self.color).available_moves(x, y, gameboard, size=size)
-    _propagate(self, opponent[self.color], 'Fr', x, y, gameboard, size)
-    _propagate(self, self.color, 'Op', x, y, gameboard, size)
 
   def available_moves(self, x: int, y: int, gameboard: Board, **kwargs):
     return self.tmp_moves
 
 
-def _propagate(self: Union[Orphan, Friend], color: Color, abbr: Literal['Op', 'Fr'],
-               x: int, y: int, gameboard: Board, size: int):
-  opponent: 'dict[Color, Color]' = {'W': 'B', 'B': 'W'}
-
-  _moves: PositionSet = set()
-  for piece in self.tmp_potentials:
-    _moves |= piece(color).available_moves(x, y, gameboard, size=size)
-
-  for pos in _moves:
-    target = gameboard.get(pos)
-    if target is None or target.abbr != abbr:
-      continue
-
-    target = cast(Union[Orphan, Friend], target)
-    if target.tmp_potentials == set():
-      target.tmp_potentials |= target.compounded_normal_pieces(*pos, gameboard, size)
-    if target.tmp_potentials != self.tmp_potentials:
-      target.tmp_potentials |= self.tmp_potentials
-      _propagate(target, target.color, 'Op', *pos, gameboard, size)
-      _propagate(target, opponent[target.color], 'Fr', *pos, gameboard, size)
-    if target.tmp_potentials != target.res_potentials:
-      target.res_potentials |= target.tmp_potentials
-      _res_moves: PositionSet = set()
-      for piece in target.res_potentials:
-        _res_moves |= piece(target.color).available_moves(*pos, gameboard, size=size)
-      target.tmp_moves = _res_moves
-
-
 '動いた後に攻撃する（アーチャー系）'
 
 
@@ -310,7 +212,7 @@ class Archer(Piece):
 
   def available_moves(self, x, y, gameboard, **kwargs):
     self.direction = 1 if self.color == 'W' else -1
-    return self.prune(gameboard, moves_from,
+    return self.prune(x, y, gameboard, moves_from,
                       (f'{self.direction}/0', x, y, gameboard, self.color, kwargs['size']))
 
 
@@ -319,6 +221,6 @@ class HorseArcher(Piece):
   value = 9.0
   archer_dir = [-2, -1, 1, 2]
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, moves_from,
-                      ('+,x,2+,2x', x, y, gameboard, self.color, kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return moves_from('+,x,2+,2x', x, y, gameboard, color, size)
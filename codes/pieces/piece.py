@@ -1,12 +1,117 @@
-'''すべての駒に共通するクラス Piece の定義'''
+'''すべての駒に共通するクラス Piece の定義
 
-from copy import copy
+Notes
+-----
+駒の移動先は，盤面のバージョン・駒の位置・駒・動かした回数ごとに一つの表(移動先のキャッシュ)に覚えておく．
+盤面のバージョンは ArrayBoard が差分で更新する Zobrist キーで，
+盤面をコピーして比べなくても同じ局面かどうかがわかる．
+表は MOVE_CACHE_SIZE を超えると，最後に使ったのが古いものから捨てる．
+
+状態をもたない駒は，移動先をクラスメソッド generate で求める．
+これは駒を作らずに piece_moves で呼べるので，ほかの駒の動きを組み合わせた駒も
+一時的な駒を作らずに済み，同じ局面の同じ部品の結果は駒のクラスごとに一つだけ覚えておく．
+'''
+
+from collections import OrderedDict
 from typing import Tuple, List, Set, Literal, Optional
 
 Position = Tuple[int, int]
 PositionList = List[Position]
 PositionSet = Set[Position]
 
+# 移動先のキャッシュに覚えておく数
+MOVE_CACHE_SIZE = 1 << 16
+# 移動先のキャッシュ : {(盤面のバージョン, x, y, id(駒), 動かした回数): (駒, 移動先)}
+# 状態をもたない駒の移動先は {(盤面のバージョン, x, y, 駒のクラス, 駒色, 盤面の大きさ): (駒のクラス, 移動先)}
+_move_cache: 'OrderedDict[tuple, tuple[object, PositionSet]]' = OrderedDict()
+# generate をもたない駒の動きを求めるための，動かしていない駒 : {(駒のクラス, 駒色): 駒}
+_prototypes: 'dict[tuple[type, str], Piece]' = {}
+
+
+def board_version(gameboard: 'dict[Position, Piece]') -> Optional[int]:
+  '''
+  盤面のバージョン．盤面の駒の種類・色・位置・動かした回数から決まる
+
+  Returns
+  -------
+  : int or None
+    ArrayBoard のときは ArrayBoard.key．
+    それ以外の盤面(AttackMap が読んだマスを記録する盤面など)では None で，移動先を覚えない．
+  '''
+  return getattr(gameboard, 'key', None)
+
+
+def clear_move_cache():
+  '''移動先のキャッシュを空にする'''
+  _move_cache.clear()
+
+
+def _touch(key: tuple):
+  '''key を最近使ったことにする．バックグラウンドの探索のスレッドが先に追い出していたら何もしない'''
+  try:
+    _move_cache.move_to_end(key)
+  except KeyError:
+    pass
+
+
+def _remember(key: tuple, owner: object, moves: PositionSet):
+  _move_cache[key] = (owner, moves)
+  _touch(key)
+  if len(_move_cache) > MOVE_CACHE_SIZE:
+    try:
+      _move_cache.popitem(last=False)
+    except KeyError:
+      pass
+
+
+def piece_moves(
+    cls: 'type[Piece]', x: int, y: int, gameboard: 'dict[Position, Piece]',
+    color: Literal['W', 'B'], size: int,
+) -> PositionSet:
+  '''
+  color の cls の駒が盤面 gameboard の (x, y) にいるときの移動先．駒を作らずに求める
+
+  Parameters
+  ----------
+  cls : type > Piece
+    駒のクラス．
+  x, y : int
+    駒の位置．
+  gameboard : dict > {(int, int): Piece, ...}
+    盤面．
+  color : str > 'W', 'B'
+    駒色．
+  size : int
+    盤面の大きさ．
+
+  Returns
+  -------
+  : PositionSet
+    移動先．キャッシュと共有するので，変更するときはコピーする．
+
+  Notes
+  -----
+  generate をもつ駒は，盤面のバージョンと駒のクラスごとに結果を覚えておく．
+  もたない駒(動かした回数などで動きが変わる駒)は，動かしていない状態の駒を
+  クラスと駒色ごとに一つだけ作って使い回す．
+  '''
+  if cls.generate is None:
+    prototype = _prototypes.get((cls, color))
+    if prototype is None:
+      prototype = _prototypes[(cls, color)] = cls(color)
+    return prototype.available_moves(x, y, gameboard, size=size)
+  version = board_version(gameboard)
+  if version is None:
+    return cls.generate(x, y, gameboard, color, size)
+  key = (version, x, y, cls, color, size)
+  entry = _move_cache.get(key)
+  if entry is not None:
+    _touch(key)
+    return entry[1]
+  moves = cls.generate(x, y, gameboard, color, size)
+  _remember(key, cls, moves)
+  return moves
+
 
 class Piece:
   '''すべての駒に共通のクラス
@@ -38,6 +143,8 @@ class Piece:
   Methods
   -------
   available_moves(self, x, y, gameboard, **kwargs)
+  generate(cls, x, y, gameboard, color, size) : classmethod, optional
+    状態をもたない駒の移動先．これを定義した駒は available_moves を定義しなくてよい．
 
   Parameters
   ----------
@@ -57,14 +164,13 @@ class Piece:
   value: float
   count: int
   archer_dir: 'list[int]'
+  generate: 'Optional[classmethod]' = None
 
   def __init__(self, color):
     self.color: Literal['W', 'B'] = color
     self.name: str = self.__repr__()
     self.moves: Optional[PositionList] = None
     self.recalc: bool = True
-    self.seen_board = {}
-    self.tmp_moves: PositionSet = set()
 
   def __repr__(self):
     return self.color + self.abbr
@@ -72,11 +178,40 @@ class Piece:
   def __str__(self):
     return self.color + self.abbr
 
-  def prune(self, gameboard: 'dict[Position, Piece]', func, args) -> PositionSet:
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
-      self.tmp_moves: PositionSet = func(*args)
-    return self.tmp_moves
+  def _cache_key(self, x: int, y: int, gameboard: 'dict[Position, Piece]'):
+    version = board_version(gameboard)
+    if version is None:
+      return None
+    return version, x, y, id(self), getattr(self, 'count', None)
+
+  def cached_moves(self, x: int, y: int, gameboard: 'dict[Position, Piece]') -> Optional[PositionSet]:
+    '''盤面 gameboard の (x, y) にいるときの移動先を覚えていればそれを，なければ None を返す'''
+    key = self._cache_key(x, y, gameboard)
+    if key is None:
+      return None
+    entry = _move_cache.get(key)
+    # id は駒が消えると使い回されるので，同じ駒かどうかも確かめる
+    if entry is None or entry[0] is not self:
+      return None
+    _touch(key)
+    return entry[1]
+
+  def cache_moves(self, x: int, y: int, gameboard: 'dict[Position, Piece]', moves: PositionSet):
+    '''盤面 gameboard の (x, y) にいるときの移動先 moves を覚えておく'''
+    key = self._cache_key(x, y, gameboard)
+    if key is None:
+      return
+    _remember(key, self, moves)
+
+  def prune(self, x: int, y: int, gameboard: 'dict[Position, Piece]', func, args) -> PositionSet:
+    '''移動先を覚えていなければ func(*args) で求めて覚えておく'''
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
+      moves = func(*args)
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
 
   def available_moves(self, x: int, y: int, gameboard: 'dict[Position, Piece]', **kwargs) -> PositionSet:
-    return set()
+    if self.generate is None:
+      return set()
+    return piece_moves(type(self), x, y, gameboard, self.color, kwargs['size'])
@@ -1,12 +1,12 @@
 '''駒関連の関数の定義'''
 
 from math import floor, sqrt
-from typing import Literal
+from typing import Iterable, Literal, Optional, cast
 import numpy as np
 import re
 
-from custom_types import PositionList, PositionSet, Board, Color
-from utils import move_list, in_zone
+from custom_types import Position, PositionList, PositionSet, Board, Color
+from utils import in_any_zone
 
 
 king_move: PositionList = [(0, 1), (1, 1), (1, 0), (1, -1),
@@ -120,7 +120,7 @@ def _notation_o(
     symbol: str, storage_notations: str, first: 'list[PositionList]', second: PositionList
 ) -> 'list[PositionList]':
   '''
-  moves_from で使う．
+  compile_notation で使う．
   o(A)と表記があれば，first から見て外側の second の移動先を出力．
 
   Parameters
@@ -151,32 +151,246 @@ def _notation_o(
     return [second] * len(first)
 
 
-def _notation_m(symbol: str, storage_notations: str, func, args) -> PositionSet:
+# MoveStep の種類
+# 跳ぶ
+LEAP = 0
+# 走る
+RIDE = 1
+# A>B で，B が跳ぶ
+SLIDE_LEAP = 2
+# A>B で，B が走る
+SLIDE_RIDE = 3
+
+
+class MoveStep:
+  '''
+  MoveProgram の動きの一つ．notation の ',' で区切られた一つぶん．
+  コンパイルした後は書き換えない．
+
+  Attributes
+  ----------
+  kind : int > LEAP, RIDE, SLIDE_LEAP, SLIDE_RIDE
+    動きの種類．
+  direction : PositionList
+    LEAP, RIDE の移動の方向．relative=True のときはこれを出力する．
+  length : int | None
+    RIDE, SLIDE_RIDE で走る最大の回数．
+  move_only : bool
+    m(A) のとき True．
+  capture_only : bool
+    c(A) のとき True．
+  first : list > [PositionList, ...]
+    A>B の A の動き．
+  first_rider : bool
+    A>B の A が走る動きのとき True．
+  second : list > [PositionList, ...]
+    A>B の B の動き．first の方向ごとの方向．
+  '''
+
+  def __init__(
+      self, kind: int, direction: PositionList = None, length: int = None,
+      move_only: bool = False, capture_only: bool = False,
+      first: 'list[PositionList]' = None, first_rider: bool = False,
+      second: 'list[PositionList]' = None,
+  ):
+    self.kind = kind
+    self.direction = direction or []
+    self.length = length
+    self.move_only = move_only
+    self.capture_only = capture_only
+    self.first = first or []
+    self.first_rider = first_rider
+    self.second = second or []
+    # 盤面の大きさごとの，A が走る動きのときの A の動き
+    self._startlists: 'dict[int, list[PositionList]]' = {}
+
+  def startlist(self, size: int) -> 'list[PositionList]':
+    '''slide_leaper, slide_rider に渡す A の動き'''
+    if not self.first_rider:
+      return self.first
+    startlist = self._startlists.get(size)
+    if startlist is None:
+      startlist = self._startlists[size] = [[(i * x, i * y) for i in range(1, size)]
+                                            for [(x, y)] in self.first]
+    return startlist
+
+  def run(self, x: int, y: int, gameboard: Board, color: Color, size: int = None) -> PositionSet:
+    '''盤面 gameboard の (x, y) にある color の駒の移動先'''
+    if self.kind == LEAP:
+      moves = leaper(x, y, gameboard, color, self.direction,
+                     size if size is not None else 14, self.move_only)
+    elif self.kind == RIDE:
+      moves = rider(x, y, gameboard, color, self.direction, size, self.length, self.move_only,
+                    gameboard[(x, y)].abbr in ('Mi', 'Bz'))
+    else:
+      if size is None and (self.first_rider or self.kind == SLIDE_LEAP):
+        raise TypeError('available_moves > moves_from の引数に size が指定されていません．')
+      if self.kind == SLIDE_RIDE:
+        return slide_rider(x, y, gameboard, color,
+                           self.startlist(cast(int, size)), self.second, length=self.length)
+      return slide_leaper(x, y, gameboard, color, cast(int, size),
+                          self.startlist(cast(int, size)), self.second)
+
+    if self.capture_only:
+      moves = {pos for pos in moves
+               if (pos in gameboard and no_conflict(gameboard, color, *pos, size=size or 14))}
+    return moves
+
+
+class MoveProgram:
+  '''
+  notation を解析した動き．compile_notation で作る．
+
+  Attributes
+  ----------
+  notation : str
+    動きを表したもの．
+  steps : tuple > (MoveStep, ...)
+    ',' で区切られたそれぞれの動き．
+  '''
+
+  def __init__(self, notation: str, steps: 'tuple[MoveStep, ...]'):
+    self.notation = notation
+    self.steps = steps
+
+  def run(
+      self, x: int, y: int, gameboard: Board, color: Color,
+      size: int = None, relative: bool = False,
+  ) -> PositionSet:
+    '''moves_from と同じ'''
+    output: PositionSet = set()
+    for step in self.steps:
+      if relative and step.kind in (LEAP, RIDE):
+        output |= set(step.direction)
+      else:
+        output |= step.run(x, y, gameboard, color, size)
+    return output
+
+  def directions(self) -> PositionSet:
+    '''relative=True のときの出力．盤面によらない動きだけからなるときに使える'''
+    if any(step.kind not in (LEAP, RIDE) for step in self.steps):
+      raise ValueError(f'{self.notation} の方向は盤面によって変わります．')
+    output: PositionSet = set()
+    for step in self.steps:
+      output |= set(step.direction)
+    return output
+
+
+# コンパイルした動き : {(notation, storage): MoveProgram, ...}
+_programs: 'dict[tuple[str, tuple[tuple[str, str], ...]], MoveProgram]' = {}
+
+
+def compile_notation(notation: str, **storage: str) -> MoveProgram:
   '''
-  moves_from で使う．
-  m(A)と表記があれば，移動のみで攻撃はできないようにする．
+  notation を解析して MoveProgram にする．
+  同じ notation と storage の組は一度だけ解析する．
 
   Parameters
   ----------
-  symbol : str
-    解析する文字列．
-  storage_notations : str
-    変数として moves_from の引数 storage に格納されている文字列．
-  func : function
-    駒の種類を指定．rider, leaper など．
-  args : tuple
-    func の引数．
+  notation : str
+    動きを表したもの．moves_from を参照のこと．
+  storage : dict > {str: str}
+    変数として使う．
 
   Returns
   -------
-  PositionSet
-      駒の可能な移動先．
+  : MoveProgram
   '''
-  if (re.search(r'^m\(.+?\)$', symbol)
-          or re.search(r'^m\(.+?\)$', storage_notations)):
-    return func(*args, move_only=True)
-  else:
-    return func(*args)
+  key = (notation, tuple(storage.items()))
+  program = _programs.get(key)
+  if program is None:
+    program = _programs[key] = MoveProgram(notation, tuple(
+        _compile_staged(symbol, storage) if '>' in symbol else _compile_symbol(symbol, storage)
+        for symbol in notation.split(',')))
+  return program
+
+
+def _compile_symbol(symbol: str, storage: 'dict[str, str]') -> MoveStep:
+  '''屈折のない動き symbol を解析する'''
+  direction: PositionList = []
+  # 変数
+  storage_notations = ''
+  for name in storage:
+    if name in symbol:
+      storage_notations = storage[name]
+      direction = list(compile_notation(storage_notations, **storage).directions())
+
+  # 単体で動きを表すもの
+  vector = re.search(r'-?\d+/-?\d+', symbol)
+  # '+' で十字方向
+  if '+' in symbol:
+    direction = dir8(0, 1)
+  # 'x' で斜め方向
+  elif 'x' in symbol:
+    direction = dir8(1, 1)
+  # [n]/[m] ベクトル指定
+  elif vector:
+    n, m = map(int, vector.group().split('/'))
+    direction = [(m, n)]
+
+  # 装飾子
+  # **A
+  if re.search(r'\(?\*\*', symbol):
+    direction = dir8(*direction[0])
+  # m(A), c(A)
+  move_only = bool(re.search(r'^m\(.+?\)$', symbol)
+                   or re.search(r'^m\(.+?\)$', storage_notations))
+  capture_only = bool(re.search(r'^c\(.+?\)$', symbol)
+                      or re.search(r'^c\(.+?\)$', storage_notations))
+  # A_ : rider
+  if (re.search(r'.+?_\)?$', symbol)
+          or re.search(r'.+?_\)?$', storage_notations)):
+    return MoveStep(RIDE, direction, None, move_only, capture_only)
+
+  # 数字つき([n]/[m] はのぞく)
+  head_num = re.search(r'^([a-z]\()?(\d+)[^/]', symbol)
+  foot_num = (re.search(r'[^/](\d+)\)?$', symbol)
+              or re.search(r'[^/](\d+)\)?$', storage_notations))
+  # 頭に数字がついている場合
+  if head_num:
+    scale = int(head_num.group(2))
+    return MoveStep(LEAP, [(scale * xx, scale * yy) for xx, yy in direction],
+                    None, move_only, capture_only)
+  # 末尾に数字がついている場合 : length つき rider
+  if foot_num:
+    return MoveStep(RIDE, direction, int(foot_num.group(1)), move_only, capture_only)
+  # leaper
+  return MoveStep(LEAP, direction, None, move_only, capture_only)
+
+
+def _compile_staged(symbol: str, storage: 'dict[str, str]') -> MoveStep:
+  '''段階的な動き symbol (A>B) を解析する'''
+  first, second = symbol.split('>')
+  first_move = compile_notation(first, **storage).directions()
+  # first_move の構造を変更
+  first_move_list: 'list[PositionList]' = [[pos] for pos in first_move]
+  # > の前に使われている変数の中で storage に格納されている文字列
+  storage_notations = ''.join(storage[name] for name in storage if name in first)
+  # > の前に A_ の有無
+  first_rider = bool(re.search(r'[a-z]?\(?(.+?)\)?_\)?', storage_notations + first))
+  # > の後に使われている変数の中で storage に格納されている文字列
+  storage_notations = ''.join(storage[name] for name in storage if name in second)
+  # > の後に A_ の有無
+  rider_symbol = re.search(r'[a-z]?\(?(.+?)\)?_\)?', storage_notations + second)
+  if rider_symbol:
+    rider_move = compile_notation(rider_symbol.group(1), **storage).directions()
+    # slide rider
+    return MoveStep(SLIDE_RIDE, first=first_move_list, first_rider=first_rider,
+                    second=_notation_o(second, storage_notations, first_move_list, list(rider_move)))
+
+  # 末尾の数字の有無
+  rider_symbol = re.search(r'[a-z]?\(?(.*?[^*/])\)?(\d+)\)?', storage_notations + second)
+  if rider_symbol:
+    rider_move = compile_notation(rider_symbol.group(1), **storage).directions()
+    # length つき slide rider
+    return MoveStep(SLIDE_RIDE, length=int(rider_symbol.group(2)),
+                    first=first_move_list, first_rider=first_rider,
+                    second=_notation_o(second, storage_notations, first_move_list, list(rider_move)))
+
+  # slide leaper
+  second_move = compile_notation(second, **storage).directions()
+  return MoveStep(SLIDE_LEAP, first=first_move_list, first_rider=first_rider,
+                  second=_notation_o(second, storage_notations, first_move_list, list(second_move)))
 
 
 def moves_from(
@@ -185,6 +399,7 @@ def moves_from(
 ) -> PositionSet:
   '''
   notation をもとに動きを出力．
+  notation は compile_notation で一度だけ解析し，覚えておいたものを使う．
 
   Parameters
   ----------
@@ -226,6 +441,8 @@ def moves_from(
   - A>B     A の動きをしてから B の動きをする( A は含まない)
   - o(A)    A の動きの駒から見て外側の部分に
 
+  A>B の A, B と変数の中身は，盤面によらない動きでなければならない．
+
   Examples
   --------
   '+,x' : King
@@ -236,129 +453,70 @@ def moves_from(
   'K>o(**2/1)', 'K'='+,x' : Count
   '+>x_, x_>+, x_, +' : GrandDuke
   '''
-  common_args = x, y, gameboard, color
-  output: PositionSet = set()
-  for symbol in notation.split(','):
-    # 段階的な動きであるとき
-    if '>' in symbol:
-      first, second = symbol.split('>')
-      first_move, second_move = \
-          (moves_from(first, *common_args, relative=True, **storage),
-           moves_from(second, *common_args, relative=True, **storage))
-      # first_move の構造を変更
-      first_move_list: 'list[PositionList]' = [[pos] for pos in first_move]
-      # > の前に使われている変数の中で storage に格納されている文字列
-      storage_notations = ''.join(storage[name] for name in storage if name in first)
-      # > の前に A_ の有無
-      rider_symbol = re.search(r'[a-z]?\(?(.+?)\)?_\)?', storage_notations + first)
-      if rider_symbol:
-        if size is None:
-          raise TypeError('available_moves > moves_from の引数に size が指定されていません．')
-        first_move_list = [[(i * x, i * y) for i in range(1, size)]
-                           for [(x, y)] in first_move_list]
-      # > の後に使われている変数の中で storage に格納されている文字列
-      storage_notations = ''.join(storage[name] for name in storage if name in second)
-      # > の後に A_ の有無
-      rider_symbol = re.search(r'[a-z]?\(?(.+?)\)?_\)?', storage_notations + second)
-      if rider_symbol:
-        rider_move = moves_from(rider_symbol.group(1), *common_args,
-                                relative=True, **storage)
-        # o(A)
-        rider_move = _notation_o(second, storage_notations,
-                                 first_move_list, list(rider_move))
-        # slide rider
-        output |= slide_rider(*common_args,
-                              first_move_list, rider_move)
-      else:
-        # 末尾の数字の有無
-        rider_symbol = re.search(r'[a-z]?\(?(.*?[^*/])\)?(\d+)\)?', storage_notations + second)
-        if rider_symbol:
-          rider_move = moves_from(rider_symbol.group(1), *common_args,
-                                  relative=True, **storage)
-          # o(A)
-          rider_move = _notation_o(second, storage_notations,
-                                   first_move_list, list(rider_move))
-          foot_num = int(rider_symbol.group(2))
-          # length つき slide rider
-          output |= slide_rider(*common_args,
-                                first_move_list, rider_move,
-                                length=foot_num)
-        else:
-          leaper_move = _notation_o(second, storage_notations,
-                                    first_move_list, list(second_move))
-          # slide leaper
-          if size is None:
-            raise TypeError('available_moves > moves_from の引数に size が指定されていません．')
-          output |= slide_leaper(*common_args, size,
-                                 first_move_list, leaper_move)
-
-    # 屈折のない動きであるとき
-    else:
-      direction: PositionList = []
-      # 変数
-      storage_notations = ''
-      for name in storage:
-        if name in symbol:
-          storage_notations = storage[name]
-          direction = list(moves_from(
-              storage_notations, *common_args, relative=True, **storage))
-
-      # 単体で動きを表すもの
-      vector = re.search(r'-?\d+/-?\d+', symbol)
-      # '+' で十字方向
-      if '+' in symbol:
-        direction = dir8(0, 1)
-      # 'x' で斜め方向
-      elif 'x' in symbol:
-        direction = dir8(1, 1)
-      # [n]/[m] ベクトル指定
-      elif vector:
-        n, m = map(int, vector.group().split('/'))
-        direction = [(m, n)]
-
-      # 装飾子
-      # **A
-      if re.search(r'\(?\*\*', symbol):
-        direction = dir8(*direction[0])
-      # A_ : rider
-      if (re.search(r'.+?_\)?$', symbol)
-              or re.search(r'.+?_\)?$', storage_notations)):
-        tmp = _notation_m(symbol, storage_notations,
-                          rider, (*common_args, direction, size, None, False,
-                                  gameboard[(x, y)].abbr in ('Mi', 'Bz')))
-      else:
-        # 数字つき([n]/[m] はのぞく)
-        head_num = re.search(r'^([a-z]\()?(\d+)[^/]', symbol)
-        foot_num = (re.search(r'[^/](\d+)\)?$', symbol)
-                    or re.search(r'[^/](\d+)\)?$', storage_notations))
-        # 頭に数字がついている場合
-        if head_num:
-          direction = [(xx, yy)
-                       for xx, yy in (int(head_num.group(2)) * (np.asarray(direction))).tolist()]
-          tmp = _notation_m(symbol, storage_notations,
-                            leaper, (*common_args, direction, size if size is not None else 14))
-        # 末尾に数字がついている場合 : length つき rider
-        elif foot_num:
-          tmp = _notation_m(symbol, storage_notations,
-                            rider, (*common_args, direction, size, int(foot_num.group(1)), False,
-                                    gameboard[(x, y)].abbr in ('Mi', 'Bz')))
-        else:
-          # leaper
-          tmp = _notation_m(symbol, storage_notations,
-                            leaper, (*common_args, direction, size if size is not None else 14))
-      # c(A)
-      if (re.search(r'^c\(.+?\)$', symbol)
-              or re.search(r'^c\(.+?\)$', storage_notations)):
-        tmp: PositionSet = {pos for pos in tmp
-                            if (pos in gameboard and no_conflict(gameboard, color, *pos, size=size or 14))}
-      if relative:
-        tmp = set(direction)
-      output |= tmp
-  return output
+  return compile_notation(notation, **storage).run(x, y, gameboard, color, size, relative)
+
+
+# 跳び駒の移動先の表 : {(x, y, 移動方向, size): (Position, ...)}
+_leaper_targets: 'dict[tuple[int, int, frozenset[Position], int], tuple[Position, ...]]' = {}
+# dist_leaps : {(距離, ...): frozenset > {Position, ...}}
+_dist_leaps: 'dict[tuple[int, ...], frozenset[Position]]' = {}
+
+
+def dist_leaps(dists: 'Iterable[int]') -> 'frozenset[Position]':
+  '''
+  原点からの距離の2乗が dists のいずれかである位置(相対座標)．
+  同じ dists には同じ frozenset を返すので，leaper の表を引くのが速い．
+
+  Parameters
+  ----------
+  dists : Iterable > [int, ...]
+    原点からの距離の2乗．
+
+  Returns
+  -------
+  : frozenset > {Position, ...}
+
+  See Also
+  --------
+  PrimeLeaper, PythagorasLeaper, DevelopingMan など
+  '''
+  key = tuple(dists)
+  leaps = _dist_leaps.get(key)
+  if leaps is None:
+    leaps = _dist_leaps[key] = frozenset(pos for dist in key for pos in dist_dir(dist))
+  return leaps
+
+
+def leaper_targets(
+    x: int, y: int, direction: 'Iterable[Position]', size: int,
+) -> 'tuple[Position, ...]':
+  '''
+  (x, y) から direction の方向に跳んだ先のうち，盤面の上にあるマス．盤面の状態によらない
+
+  Parameters
+  ----------
+  x, y : int
+    駒の位置．
+  direction : Iterable > [Position, ...]
+    駒の移動方向．frozenset のときはそのまま表のキーにする．
+  size : int
+    盤面のサイズ．
+
+  Returns
+  -------
+  : tuple > (Position, ...)
+  '''
+  leaps = direction if isinstance(direction, frozenset) else frozenset(direction)
+  key = (x, y, leaps, size)
+  targets = _leaper_targets.get(key)
+  if targets is None:
+    targets = _leaper_targets[key] = tuple(
+        (x + xx, y + yy) for xx, yy in leaps if is_in_bounds(x + xx, y + yy, size))
+  return targets
 
 
 def leaper(
-    x: int, y: int, gameboard: Board, color: Color, direction: PositionList,
+    x: int, y: int, gameboard: Board, color: Color, direction: 'Iterable[Position]',
     size: int, move_only: bool = False
 ) -> PositionSet:
   '''
@@ -374,8 +532,8 @@ def leaper(
     盤面．
   color : Color
     駒色．
-  direction : PositionList
-    駒の移動方向．
+  direction : Iterable > [Position, ...]
+    駒の移動方向．dist_leaps などの frozenset も使える．
   size : int
     盤面のサイズ．
   move_only : bool, default False
@@ -387,8 +545,193 @@ def leaper(
   PositionSet
     駒の可能な移動先．
   '''
-  return {(xx, yy) for xx, yy in move_list((x, y), set(direction))
-          if no_conflict(gameboard, color, xx, yy, size=size, move_only=move_only)}
+  answers: PositionSet = set()
+  for pos in leaper_targets(x, y, direction, size):
+    # 行先に駒がない，または行先の駒色が自分と異なる
+    target = gameboard.get(pos)
+    if target is None or (target.color != color and not move_only):
+      answers.add(pos)
+  return answers
+
+
+# 走る駒の通るマスの表
+# ray : {(x, y, xint, yint, size, length): (Position, ...)}
+_rays: 'dict[tuple[int, int, int, int, Optional[int], Optional[int]], tuple[Position, ...]]' = {}
+# reflect_path : {(x, y, xint, yint, ref_num, size): (Position, ...)}
+_reflect_paths: 'dict[tuple[int, int, int, int, int, int], tuple[Position, ...]]' = {}
+# wave_path : {(x, y, xint, yint, interval, size, sideways): (Position, ...)}
+_wave_paths: 'dict[tuple[int, int, int, int, Position, int, bool], tuple[Position, ...]]' = {}
+
+
+def ray(
+    x: int, y: int, xint: int, yint: int, size: int = 14, length: int = None,
+) -> 'tuple[Position, ...]':
+  '''
+  (x, y) から (xint, yint) 方向に走るときに通るマス．盤面の状態によらない
+
+  Parameters
+  ----------
+  x, y : int
+    駒の絶対座標．
+  xint, yint : int
+    移動の方向．相対座標．
+  size : int
+    盤面の大きさ．
+  length : int or None, default None
+    (xint, yint) 方向に移動する最大の回数．
+    指定したときは盤面の外に出ても止まらない(rider と同じ)．
+
+  Returns
+  -------
+  : tuple > (Position, ...)
+    近い順．
+  '''
+  key = (x, y, xint, yint, size if length is None else None, length)
+  path = _rays.get(key)
+  if path is None:
+    squares: PositionList = []
+    xtemp, ytemp = x + xint, y + yint
+    # length の指定なし(None)の場合，盤面上に収まること．
+    # 指定ありの場合，その回数以内の移動であること．
+    while (is_in_bounds(xtemp, ytemp, size) if length is None
+           else (abs(x - xtemp) <= abs(xint) * length
+                 and abs(y - ytemp) <= abs(yint) * length)):
+      squares.append((xtemp, ytemp))
+      xtemp += xint
+      ytemp += yint
+    path = _rays[key] = tuple(squares)
+  return path
+
+
+def reflect_path(
+    x: int, y: int, xint: int, yint: int, ref_num: int, size: int,
+) -> 'tuple[Position, ...]':
+  '''
+  (x, y) から (xint, yint) 方向に，盤面の縁で ref_num 回まで反射しながら走るときに通るマス
+
+  Returns
+  -------
+  : tuple > (Position, ...)
+    通る順．
+  '''
+  key = (x, y, xint, yint, ref_num, size)
+  path = _reflect_paths.get(key)
+  if path is None:
+    squares: PositionList = []
+    xtemp, ytemp = x + xint, y + yint
+    reflect_num = 0  # 反射済回数
+    while is_in_bounds(xtemp, ytemp, size) and reflect_num <= ref_num:
+      squares.append((xtemp, ytemp))
+      # 盤面の縁に到達した
+      if xtemp <= 0 or xtemp >= size - 1:
+        reflect_num += 1
+        xint = -xint
+      if ytemp <= 0 or ytemp >= size - 1:
+        reflect_num += 1
+        yint = -yint
+      xtemp += xint
+      ytemp += yint
+    path = _reflect_paths[key] = tuple(squares)
+  return path
+
+
+def wave_path(
+    x: int, y: int, xint: int, yint: int, interval: Position, size: int, sideways: bool = False,
+) -> 'tuple[Position, ...]':
+  '''
+  (x, y) から (xint, yint) 方向に踏み出して，波うちながら走るときに通るマス．wave_rider で使う
+
+  Parameters
+  ----------
+  x, y : int
+    駒の絶対座標．
+  xint, yint : int
+    最初の一歩の方向．相対座標．
+  interval : Position
+    wave_rider の intervals[0]．
+  size : int
+    盤面の大きさ．
+  sideways : bool
+    False のとき前後方向への波，True のとき左右方向への波．
+
+  Returns
+  -------
+  : tuple > (Position, ...)
+    通る順．
+  '''
+  key = (x, y, xint, yint, interval, size, sideways)
+  path = _wave_paths.get(key)
+  if path is None:
+    width, advance = interval
+    squares: PositionList = []
+    xtemp, ytemp = x + xint, y + yint
+    var = 0
+    while is_in_bounds(xtemp, ytemp, size):
+      squares.append((xtemp, ytemp))
+      if sideways:
+        # 移動先が駒より白側
+        if ytemp < y:
+          var = width
+        # 移動先が駒より黒側
+        elif ytemp > y:
+          var = -width
+        ytemp += var
+        # 右方向に進んでいるなら右へ，左なら左へ
+        xtemp += advance if xtemp > x else -advance
+      else:
+        # 移動先が駒より左側
+        if xtemp < x:
+          var = width
+        # 移動先が駒より右側
+        elif xtemp > x:
+          var = -width
+        xtemp += var
+        # 前方向に進んでいるなら前へ，後ろなら後ろへ
+        ytemp += advance if ytemp > y else -advance
+    path = _wave_paths[key] = tuple(squares)
+  return path
+
+
+def _walk(
+    path: 'tuple[Position, ...]', gameboard: Board, color: Color, answers: PositionSet,
+    move_only: bool = False, stop_in_zone: bool = True,
+):
+  '''
+  path に沿って進み，駒にぶつかるまでのマスを answers に加える
+
+  Parameters
+  ----------
+  path : tuple > (Position, ...)
+    通るマス．
+  gameboard : Board
+    盤面．
+  color : Color
+    駒色．
+  answers : PositionSet
+    移動先を加える set．
+  move_only : bool, default False
+    True のとき，相手の駒を取ることができない．
+  stop_in_zone : bool, default True
+    True のとき，ミスト・ブリザードの範囲に入ったところで止まる．
+  '''
+  for pos in path:
+    # target : 盤面上の pos の位置に駒があればその駒(obj)．
+    #   なければ None．
+    target = gameboard.get(pos)
+    if target is None:
+      # 駒がないのでそのマスには動ける
+      answers.add(pos)
+      if stop_in_zone and in_any_zone(gameboard, pos):
+        # ミストorブリザードにぶつかったので，そこで止まる
+        break
+    elif target.color != color and not move_only:
+      # 相手の駒があり，その移動で取ることができるので，取れる
+      answers.add(pos)
+      # 駒にぶつかったので，これ以上進めない
+      break
+    else:
+      # 自分の駒にぶつかったので，これ以上進めない
+      break
 
 
 def rider(
@@ -434,42 +777,9 @@ def rider(
   '''
   answers: PositionSet = set()
   for xint, yint in set(intervals):
-    # intervals 中の (xint, yint) 方向について
-    # (xtemp, ytemp) : 盤面上の現在位置絶対座標 (x, y) から (xint, yint) 方向に動いたときの絶対座標
-    xtemp, ytemp = x + xint, y + yint
-    # condition : length の指定なし(None)の場合，盤面上に収まること．
-    #   指定ありの場合，その回数以内の移動であること．
-    condition = (is_in_bounds(xtemp, ytemp, size) if length is None
-                 else (abs(x - xtemp) <= abs(xint) * length
-                       and abs(y - ytemp) <= abs(yint) * length))
-    while condition:
-      # target : 盤面上の (xtemp, ytemp) の位置に駒があればその駒(obj)．
-      #   なければ None．
-      target = gameboard.get((xtemp, ytemp))
-      if target is None:
-        # 駒がないのでそのマスには動ける
-        answers.add((xtemp, ytemp))
-        if ((in_zone(gameboard, 2, (xtemp, ytemp), 'Mi')
-             or in_zone(gameboard, 1, (xtemp, ytemp), 'Bz'))
-                and not is_mist):
-          # ミストorブリザードにぶつかったので，そこで止まる
-          break
-      elif target.color != color and not move_only:
-        # 相手の駒があり，その移動で取ることができるので，取れる
-        answers.add((xtemp, ytemp))
-        # 駒にぶつかったので，これ以上進めない
-        break
-      else:
-        # 自分の駒にぶつかったので，これ以上進めない
-        break
-
-      # (xtemp, ytemp) から (xint, yint) 方向に一回動く
-      xtemp += xint
-      ytemp += yint
-      # condition の更新
-      condition = (is_in_bounds(xtemp, ytemp, size) if length is None
-                   else (abs(x - xtemp) <= abs(xint) * length
-                         and abs(y - ytemp) <= abs(yint) * length))
+    # intervals 中の (xint, yint) 方向に，通るマスの表に沿って進む
+    _walk(ray(x, y, xint, yint, size, length), gameboard, color, answers,
+          move_only=move_only, stop_in_zone=not is_mist)
   return answers
 
 
@@ -507,56 +817,14 @@ def wave_rider(
     intervals -- dir8(2, 1)
   '''
   answers: PositionSet = set()
-  # (xtemp, ytemp) は絶対座標
-  for xtemp, ytemp in move_list((x, y), {(xx, yy) for xx, yy in intervals if abs(xx) == intervals[0][0]}):
-    var = 0
-    # 前後方向への波
-    while is_in_bounds(xtemp, ytemp, size):
-      target = gameboard.get((xtemp, ytemp))
-      if target is None:
-        # 駒がないのでそのマスには動ける
-        answers.add((xtemp, ytemp))
-        if (in_zone(gameboard, 2, (xtemp, ytemp), 'Mi')
-                or in_zone(gameboard, 1, (xtemp, ytemp), 'Bz')):
-          # ミストorブリザードにぶつかったので，そこで止まる
-          break
-      elif target.color != color:
-        answers.add((xtemp, ytemp))
-        break
-      else:
-        break
-      # 移動先が駒より左側
-      if xtemp < x:
-        var = intervals[0][0]
-      # 移動先が駒より右側
-      elif xtemp > x:
-        var = -intervals[0][0]
-      # 次の移動先
-      xtemp += var
-      # 前方向に進んでいるなら前へ，後ろなら後ろへ
-      ytemp += intervals[0][1] if ytemp > y else -intervals[0][1]
-  for xtemp, ytemp in move_list((x, y), {(xx, yy) for xx, yy in intervals if abs(yy) == intervals[0][0]}):
-    var = 0
-    # 左右方向への波
-    while is_in_bounds(xtemp, ytemp, size):
-      target = gameboard.get((xtemp, ytemp))
-      if target is None:
-        answers.add((xtemp, ytemp))
-      elif target.color != color:
-        answers.add((xtemp, ytemp))
-        break
-      else:
-        break
-      # 移動先が駒より白側
-      if ytemp < y:
-        var = intervals[0][0]
-      # 移動先が駒より黒側
-      elif ytemp > y:
-        var = -intervals[0][0]
-      # 次の移動先
-      ytemp += var
-      # 右方向に進んでいるなら右へ，左なら左へ
-      xtemp += intervals[0][1] if xtemp > x else -intervals[0][1]
+  width = intervals[0][0]
+  # 前後方向への波
+  for xint, yint in {(xx, yy) for xx, yy in intervals if abs(xx) == width}:
+    _walk(wave_path(x, y, xint, yint, intervals[0], size), gameboard, color, answers)
+  # 左右方向への波
+  for xint, yint in {(xx, yy) for xx, yy in intervals if abs(yy) == width}:
+    _walk(wave_path(x, y, xint, yint, intervals[0], size, sideways=True), gameboard, color, answers,
+          stop_in_zone=False)
   return answers
 
 
@@ -593,32 +861,7 @@ def reflect_rider(
   '''
   answers: PositionSet = set()
   for xint, yint in intervals:
-    xtemp, ytemp = x + xint, y + yint
-    reflect_num = 0  # 反射済回数
-    while is_in_bounds(xtemp, ytemp, size) and reflect_num <= ref_num:  # ここの値が何回まで反射できるかを表す
-      target = gameboard.get((xtemp, ytemp))
-      if target is None:
-        # 駒がないのでそのマスには動ける
-        answers.add((xtemp, ytemp))
-        if (in_zone(gameboard, 2, (xtemp, ytemp), 'Mi')
-                or in_zone(gameboard, 1, (xtemp, ytemp), 'Bz')):
-          # ミストorブリザードにぶつかったので，そこで止まる
-          break
-      elif target.color != color:
-        answers.add((xtemp, ytemp))
-        break
-      else:
-        break
-
-      # 盤面の縁に到達した
-      if xtemp <= 0 or xtemp >= size - 1:
-        reflect_num += 1
-        xint = -xint
-      if ytemp <= 0 or ytemp >= size - 1:
-        reflect_num += 1
-        yint = -yint
-      xtemp += xint
-      ytemp += yint
+    _walk(reflect_path(x, y, xint, yint, ref_num, size), gameboard, color, answers)
   return answers
 
 
@@ -664,8 +907,7 @@ def slide_leaper(
     for bflist in startlist:
       if all([is_in_bounds(x + posX, y + posY, size)
               and (x + posX, y + posY) not in gameboard
-              and not (in_zone(gameboard, 2, (x + posX, y + posY), 'Mi')
-                       or in_zone(gameboard, 1, (x + posX, y + posY), 'Bz'))
+              and not in_any_zone(gameboard, (x + posX, y + posY))
               for posX, posY in bflist]):
         ans |= leaper(x, y, gameboard, color, dest[startlist.index(bflist)], size)
   else:
@@ -675,10 +917,11 @@ def slide_leaper(
         # 盤面上にあり，駒がなく，ミストエリアでない場合
         if all([is_in_bounds(x + posX, y + posY, size)
                 and (x + posX, y + posY) not in gameboard
-                and not (in_zone(gameboard, 2, (x + posX, y + posY), 'Mi')
-                         or in_zone(gameboard, 1, (x + posX, y + posY), 'Bz'))
+                and not in_any_zone(gameboard, (x + posX, y + posY))
                 for posX, posY in bflist[:(bflist.index(start) + 1)]]):
-          ans |= leaper(x, y, gameboard, color, list(move_list(start, set(dest[startlist.index(bflist)]))), size)
+          ans |= leaper(x, y, gameboard, color,
+                        [(start[0] + xx, start[1] + yy) for xx, yy in dest[startlist.index(bflist)]],
+                        size)
   return ans
 
 
@@ -733,8 +976,7 @@ def slide_rider(
       # 盤面上にあり，駒がなく，ミストエリアでない場合
       if all([is_in_bounds(x + posX, y + posY)
               and (x + posX, y + posY) not in gameboard
-              and not (in_zone(gameboard, 2, (x + posX, y + posY), 'Mi')
-                       or in_zone(gameboard, 1, (x + posX, y + posY), 'Bz'))
+              and not in_any_zone(gameboard, (x + posX, y + posY))
               for posX, posY in bflist[:(bflist.index(start) + 1)]]):
         ans |= rider(x + start[0], y + start[1], gameboard, color,
                      dest[startlist.index(bflist)], size, length=length,
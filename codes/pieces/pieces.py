@@ -9,9 +9,7 @@ https://www.1001freedownloads.com/free-clipart/chess-symbols-set-13
 '''
 
 
-from copy import copy
-
-from pieces.piece import Piece, PositionSet
+from pieces.piece import Piece, PositionSet, piece_moves
 from pieces.piece_utils import dir8, king_move, leaper, no_conflict, rider
 
 
@@ -19,45 +17,45 @@ class Knight(Piece):
   abbr = 'N'
   value = 3.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color, dir8(1, 2), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color, dir8(1, 2), size)
 
 
 class Rook(Piece):
   abbr = 'R'
   value = 5.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, rider,
-                      (x, y, gameboard, self.color, dir8(0, 1), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return rider(x, y, gameboard, color, dir8(0, 1), size)
 
 
 class Bishop(Piece):
   abbr = 'B'
   value = 3.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, rider,
-                      (x, y, gameboard, self.color, dir8(1, 1), kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return rider(x, y, gameboard, color, dir8(1, 1), size)
 
 
 class Queen(Piece):
   abbr = 'Q'
   value = 9.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, rider,
-                      (x, y, gameboard, self.color, king_move, kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return rider(x, y, gameboard, color, king_move, size)
 
 
 class King(Piece):
   abbr = 'K'
   value = 10.0
 
-  def available_moves(self, x, y, gameboard, **kwargs):
-    return self.prune(gameboard, leaper,
-                      (x, y, gameboard, self.color, king_move, kwargs['size']))
+  @classmethod
+  def generate(cls, x, y, gameboard, color, size):
+    return leaper(x, y, gameboard, color, king_move, size)
 
 
 class Pawn(Piece):
@@ -74,8 +72,8 @@ class Pawn(Piece):
     if kwargs.get('return_capture'):
       return capture
 
-    if gameboard != self.seen_board:
-      self.seen_board = copy(gameboard)
+    moves = self.cached_moves(x, y, gameboard)
+    if moves is None:
       move: PositionSet = set()
       if (x, y + _direction) not in gameboard:
         move.add((x, y + _direction))
@@ -83,7 +81,8 @@ class Pawn(Piece):
               and (x, y + 1 * _direction) not in gameboard
               and (x, y + 2 * _direction) not in gameboard):
         move.add((x, y + 2 * _direction))
-      self.tmp_moves = move | {pos for pos in capture
-                               if (pos in gameboard and no_conflict(
-                                   gameboard, self.color, *pos, size=kwargs['size']))}
-    return self.tmp_moves
+      moves = move | {pos for pos in capture
+                      if (pos in gameboard and no_conflict(
+                          gameboard, self.color, *pos, size=kwargs['size']))}
+      self.cache_moves(x, y, gameboard, moves)
+    return moves
@@ -2,12 +2,14 @@
 
 from copy import copy
 from datetime import datetime
+import os
 from typing import Tuple, Callable, Literal, cast
 
 from custom_types import Color, Position, PositionList, PositionSet, Board, Placers
 import numpy as np
 import yaml
 
+from board import ArrayBoard, ZONES, on_array
 from pieces.piece import Piece
 
 
@@ -56,11 +58,11 @@ def save_print(draw, error: bool = False):
           'can_castling_data': draw.can_castling,
           'count_data': draw.count,
           'record_data': {
-              number: board_output(board) for number, board in draw.record.items()
+              number: board_output(board) for number, board in draw.record_boards().items()
           },
           }]
 
-  with open('main/data.yml', 'a') as file:
+  with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main', 'data.yml'), 'a') as file:
     file.write(f"# {'ERROR' if error else 'SAVE'}\n")
     file.write(f'# {datetime.now()}\n')
     yaml.dump(data, file, Dumper=CustomDumper, default_flow_style=None, sort_keys=False)
@@ -384,7 +386,14 @@ def in_zone(gameboard: Board, distance: int, position: Position, ref_piece_abbr:
   Returns
   -------
   : bool
+
+  Notes
+  -----
+  ArrayBoard では ZONES の駒と距離について，ArrayBoard.zones を引くだけで答える．
   '''
+  if (isinstance(gameboard, ArrayBoard) and ZONES.get(ref_piece_abbr) == distance
+          and on_array(*position)):
+    return gameboard.in_zone(*position, ref_piece_abbr)
   ref_piece_positions = [pos
                          for pos, piece in gameboard.items() if piece.abbr == ref_piece_abbr]
   for ref_piece_position in ref_piece_positions:
@@ -395,6 +404,28 @@ def in_zone(gameboard: Board, distance: int, position: Position, ref_piece_abbr:
       return True
 
 
+def in_any_zone(gameboard: Board, position: Position) -> bool:
+  '''
+  position がミストの2マス以内かブリザードの1マス以内にあるとき True．
+  走る駒はそのマスで止まる
+
+  Parameters
+  ----------
+  gameboard : Board
+    盤面．
+  position : Position
+    位置．
+
+  Returns
+  -------
+  : bool
+  '''
+  if isinstance(gameboard, ArrayBoard) and on_array(*position):
+    return gameboard.in_any_zone(*position)
+  return bool(in_zone(gameboard, ZONES['Mi'], position, 'Mi')
+              or in_zone(gameboard, ZONES['Bz'], position, 'Bz'))
+
+
 def _memo():
   loaded = None
   args_memo = ()